@@ -5,10 +5,17 @@ from urllib.request import urlopen
 
 from django.conf import settings
 
+from core.metrics import timed_delivery
+
 logger = logging.getLogger(__name__)
 
 
-def send_sms(to: str, message: str) -> None:
+def send_sms(to: str, message: str, *, purpose: str = "generic") -> None:
+    with timed_delivery("sms", purpose):
+        _deliver(to, message)
+
+
+def _deliver(to: str, message: str) -> None:
     backend = getattr(settings, 'SMS_BACKEND', 'console')
     if backend == 'console':
         logger.info('SMS(to=%s): %s', to, message)
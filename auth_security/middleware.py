@@ -1,79 +1,81 @@
 from __future__ import annotations
 
-from django.conf import settings
+from asgiref.sync import sync_to_async
 from django.http import HttpResponse
 
+from core.metrics import login_protection_blocks
+from core.middleware import HybridMiddleware
+
+from .policy import get_policy
 from .services import LoginProtectionService, TooManyRequests, get_client_ip, normalize_identifier
 
 
-class LoginProtectionMiddleware:
+class LoginProtectionMiddleware(HybridMiddleware):
     """Protect login endpoints against brute-force attempts.
 
     Security decisions are centralized in LoginProtectionService.
     This middleware only applies to POST requests on configured login paths.
     """
 
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request):
-        if request.method == "POST" and self._is_protected_path(request.path):
-            ip = get_client_ip(request)
-            identifier = normalize_identifier(
-                request.POST.get("username")
-                or request.POST.get("email")
-                or request.POST.get("phone")
-                or request.POST.get("identifier")
-            )
+    def handle(self, request):
+        if request.method == "POST" and get_policy().is_protected(request.path):
+            rejected = self._check(request)
+            if rejected is not None:
+                return rejected
+        return self.get_response(request)
 
-            if not identifier:
-                # Do not proceed to authentication; avoid unnecessary backend work.
-                LoginProtectionService.log_rejected_attempt(
-                    ip=ip,
-                    identifier="",
-                    reason="missing_identifier",
-                    request=request,
-                )
-                return self._too_many_response(
-                    request,
-                    status_code=400,
-                    retry_after_seconds=0,
-                    message="شناسه کاربری نامعتبر است.",
-                )
+    async def ahandle(self, request):
+        if request.method == "POST" and get_policy().is_protected(request.path):
+            rejected = await sync_to_async(self._check)(request)
+            if rejected is not None:
+                return rejected
+        return await self.get_response(request)
 
-            try:
-                LoginProtectionService.check_login_allowed(ip=ip, identifier=identifier)
-            except TooManyRequests as exc:
-                LoginProtectionService.log_rejected_attempt(
-                    ip=ip,
-                    identifier=identifier,
-                    reason=exc.decision.reason,
-                    request=request,
-                )
-                return self._too_many_response(
-                    request,
-                    status_code=exc.decision.status_code,
-                    retry_after_seconds=exc.decision.retry_after_seconds,
-                    message="تلاش‌های ورود بیش از حد مجاز است. لطفاً بعداً دوباره تلاش کنید.",
-                )
+    def _check(self, request) -> HttpResponse | None:
+        """The rejection response for a blocked login attempt on a protected path, or None."""
+        ip = get_client_ip(request)
+        identifier = normalize_identifier(
+            request.POST.get("username")
+            or request.POST.get("email")
+            or request.POST.get("phone")
+            or request.POST.get("identifier")
+        )
 
-        return self.get_response(request)
+        if not identifier:
+            # Do not proceed to authentication; avoid unnecessary backend work.
+            LoginProtectionService.log_rejected_attempt(
+                ip=ip,
+                identifier="",
+                reason="missing_identifier",
+                request=request,
+            )
+            login_protection_blocks.inc(reason="missing_identifier")
+            return self._too_many_response(
+                request,
+                status_code=400,
+                retry_after_seconds=0,
+                message="شناسه کاربری نامعتبر است.",
+            )
 
-    def _is_protected_path(self, path: str) -> bool:
-        configured_login = getattr(settings, "AUTH_SECURITY_LOGIN_PATHS", ["/login/", "/admin/login/"])
-        extra = getattr(settings, "AUTH_SECURITY_PROTECTED_PATHS", [])
-        if isinstance(configured_login, str):
-            configured_login = [p.strip() for p in configured_login.split(",") if p.strip()]
-        if isinstance(extra, str):
-            extra = [p.strip() for p in extra.split(",") if p.strip()]
-        configured = configured_login + extra
-        if isinstance(configured, str):
-            configured = [p.strip() for p in configured.split(",") if p.strip()]
-        admin_path = (getattr(settings, "ADMIN_PATH", "admin/") or "admin/").strip("/")
-        admin_login_path = f"/{admin_path}/login/"
-        if admin_login_path not in configured:
-            configured.append(admin_login_path)
-        return path in configured
+        try:
+            LoginProtectionService.check_login_allowed(
+                ip=ip, identifier=identifier, limits=get_policy().limits_for(request.path)
+            )
+        except TooManyRequests as exc:
+            LoginProtectionService.log_rejected_attempt(
+                ip=ip,
+                identifier=identifier,
+                reason=exc.decision.reason,
+                request=request,
+            )
+            login_protection_blocks.inc(reason=exc.decision.reason)
+            return self._too_many_response(
+                request,
+                status_code=exc.decision.status_code,
+                retry_after_seconds=exc.decision.retry_after_seconds,
+                message="تلاش‌های ورود بیش از حد مجاز است. لطفاً بعداً دوباره تلاش کنید.",
+            )
+        return None
 
     def _too_many_response(self, request, *, status_code: int, retry_after_seconds: int, message: str) -> HttpResponse:
         resp = HttpResponse(message, status=status_code)
@@ -0,0 +1,142 @@
+"""Login protection policy compiled once from settings.
+
+``LoginProtectionMiddleware`` asks the policy whether a POST path is
+protected on every request, and the failed-login signal asks the same
+question, so the settings are parsed here once instead of per request:
+
+- ``AUTH_SECURITY_LOGIN_PATHS`` / ``AUTH_SECURITY_PROTECTED_PATHS``: lists or
+  comma-separated strings. Entries ending in ``*`` are prefixes, entries
+  starting with ``^`` are regular expressions, everything else is an exact
+  path. The admin login path is always protected.
+- ``AUTH_SECURITY_PATH_LIMITS``: optional per-path overrides of the global
+  thresholds, e.g. ``{"/admin/login/": {"IDENTIFIER_MAX_ATTEMPTS": 3}}``.
+
+The compiled policy is dropped when any of these settings change (tests use
+``override_settings``).
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+DEFAULT_LOGIN_PATHS = ("/login/", "/admin/login/")
+
+# LoginLimits field -> global setting (and AUTH_SECURITY_PATH_LIMITS key without the prefix).
+_LIMIT_SETTINGS = {
+    "identifier_max_attempts": ("AUTH_SECURITY_LOGIN_IDENTIFIER_MAX_ATTEMPTS", 5),
+    "identifier_window_seconds": ("AUTH_SECURITY_LOGIN_IDENTIFIER_WINDOW_SECONDS", 600),
+    "ip_max_attempts": ("AUTH_SECURITY_LOGIN_IP_MAX_ATTEMPTS", 10),
+    "ip_window_seconds": ("AUTH_SECURITY_LOGIN_IP_WINDOW_SECONDS", 600),
+    "ip_block_after_attempts": ("AUTH_SECURITY_LOGIN_IP_BLOCK_AFTER_ATTEMPTS", None),
+    "ip_block_seconds": ("AUTH_SECURITY_IP_BLOCK_SECONDS", 1800),
+}
+
+
+@dataclass(frozen=True)
+class LoginLimits:
+    identifier_max_attempts: int
+    identifier_window_seconds: int
+    ip_max_attempts: int
+    ip_window_seconds: int
+    ip_block_after_attempts: int
+    ip_block_seconds: int
+
+
+@dataclass(frozen=True)
+class ProtectionPolicy:
+    exact_paths: frozenset[str]
+    prefixes: tuple[str, ...]
+    pattern: re.Pattern | None
+    limits: LoginLimits
+    path_limits: MappingProxyType
+
+    def is_protected(self, path: str) -> bool:
+        if path in self.exact_paths:
+            return True
+        if self.prefixes and path.startswith(self.prefixes):
+            return True
+        return self.pattern is not None and self.pattern.match(path) is not None
+
+    def limits_for(self, path: str) -> LoginLimits:
+        return self.path_limits.get(path, self.limits)
+
+
+def _setting_int(name: str, default: int) -> int:
+    try:
+        return int(getattr(settings, name, default))
+    except (TypeError, ValueError):
+        return int(default)
+
+
+def _path_list(value) -> list[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return [path.strip() for path in value or () if path and path.strip()]
+
+
+def _global_limits() -> LoginLimits:
+    values = {}
+    for field_name, (setting, default) in _LIMIT_SETTINGS.items():
+        if default is None:  # block-after defaults to the IP attempt limit
+            default = values["ip_max_attempts"]
+        values[field_name] = _setting_int(setting, default)
+    return LoginLimits(**values)
+
+
+def _overridden(limits: LoginLimits, overrides: dict) -> LoginLimits:
+    changes = {}
+    for field_name, (setting, _default) in _LIMIT_SETTINGS.items():
+        key = setting.removeprefix("AUTH_SECURITY_").removeprefix("LOGIN_")
+        if key in overrides:
+            changes[field_name] = int(overrides[key])
+    return replace(limits, **changes)
+
+
+def compile_policy() -> ProtectionPolicy:
+    entries = _path_list(getattr(settings, "AUTH_SECURITY_LOGIN_PATHS", DEFAULT_LOGIN_PATHS))
+    entries += _path_list(getattr(settings, "AUTH_SECURITY_PROTECTED_PATHS", ()))
+    admin_path = (getattr(settings, "ADMIN_PATH", "admin/") or "admin/").strip("/")
+    entries.append(f"/{admin_path}/login/")
+
+    exact, prefixes, patterns = set(), [], []
+    for entry in entries:
+        if entry.startswith("^"):
+            patterns.append(f"(?:{entry})")
+        elif entry.endswith("*"):
+            prefixes.append(entry[:-1])
+        else:
+            exact.add(entry)
+
+    limits = _global_limits()
+    per_path = getattr(settings, "AUTH_SECURITY_PATH_LIMITS", None) or {}
+    return ProtectionPolicy(
+        exact_paths=frozenset(exact),
+        prefixes=tuple(prefixes),
+        pattern=re.compile("|".join(patterns)) if patterns else None,
+        limits=limits,
+        path_limits=MappingProxyType({path: _overridden(limits, rules) for path, rules in per_path.items()}),
+    )
+
+
+_policy: ProtectionPolicy | None = None
+
+
+def get_policy() -> ProtectionPolicy:
+    global _policy
+    policy = _policy
+    if policy is None:
+        policy = _policy = compile_policy()
+    return policy
+
+
+@receiver(setting_changed)
+def _reset_policy(*, setting, **kwargs):
+    global _policy
+    if setting.startswith("AUTH_SECURITY_") or setting == "ADMIN_PATH":
+        _policy = None
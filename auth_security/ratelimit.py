@@ -6,6 +6,9 @@ from dataclasses import dataclass
 from django.core.cache import cache
 from django.utils import timezone
 
+from core.metrics import rate_limit_decisions, record_cache_lookup
+from core.tracing import traced
+
 from .services import get_client_ip, normalize_identifier
 
 logger = logging.getLogger(__name__)
@@ -17,6 +20,7 @@ class RateLimitDecision:
     retry_after_seconds: int
 
 
+@traced("rate_limit")
 def check_rate_limit(
     request,
     *,
@@ -33,12 +37,14 @@ def check_rate_limit(
     now_ts = timezone.now().timestamp()
 
     payload = cache.get(key)
+    record_cache_lookup("ratelimit", payload is not None)
     if not payload or payload.get("reset_at", 0) <= now_ts:
         cache.set(
             key,
             {"count": 1, "reset_at": now_ts + window_seconds},
             timeout=window_seconds,
         )
+        rate_limit_decisions.inc(scope=scope, decision="allowed")
         return RateLimitDecision(allowed=True, retry_after_seconds=0)
 
     payload["count"] = int(payload.get("count", 0)) + 1
@@ -50,6 +56,8 @@ def check_rate_limit(
             "Rate limit exceeded",
             extra={"scope": scope, "ip": ip, "identifier": ident or "-"},
         )
+        rate_limit_decisions.inc(scope=scope, decision="blocked")
         return RateLimitDecision(allowed=False, retry_after_seconds=retry_after)
 
+    rate_limit_decisions.inc(scope=scope, decision="allowed")
     return RateLimitDecision(allowed=True, retry_after_seconds=retry_after)
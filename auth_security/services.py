@@ -9,14 +9,7 @@ from django.db import transaction
 from django.utils import timezone
 
 from .models import AuthIPBlock, AuthIPEvent, AuthLoginAttempt
-
-
-def _setting_int(name: str, default: int) -> int:
-    raw = getattr(settings, name, default)
-    try:
-        return int(raw)
-    except (TypeError, ValueError):
-        return int(default)
+from .policy import LoginLimits, get_policy
 
 
 def _setting_bool(name: str, default: bool = False) -> bool:
@@ -74,8 +67,9 @@ class LoginProtectionService:
     """Centralized decision logic for login throttling + IP blocking."""
 
     @classmethod
-    def check_login_allowed(cls, *, ip: str, identifier: str) -> None:
+    def check_login_allowed(cls, *, ip: str, identifier: str, limits: LoginLimits | None = None) -> None:
         now = timezone.now()
+        limits = limits or get_policy().limits
 
         # 1) Check existing IP block (and auto-unblock when expired).
         block = AuthIPBlock.objects.filter(ip_address=ip, unblocked_at__isnull=True).first()
@@ -95,8 +89,8 @@ class LoginProtectionService:
         # 2) Rate limit by identifier (failed credential attempts only).
         identifier = normalize_identifier(identifier)
         if identifier:
-            window_seconds = _setting_int("AUTH_SECURITY_LOGIN_IDENTIFIER_WINDOW_SECONDS", 600)
-            max_attempts = _setting_int("AUTH_SECURITY_LOGIN_IDENTIFIER_MAX_ATTEMPTS", 5)
+            window_seconds = limits.identifier_window_seconds
+            max_attempts = limits.identifier_max_attempts
             window_start = now - timedelta(seconds=window_seconds)
             qs = AuthLoginAttempt.objects.filter(
                 user_identifier=identifier,
@@ -115,9 +109,9 @@ class LoginProtectionService:
                 )
 
         # 3) Rate limit by IP (failed credential attempts only) and optionally block.
-        ip_window_seconds = _setting_int("AUTH_SECURITY_LOGIN_IP_WINDOW_SECONDS", 600)
-        ip_max_attempts = _setting_int("AUTH_SECURITY_LOGIN_IP_MAX_ATTEMPTS", 10)
-        ip_block_after = _setting_int("AUTH_SECURITY_LOGIN_IP_BLOCK_AFTER_ATTEMPTS", ip_max_attempts)
+        ip_window_seconds = limits.ip_window_seconds
+        ip_max_attempts = limits.ip_max_attempts
+        ip_block_after = limits.ip_block_after_attempts
         window_start = now - timedelta(seconds=ip_window_seconds)
         ip_qs = AuthLoginAttempt.objects.filter(
             ip_address=ip,
@@ -127,13 +121,12 @@ class LoginProtectionService:
         )
         ip_failures = ip_qs.count()
         if ip_failures >= ip_block_after:
-            cls._block_ip(ip=ip, identifier=identifier, now=now)
-            cooldown = _setting_int("AUTH_SECURITY_IP_BLOCK_SECONDS", 1800)
+            cls._block_ip(ip=ip, identifier=identifier, now=now, cooldown=limits.ip_block_seconds)
             raise TooManyRequests(
                 LimitDecision(
                     status_code=429,
                     reason=AuthLoginAttempt.REASON_BLOCKED_IP,
-                    retry_after_seconds=cooldown,
+                    retry_after_seconds=limits.ip_block_seconds,
                 )
             )
         if ip_failures >= ip_max_attempts:
@@ -158,8 +151,7 @@ class LoginProtectionService:
         )
 
     @classmethod
-    def _block_ip(cls, *, ip: str, identifier: str, now) -> None:
-        cooldown = _setting_int("AUTH_SECURITY_IP_BLOCK_SECONDS", 1800)
+    def _block_ip(cls, *, ip: str, identifier: str, now, cooldown: int) -> None:
         blocked_until = now + timedelta(seconds=cooldown)
 
         # Use a transaction to avoid duplicate event spam in concurrent requests.
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from django.conf import settings
 from django.contrib.auth.signals import user_login_failed
 from django.dispatch import receiver
 
 from .models import AuthLoginAttempt
+from .policy import get_policy
 from .services import get_client_ip, normalize_identifier
 
 
@@ -19,10 +19,7 @@ def log_failed_login_attempt(sender, credentials, request, **kwargs):
     if request is None:
         return
 
-    configured = getattr(settings, "AUTH_SECURITY_LOGIN_PATHS", ["/login/", "/admin/login/"])
-    if isinstance(configured, str):
-        configured = [p.strip() for p in configured.split(",") if p.strip()]
-    if request.path not in configured:
+    if not get_policy().is_protected(request.path):
         return
 
     identifier = credentials.get("username") or credentials.get("email") or ""
@@ -3,10 +3,11 @@ from __future__ import annotations
 from datetime import timedelta
 
 from django.contrib.auth.models import User
-from django.test import TestCase, override_settings
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.utils import timezone
 
 from auth_security.models import AuthIPBlock, AuthIPEvent, AuthLoginAttempt
+from auth_security.policy import get_policy
 
 
 class LoginProtectionTests(TestCase):
@@ -84,3 +85,32 @@ class LoginProtectionTests(TestCase):
         self.assertIsNotNone(block.unblocked_at)
         self.assertTrue(AuthIPEvent.objects.filter(ip_address=ip, action="unblock").exists())
 
+
+class ProtectionPolicyTests(SimpleTestCase):
+    @override_settings(
+        AUTH_SECURITY_LOGIN_PATHS="/login/, /accounts/login/",
+        AUTH_SECURITY_PROTECTED_PATHS=["/auth/otp/*", r"^/shop/\d+/login/$"],
+        ADMIN_PATH="panel/",
+        AUTH_SECURITY_LOGIN_IDENTIFIER_MAX_ATTEMPTS=5,
+        AUTH_SECURITY_LOGIN_IP_MAX_ATTEMPTS=10,
+        AUTH_SECURITY_PATH_LIMITS={"/panel/login/": {"IDENTIFIER_MAX_ATTEMPTS": 2, "IP_BLOCK_SECONDS": 60}},
+    )
+    def test_compiled_rules_and_per_path_limits(self):
+        policy = get_policy()
+        self.assertIs(get_policy(), policy)
+        self.assertEqual(policy.exact_paths, {"/login/", "/accounts/login/", "/panel/login/"})
+        for path in ("/accounts/login/", "/auth/otp/verify/", "/shop/12/login/", "/panel/login/"):
+            self.assertTrue(policy.is_protected(path), path)
+        for path in ("/login", "/auth/other/", "/shop/x/login/", "/admin/login/"):
+            self.assertFalse(policy.is_protected(path), path)
+
+        self.assertEqual(policy.limits.identifier_max_attempts, 5)
+        self.assertEqual(policy.limits.ip_block_after_attempts, 10)
+        admin = policy.limits_for("/panel/login/")
+        self.assertEqual((admin.identifier_max_attempts, admin.ip_block_seconds, admin.ip_max_attempts), (2, 60, 10))
+
+    def test_policy_is_recompiled_when_settings_change(self):
+        with override_settings(AUTH_SECURITY_LOGIN_PATHS="/first/"):
+            self.assertTrue(get_policy().is_protected("/first/"))
+        with override_settings(AUTH_SECURITY_LOGIN_PATHS="/second/"):
+            self.assertFalse(get_policy().is_protected("/first/"))
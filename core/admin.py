@@ -9,6 +9,7 @@ from django.template.loader import render_to_string
 from django.template.response import TemplateResponse
 from django.utils import timezone
 
+from .metrics import timed_delivery
 from .models import (
     ContactMessage,
     DailyVisitStat,
@@ -110,7 +111,8 @@ class ContactMessageAdmin(admin.ModelAdmin):
                                     to=[msg.email],
                                 )
                                 email_message.attach_alternative(html_body, "text/html")
-                                email_message.send(fail_silently=False)
+                                with timed_delivery("email", "contact_reply"):
+                                    email_message.send(fail_silently=False)
                                 email_sent += 1
                             except Exception:
                                 email_failed += 1
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "core"
+
+    def ready(self) -> None:  # pragma: no cover
+        from django.conf import settings
+
+        from . import checks, signals  # noqa: F401
+
+        if getattr(settings, "LOG_QUEUE_ENABLED", False):
+            from .log import install_queue_logging
+
+            install_queue_logging(getattr(settings, "LOG_QUEUE_SIZE", 10_000))
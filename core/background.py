@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from core import tracing
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _setting_int(name: str, default: int) -> int:
+    raw = getattr(settings, name, default)
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return int(default)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, _setting_int("BACKGROUND_TASK_WORKERS", 2)),
+                    thread_name_prefix="background-task",
+                )
+    return _executor
+
+
+def _run_task(fn, args, kwargs):
+    # Runs in a copy of the submitter's context: log records keep its request id,
+    # but the request's trace may already have been emitted.
+    tracing.detach()
+    try:
+        return fn(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(fn, "__qualname__", fn))
+        raise
+    finally:
+        # Worker threads hold their own DB connections; never leak them between tasks.
+        connections.close_all()
+
+
+def submit(fn, *args, **kwargs) -> Future | None:
+    """Run ``fn`` on the in-process worker pool (inline when BACKGROUND_TASKS_EAGER is set)."""
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        try:
+            fn(*args, **kwargs)
+        except Exception:
+            logger.exception("Background task %s failed", getattr(fn, "__qualname__", fn))
+        return None
+    return _get_executor().submit(contextvars.copy_context().run, _run_task, fn, args, kwargs)
+
+
+def submit_on_commit(fn, *args, **kwargs) -> None:
+    """Schedule ``fn`` once the current transaction commits (immediately outside a transaction)."""
+    transaction.on_commit(lambda: submit(fn, *args, **kwargs))
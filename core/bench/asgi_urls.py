@@ -0,0 +1,7 @@
+"""``core.bench.urls`` with the async API views, for ASGI load tests."""
+
+from shopproject.asgi_urls import with_async_views
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = with_async_views(sync_urlpatterns)
@@ -0,0 +1,139 @@
+"""What a worker imports at boot, and what it costs.
+
+``boot_worker`` starts a fresh interpreter that does what a gunicorn/uvicorn
+worker does before its first response: ``django.setup()``, build the
+middleware chain and import the URLconf (and with it every view module).
+``import_profile`` runs it under ``python -X importtime`` and attributes the
+cost to this project's modules, each with the third-party packages it pulled
+in directly. Heavy optional stacks (PDF rendering, Excel import) are meant to
+be imported at first use, never here; see ``LAZY_MODULES``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.apps import apps
+from django.conf import settings
+
+# Top-level packages that must not be imported while a worker boots.
+LAZY_MODULES = ("reportlab", "openpyxl", "arabic_reshaper", "bidi")
+
+# Django loads settings, middleware and URLconfs with importlib.import_module, which -X importtime
+# does not report; __import__ them first so their cost is attributed to them.
+_BOOT_SCRIPT = """
+import json, os, sys
+__import__(os.environ["DJANGO_SETTINGS_MODULE"])
+import django
+from django.conf import settings
+django.setup(set_prefix=False)
+for path in settings.MIDDLEWARE:
+    __import__(path.rpartition(".")[0])
+__import__(settings.ROOT_URLCONF)
+
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+
+application = get_wsgi_application()
+get_resolver().url_patterns
+print(json.dumps(sorted(sys.modules)))
+"""
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportTiming:
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+    children: list[ImportTiming] = field(default_factory=list)
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".", 1)[0]
+
+
+@dataclass
+class WorkerBoot:
+    modules: list[str]
+    timings: list[ImportTiming]
+
+    def loaded(self, packages) -> list[str]:
+        wanted = set(packages)
+        return sorted({name.split(".", 1)[0] for name in self.modules} & wanted)
+
+
+def boot_worker(*, importtime: bool = False, timeout: float = 120) -> WorkerBoot:
+    """Boot the project in a fresh interpreter; returns its modules (and -X importtime timings)."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get("PYTHONPATH")]))
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", _BOOT_SCRIPT]
+    result = subprocess.run(
+        command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=timeout
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Worker boot failed:\n{result.stderr[-4000:]}")
+    modules = json.loads(result.stdout.strip().splitlines()[-1])
+    return WorkerBoot(modules=modules, timings=parse_importtime(result.stderr) if importtime else [])
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parse ``-X importtime`` lines into a forest (children are listed before their parent)."""
+    roots: list[ImportTiming] = []
+    pending: list[ImportTiming] = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        timing = ImportTiming(name, len(indent) // 2, int(self_us), int(cumulative_us))
+        while pending and pending[-1].depth > timing.depth:
+            timing.children.insert(0, pending.pop())
+        pending.append(timing)
+        if timing.depth == 0:
+            roots.extend(pending)
+            pending.clear()
+    return roots
+
+
+def first_party_packages() -> set[str]:
+    base_dir = str(settings.BASE_DIR)
+    packages = {config.name.split(".", 1)[0] for config in apps.get_app_configs() if config.path.startswith(base_dir)}
+    packages.add(settings.SETTINGS_MODULE.split(".", 1)[0])
+    return packages
+
+
+def app_module_costs(roots: list[ImportTiming], first_party: set[str]) -> list[dict]:
+    """Per first-party module: its import cost and the third-party packages it imported directly."""
+    rows = []
+
+    def visit(timing: ImportTiming) -> None:
+        if timing.package in first_party:
+            third_party: dict[str, int] = defaultdict(int)
+            for child in timing.children:
+                if child.package not in first_party:
+                    third_party[child.package] += child.cumulative_us
+            rows.append(
+                {
+                    "module": timing.name,
+                    "self_ms": timing.self_us / 1000,
+                    "cumulative_ms": timing.cumulative_us / 1000,
+                    "imports": {
+                        package: us / 1000 for package, us in sorted(third_party.items(), key=lambda item: -item[1])
+                    },
+                }
+            )
+        for child in timing.children:
+            visit(child)
+
+    for root in roots:
+        visit(root)
+    return sorted(rows, key=lambda row: -row["cumulative_ms"])
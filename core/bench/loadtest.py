@@ -0,0 +1,563 @@
+"""Closed-loop load generator for the WSGI and ASGI apps.
+
+Each virtual user is a thread with its own cookie jar and client IP. It picks
+a weighted action, waits for the response, optionally sleeps for a think
+time, and repeats. The app runs either in-process (Django's WSGI handler with
+sync views, or its ASGI handler on one event loop with the async API views;
+no sockets) or behind a real server reached over HTTP. The report has
+throughput, latency percentiles, status and error counts per action (5xx and
+statuses the action should never get), plus
+the change in the /metrics/ counters (rate-limit decisions, login blocks,
+SiteVisit flushes, ...) over the run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from urllib.parse import unquote, urlencode
+
+from django.conf import settings
+from django.db import connections
+from django.test import override_settings
+
+from .runner import BENCH_ASGI_URLCONF, BROWSER_USER_AGENT, bench_overrides, percentile
+
+DEFAULT_MIX = {
+    "home": 5,
+    "browse": 30,
+    "category": 10,
+    "search": 10,
+    "suggest": 10,
+    "product_detail": 25,
+    "contact": 3,
+    "login": 7,
+}
+# What the React SPA sends once the shell is loaded: only the read-only API.
+API_MIX = {
+    "browse": 30,
+    "category": 10,
+    "search": 10,
+    "suggest": 10,
+    "product_detail": 30,
+    "user_status": 10,
+}
+ACTIONS = frozenset(DEFAULT_MIX) | frozenset(API_MIX)
+# Anything else an action gets back (a 301 from an SSL redirect, a 404 from a stale URL) is an error;
+# 429s are reported separately as throttled.
+EXPECTED_STATUSES = {"login": frozenset({200, 302, 403})}
+_EXPECTED_DEFAULT = frozenset({200, 201, 304})
+
+_SERIES = re.compile(r"^(?P<series>[a-zA-Z_:][a-zA-Z0-9_:]*(?:\{.*\})?)\s+(?P<value>\S+)$")
+
+
+@dataclass
+class Response:
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+
+
+class WSGITransport:
+    """Call a WSGI application directly, the way a server worker would."""
+
+    def __init__(self, application, *, host: str = "testserver"):
+        self.application = application
+        self.host = host
+
+    def request(self, method: str, path: str, *, headers: dict, body: bytes = b"", client_ip: str = "127.0.0.1") -> Response:
+        path_info, _, query = path.partition("?")
+        environ = {
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": path_info,
+            "QUERY_STRING": query,
+            "SERVER_NAME": self.host,
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": client_ip,
+            "HTTP_HOST": self.host,
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": io.StringIO(),
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in headers.items():
+            key = name.upper().replace("-", "_")
+            environ[key if key == "CONTENT_TYPE" else f"HTTP_{key}"] = value
+
+        captured: dict = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            captured["status"] = int(status.split(" ", 1)[0])
+            captured["headers"] = response_headers
+
+        result = self.application(environ, start_response)
+        try:
+            payload = b"".join(result)
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+        return Response(captured["status"], captured["headers"], payload)
+
+
+class ASGITransport:
+    """Call an ASGI application on one event loop, the way uvicorn/daphne would.
+
+    Virtual-user threads hand their requests to the loop thread, so every
+    in-flight request shares that loop like it would in an ASGI worker.
+    """
+
+    def __init__(self, application, *, host: str = "testserver"):
+        self.application = application
+        self.host = host
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="asgi-loop", daemon=True)
+        self._thread.start()
+
+    def request(self, method: str, path: str, *, headers: dict, body: bytes = b"", client_ip: str = "127.0.0.1") -> Response:
+        future = asyncio.run_coroutine_threadsafe(self._request(method, path, headers, body, client_ip), self.loop)
+        return future.result()
+
+    async def _request(self, method: str, path: str, headers: dict, body: bytes, client_ip: str) -> Response:
+        path_info, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": unquote(path_info),
+            "raw_path": path_info.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "root_path": "",
+            "headers": [(b"host", self.host.encode("latin-1"))]
+            + [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+            + ([(b"content-length", str(len(body)).encode())] if body else []),
+            "client": (client_ip, 50000),
+            "server": (self.host, 80),
+        }
+        done = asyncio.Event()
+        body_sent = False
+        captured: dict = {"headers": [], "body": []}
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Django listens for a disconnect while the view runs; only send it once we are done.
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in message.get("headers", [])]
+            elif message["type"] == "http.response.body":
+                captured["body"].append(message.get("body", b""))
+                if not message.get("more_body"):
+                    done.set()
+
+        try:
+            await self.application(scope, receive, send)
+        finally:
+            done.set()
+        return Response(captured["status"], captured["headers"], b"".join(captured["body"]))
+
+    def close(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPTransport:
+    """Send requests to a running server (gunicorn, runserver, ...)."""
+
+    def __init__(self, base_url: str, *, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._opener = urllib.request.build_opener(_NoRedirect)
+
+    def request(self, method: str, path: str, *, headers: dict, body: bytes = b"", client_ip: str = "127.0.0.1") -> Response:
+        # Only honoured by the app when AUTH_SECURITY_TRUST_X_FORWARDED_FOR is on.
+        headers = {"X-Forwarded-For": client_ip, **headers}
+        req = urllib.request.Request(self.base_url + path, data=body or None, headers=headers, method=method)
+        try:
+            with self._opener.open(req, timeout=self.timeout) as resp:
+                return Response(resp.status, list(resp.headers.items()), resp.read())
+        except urllib.error.HTTPError as exc:
+            return Response(exc.code, list(exc.headers.items()), exc.read())
+
+
+@dataclass
+class Catalog:
+    """Sample of real slugs so the traffic hits existing rows."""
+
+    categories: list[str] = field(default_factory=list)
+    products: list[tuple[str, str, str]] = field(default_factory=list)  # (category slug, slug, name)
+
+    @classmethod
+    def discover(cls, transport, *, sample: int = 200) -> "Catalog":
+        catalog = cls()
+        response = transport.request("GET", "/api/categories/", headers={"Accept": "application/json"})
+        if response.status == 200:
+            catalog.categories = [row["slug"] for row in json.loads(response.body).get("categories", [])]
+        response = transport.request(
+            "GET", f"/api/products/?page_size={sample}", headers={"Accept": "application/json"}
+        )
+        if response.status == 200:
+            catalog.products = [
+                (row["category"]["slug"], row["slug"], row["name"])
+                for row in json.loads(response.body).get("products", [])
+            ]
+        return catalog
+
+
+class VirtualUser:
+    def __init__(self, transport, catalog: Catalog, *, client_ip: str, rng: random.Random):
+        self.transport = transport
+        self.catalog = catalog
+        self.client_ip = client_ip
+        self.rng = rng
+        self.cookies: dict[str, str] = {}
+
+    def request(self, method: str, path: str, *, body: bytes = b"", headers: dict | None = None) -> Response:
+        headers = {"User-Agent": BROWSER_USER_AGENT, **(headers or {})}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        response = self.transport.request(method, path, headers=headers, body=body, client_ip=self.client_ip)
+        for name, value in response.headers:
+            if name.lower() == "set-cookie":
+                for key, morsel in SimpleCookie(value).items():
+                    self.cookies[key] = morsel.value
+        return response
+
+    def _search_term(self) -> str:
+        if not self.catalog.products:
+            return "گریل"
+        words = self.rng.choice(self.catalog.products)[2].split()
+        return self.rng.choice(words)[:4] or "گریل"
+
+    def _product(self):
+        return self.rng.choice(self.catalog.products) if self.catalog.products else None
+
+    # -- actions -----------------------------------------------------------------
+
+    def home(self) -> Response:
+        return self.request("GET", "/")
+
+    def browse(self) -> Response:
+        return self.request("GET", f"/api/products/?page={self.rng.randint(1, 5)}")
+
+    def category(self) -> Response:
+        if not self.catalog.categories:
+            return self.request("GET", "/api/categories/")
+        return self.request("GET", "/api/products/?" + urlencode({"category": self.rng.choice(self.catalog.categories)}))
+
+    def search(self) -> Response:
+        return self.request("GET", "/api/products/?" + urlencode({"search": self._search_term(), "page_size": 8}))
+
+    def suggest(self) -> Response:
+        return self.request("GET", "/catalog/suggest/?" + urlencode({"q": self._search_term()}))
+
+    def product_detail(self) -> Response:
+        product = self._product()
+        if product is None:
+            return self.request("GET", "/api/products/")
+        category_slug, slug, _name = product
+        return self.request("GET", f"/api/products/{category_slug}/{slug}/")
+
+    def user_status(self) -> Response:
+        return self.request("GET", "/api/user/status/")
+
+    def contact(self) -> Response:
+        number = self.rng.randint(0, 10**6)
+        payload = {
+            "name": "کاربر آزمایشی",
+            "email": f"loadtest{number}@example.com",
+            "phone": f"0912{number:07d}",
+            "inquiry_type": "consultation",
+            "message": "درخواست مشاوره برای تجهیز آشپزخانه صنعتی.",
+        }
+        return self.request(
+            "POST",
+            "/api/contact/",
+            body=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+
+    def login(self) -> Response:
+        login_path = getattr(settings, "LOGIN_URL", "/admin/login/")
+        if "csrftoken" not in self.cookies:
+            self.request("GET", login_path)
+        form = urlencode({"username": f"user{self.rng.randint(1, 50)}", "password": "wrong-password"})
+        return self.request(
+            "POST",
+            login_path,
+            body=form.encode("utf-8"),
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "X-CSRFToken": self.cookies.get("csrftoken", ""),
+            },
+        )
+
+
+@dataclass
+class ActionStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    exceptions: Counter = field(default_factory=Counter)
+
+    def as_dict(self, expected=_EXPECTED_DEFAULT) -> dict:
+        total = len(self.latencies_ms)
+        unexpected = sum(n for status, n in self.statuses.items() if status < 500 and status not in expected | {429})
+        server_errors = sum(n for status, n in self.statuses.items() if status >= 500)
+        errors = server_errors + unexpected + sum(self.exceptions.values())
+        return {
+            "requests": total,
+            "errors": errors,
+            "unexpected_statuses": unexpected,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "throttled": self.statuses.get(429, 0),
+            "p50_ms": round(percentile(self.latencies_ms, 0.50), 2),
+            "p90_ms": round(percentile(self.latencies_ms, 0.90), 2),
+            "p95_ms": round(percentile(self.latencies_ms, 0.95), 2),
+            "p99_ms": round(percentile(self.latencies_ms, 0.99), 2),
+            "max_ms": round(max(self.latencies_ms), 2) if total else 0.0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "exceptions": dict(self.exceptions),
+        }
+
+
+def parse_mix(raw: str | None) -> dict[str, int]:
+    """``"browse=30,login=5"`` (or ``"api"`` for API_MIX) -> weights; unknown actions raise ValueError."""
+    if not raw:
+        return dict(DEFAULT_MIX)
+    if raw.strip() == "api":
+        return dict(API_MIX)
+    mix: dict[str, int] = {}
+    for part in raw.split(","):
+        name, _, weight = part.strip().partition("=")
+        if not name:
+            continue
+        if name not in ACTIONS:
+            raise ValueError(f"Unknown action {name!r}; choose from {', '.join(sorted(ACTIONS))}")
+        mix[name] = int(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one action with a positive weight.")
+    return mix
+
+
+def parse_exposition(text: str, *, skip_buckets: bool = True) -> dict[str, float]:
+    """Flatten Prometheus text format into {series: value}."""
+    series: dict[str, float] = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = _SERIES.match(line.strip())
+        if not match:
+            continue
+        name = match.group("series")
+        if skip_buckets and "_bucket{" in name:
+            continue
+        try:
+            series[name] = float(match.group("value"))
+        except ValueError:
+            continue
+    return series
+
+
+def metrics_delta(before: dict[str, float], after: dict[str, float]) -> dict[str, float]:
+    delta = {}
+    for name, value in after.items():
+        change = value - before.get(name, 0.0)
+        if change:
+            delta[name] = round(change, 6)
+    return dict(sorted(delta.items()))
+
+
+def run_load(
+    transport,
+    *,
+    mix: dict[str, int],
+    concurrency: int,
+    duration: float,
+    max_requests: int | None = None,
+    distinct_ips: int | None = None,
+    think_ms: float = 0.0,
+    seed: int = 1,
+    snapshot=None,
+) -> dict:
+    """Run ``concurrency`` virtual users for ``duration`` seconds (or ``max_requests`` total)."""
+    catalog = Catalog.discover(transport)
+    actions = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in actions]
+    ip_pool = max(1, distinct_ips or concurrency)
+
+    stats: dict[str, ActionStats] = defaultdict(ActionStats)
+    lock = threading.Lock()
+    issued = 0
+    stop = threading.Event()
+    before = snapshot() if snapshot else {}
+
+    def worker(index: int) -> None:
+        nonlocal issued
+        rng = random.Random(seed * 10_007 + index)
+        user = VirtualUser(
+            transport,
+            catalog,
+            client_ip=f"10.77.{(index % ip_pool) // 250}.{(index % ip_pool) % 250 + 1}",
+            rng=rng,
+        )
+        local: dict[str, ActionStats] = defaultdict(ActionStats)
+        try:
+            while not stop.is_set():
+                if max_requests is not None:
+                    with lock:
+                        if issued >= max_requests:
+                            break
+                        issued += 1
+                action = rng.choices(actions, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = getattr(user, action)()
+                except Exception as exc:
+                    local[action].latencies_ms.append((time.perf_counter() - started) * 1000)
+                    local[action].exceptions[type(exc).__name__] += 1
+                else:
+                    local[action].latencies_ms.append((time.perf_counter() - started) * 1000)
+                    local[action].statuses[response.status] += 1
+                if think_ms:
+                    time.sleep(rng.expovariate(1000.0 / think_ms))
+        finally:
+            # In-process runs open one DB connection per thread; don't leak them.
+            connections.close_all()
+            with lock:
+                for name, item in local.items():
+                    target = stats[name]
+                    target.latencies_ms.extend(item.latencies_ms)
+                    target.statuses.update(item.statuses)
+                    target.exceptions.update(item.exceptions)
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"loadtest-{i}", daemon=True) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    deadline = started + duration
+    while any(thread.is_alive() for thread in threads):
+        if time.perf_counter() >= deadline:
+            stop.set()
+        for thread in threads:
+            thread.join(timeout=0.1)
+    elapsed = time.perf_counter() - started
+
+    after = snapshot() if snapshot else {}
+    per_action = {
+        name: stats[name].as_dict(EXPECTED_STATUSES.get(name, _EXPECTED_DEFAULT)) for name in actions if name in stats
+    }
+    total = sum(row["requests"] for row in per_action.values())
+    errors = sum(row["errors"] for row in per_action.values())
+    everything = [ms for item in stats.values() for ms in item.latencies_ms]
+    return {
+        "concurrency": concurrency,
+        "distinct_ips": ip_pool,
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "p50_ms": round(percentile(everything, 0.50), 2),
+        "p95_ms": round(percentile(everything, 0.95), 2),
+        "p99_ms": round(percentile(everything, 0.99), 2),
+        "mix": mix,
+        "catalog_sample": {"categories": len(catalog.categories), "products": len(catalog.products)},
+        "actions": per_action,
+        "metrics_delta": metrics_delta(before, after) if snapshot else {},
+    }
+
+
+def in_process_target(*, real_email: bool = False, asgi: bool = False):
+    """(transport, serving context, snapshot) for driving the app without sockets.
+
+    The application is built when the context is entered, under the bench settings.
+
+    ``asgi`` runs shopproject.asgi with the async API views instead of shopproject.wsgi.
+    """
+    from core import metrics
+    from core.instrumentation import registry as instrumentation_registry
+
+    overrides = bench_overrides()
+    if not real_email:
+        overrides["EMAIL_BACKEND"] = "django.core.mail.backends.dummy.EmailBackend"
+    if asgi:
+        from django.core.asgi import get_asgi_application as get_application
+
+        overrides["ROOT_URLCONF"] = BENCH_ASGI_URLCONF
+        transport = ASGITransport(None)
+    else:
+        from django.core.wsgi import get_wsgi_application as get_application
+
+        transport = WSGITransport(None)
+
+    @contextmanager
+    def serving():
+        # Middleware reads settings such as SECURE_SSL_REDIRECT when the chain is built, so the
+        # application has to be created under the overrides (shopproject.wsgi's was built without).
+        with override_settings(**overrides):
+            transport.application = get_application()
+            yield
+
+    def snapshot():
+        return parse_exposition(metrics.registry.render())
+
+    instrumentation_registry.reset()
+    return transport, serving(), snapshot
+
+
+def instrumentation_summary() -> dict:
+    """Per-view query/latency figures collected in this process (in-process runs only)."""
+    from core.instrumentation import registry as instrumentation_registry
+
+    return {
+        view: {
+            "requests": row["requests"],
+            "budget_violations": row["budget_violations"],
+            "queries_p95": row["queries"]["p95"],
+            "sql_ms_p95": row["sql_ms"]["p95"],
+            "wall_ms_p95": row["wall_ms"]["p95"],
+            "duplicate_queries": len(row["duplicate_queries"]),
+        }
+        for view, row in instrumentation_registry.snapshot().items()
+    }
+
+
+def http_target(base_url: str, *, token: str = ""):
+    transport = HTTPTransport(base_url)
+
+    def snapshot():
+        response = transport.request("GET", "/metrics/", headers={"X-Health-Token": token} if token else {})
+        return parse_exposition(response.body.decode("utf-8", "replace")) if response.status == 200 else {}
+
+    return transport, snapshot
+
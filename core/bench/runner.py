@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import platform
+import statistics
+import subprocess
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from core.instrumentation import QueryRecorder
+
+BENCH_URLCONF = "core.bench.urls"
+BENCH_ASGI_URLCONF = "core.bench.asgi_urls"
+# Anything else is a crawler to SiteVisitMiddleware, which would skip visit tracking.
+BROWSER_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0"
+
+
+def percentile(samples, q: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 <= q <= 1)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))
+    return float(ordered[index])
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    path: str
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    path: str
+    runs: int
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+    max_ms: float
+    queries_p50: float
+    queries_max: int
+    statuses: dict[str, int] = field(default_factory=dict)
+
+
+def bench_overrides() -> dict:
+    """Settings that let an in-process client hit every view over plain HTTP."""
+    hosts = list(getattr(settings, "ALLOWED_HOSTS", []) or [])
+    if "testserver" not in hosts and "*" not in hosts:
+        hosts.append("testserver")
+    return {"ROOT_URLCONF": BENCH_URLCONF, "ALLOWED_HOSTS": hosts, "SECURE_SSL_REDIRECT": False}
+
+
+def bench_settings():
+    return override_settings(**bench_overrides())
+
+
+@contextmanager
+def quiet_request_errors():
+    """Silence django.request tracebacks; 500s are already counted in the report."""
+    request_logger = logging.getLogger("django.request")
+    previous_level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        request_logger.setLevel(previous_level)
+
+
+def default_scenarios(*, page_size: int = 20) -> list[Scenario]:
+    """Hot catalog paths, resolved against whatever data is currently in the database."""
+    from store.models import Category, Product
+
+    scenarios = [Scenario("catalog_home", "/catalog/")]
+
+    category = (
+        Category.objects.filter(products__isnull=False).order_by("id").values("slug").first()
+    )
+    if category:
+        scenarios.append(Scenario("category_detail", f"/catalog/{category['slug']}/"))
+
+    total = Product.objects.count()
+    if total:
+        product = Product.objects.order_by("id").values("slug", "category__slug")[total // 2]
+        scenarios.append(
+            Scenario("product_detail", f"/catalog/{product['category__slug']}/{product['slug']}/")
+        )
+
+    scenarios.append(Scenario("catalog_suggest", "/catalog/suggest/?q=%DA%AF%D8%B1%DB%8C%D9%84"))
+    scenarios.append(Scenario("api_products_first", f"/api/products/?page_size={page_size}"))
+    scenarios.append(Scenario("api_products_card", f"/api/products/?page_size={page_size}&view=card"))
+
+    available = Product.objects.filter(is_available=True).count()
+    last_page = max(1, -(-available // page_size))
+    scenarios.append(Scenario("api_products_deep", f"/api/products/?page={last_page}&page_size={page_size}"))
+    scenarios.append(Scenario("sitemap_xml", "/sitemap.xml"))
+    return scenarios
+
+
+def run_scenario(client: Client, scenario: Scenario, *, runs: int, warmup: int) -> ScenarioResult:
+    timings: list[float] = []
+    query_counts: list[int] = []
+    statuses: Counter = Counter()
+
+    for iteration in range(warmup + runs):
+        # A distinct client IP per request keeps check_rate_limit from turning the run into 429s.
+        remote_addr = f"10.{(iteration >> 16) & 255}.{(iteration >> 8) & 255}.{iteration & 255}"
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with recorder.installed():
+            response = client.get(scenario.path, REMOTE_ADDR=remote_addr, HTTP_USER_AGENT=BROWSER_USER_AGENT)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if iteration < warmup:
+            continue
+        timings.append(elapsed_ms)
+        query_counts.append(recorder.count)
+        statuses[str(response.status_code)] += 1
+
+    return ScenarioResult(
+        name=scenario.name,
+        path=scenario.path,
+        runs=len(timings),
+        p50_ms=round(percentile(timings, 0.50), 3),
+        p95_ms=round(percentile(timings, 0.95), 3),
+        mean_ms=round(statistics.fmean(timings), 3) if timings else 0.0,
+        max_ms=round(max(timings), 3) if timings else 0.0,
+        queries_p50=percentile(query_counts, 0.50),
+        queries_max=max(query_counts) if query_counts else 0,
+        statuses=dict(sorted(statuses.items())),
+    )
+
+
+def dataset_summary() -> dict[str, int]:
+    from store.models import Category, Product, ProductFeature, ProductImage, ProductReview
+
+    return {
+        "categories": Category.objects.count(),
+        "products": Product.objects.count(),
+        "features": ProductFeature.objects.count(),
+        "images": ProductImage.objects.count(),
+        "reviews": ProductReview.objects.count(),
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def run_benchmarks(scenarios, *, runs: int = 30, warmup: int = 3) -> dict:
+    with quiet_request_errors(), bench_settings():
+        # raise_request_exception=False: a broken view is reported as a 500, not a crash of the run.
+        client = Client(raise_request_exception=False)
+        results = [run_scenario(client, scenario, runs=runs, warmup=warmup) for scenario in scenarios]
+
+    return {
+        "started_at": timezone.now().isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "database": connection.vendor,
+        "runs": runs,
+        "warmup": warmup,
+        "dataset": dataset_summary(),
+        "scenarios": {result.name: asdict(result) for result in results},
+    }
+
+
+def write_report(report: dict, path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def load_report(path: Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare_reports(baseline: dict, current: dict) -> list[dict]:
+    """Per-scenario deltas (current - baseline) for scenarios present in both reports."""
+    rows = []
+    for name, now in current.get("scenarios", {}).items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        rows.append(
+            {
+                "name": name,
+                "p50_ms": now["p50_ms"] - before["p50_ms"],
+                "p95_ms": now["p95_ms"] - before["p95_ms"],
+                "queries_p50": now["queries_p50"] - before["queries_p50"],
+            }
+        )
+    return rows
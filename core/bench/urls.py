@@ -0,0 +1,19 @@
+"""URLconf used by the ``bench`` and ``loadtest`` commands.
+
+The public site routes everything except the API to the React shell, so the
+server-rendered catalog views (store.urls) and the sitemap are not reachable
+from ``shopproject.urls``. Benchmarks still need to exercise them, so this
+URLconf mounts them ahead of the production routes; everything else,
+including the React shell at ``/``, resolves exactly as in production.
+"""
+
+from django.urls import include, path
+
+from core import views as core_views
+from shopproject.urls import urlpatterns as site_urlpatterns
+
+urlpatterns = [
+    path("catalog/", include("store.urls")),
+    path("sitemap.xml", core_views.sitemap_xml, name="sitemap_xml"),
+    *site_urlpatterns,
+]
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Cache backends whose entries are private to one process.
+PROCESS_LOCAL_CACHES = frozenset(
+    {
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    }
+)
+
+
+def cache_is_shared(alias: str = "default") -> bool:
+    backend = settings.CACHES.get(alias, {}).get("BACKEND", "")
+    return bool(backend) and backend not in PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches)
+def check_session_cache(app_configs, **kwargs):
+    if settings.SESSION_ENGINE != "core.sessions":
+        return []
+    alias = settings.SESSION_CACHE_ALIAS
+    if cache_is_shared(alias):
+        return []
+    return [
+        Error(
+            f"SESSION_ENGINE 'core.sessions' needs a cache shared by all workers; cache '{alias}' is per-process.",
+            hint=(
+                "Set CACHE_URL to a redis:// or memcached:// server, or use "
+                "SESSION_ENGINE=django.contrib.sessions.backends.db. On a per-process cache, sessions "
+                "vanish when a request reaches another worker and a logout does not reach the others."
+            ),
+            id="core.E001",
+        )
+    ]
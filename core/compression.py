@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import Promise
+
+from .db_router import use_primary
+from .metrics import record_cache_lookup
+
+try:  # brotli is in requirements.txt, but keep serving gzip if it is missing.
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:  # orjson is in requirements.txt; the stdlib encoder is the fallback.
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# Per-request compression favours speed; bodies built once (static, cached) get the max level.
+_FAST_LEVELS = {"br": 4, "gzip": 6}
+_MAX_LEVELS = {"br": 11, "gzip": 9}
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """Return {coding: q} for an Accept-Encoding header value."""
+    accepted: dict[str, float] = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(request, available=SUPPORTED_ENCODINGS) -> str | None:
+    """Pick the best encoding in ``available`` order that the client accepts (None = identity)."""
+    accepted = parse_accept_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    wildcard = accepted.get("*", 0.0)
+    for coding in available:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, coding: str, *, fast: bool = False) -> bytes:
+    level = (_FAST_LEVELS if fast else _MAX_LEVELS).get(coding)
+    if coding == "br":
+        return brotli.compress(body, quality=level)
+    if coding == "gzip":
+        # mtime=0 keeps output deterministic, so variants (and their ETags) are stable across workers.
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported encoding: {coding}")
+
+
+def _json_default(value):
+    # Same conversions as DjangoJSONEncoder for the types orjson does not handle itself.
+    if isinstance(value, (Decimal, Promise)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    """Encode ``data`` as compact UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default)
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def strong_etag(body: bytes) -> str:
+    return '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+@dataclass(frozen=True)
+class PrecompressedBody:
+    """An immutable response body plus its compressed variants and strong ETags."""
+
+    body: bytes
+    etag: str
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes, *, min_size: int = 200, fast: bool = False) -> "PrecompressedBody":
+        variants: dict[str, bytes] = {}
+        if len(body) >= min_size:
+            for coding in SUPPORTED_ENCODINGS:
+                compressed = compress(body, coding, fast=fast)
+                if len(compressed) < len(body):
+                    variants[coding] = compressed
+        return cls(body=body, etag=strong_etag(body), variants=variants)
+
+    def etag_for(self, coding: str | None) -> str:
+        # Each representation needs its own strong validator.
+        return self.etag if coding is None else f'{self.etag[:-1]}-{coding}"'
+
+    def not_modified(self, request) -> bool:
+        header = request.META.get("HTTP_IF_NONE_MATCH", "")
+        if not header:
+            return False
+        candidates = {tag.strip() for tag in header.split(",")}
+        if "*" in candidates:
+            return True
+        return any(self.etag_for(coding) in candidates for coding in (None, *self.variants))
+
+    def response(self, request, *, content_type: str, cache_control: str = "no-cache", status: int = 200) -> HttpResponse:
+        coding = negotiate_encoding(request, tuple(self.variants))
+        if status == 200 and self.not_modified(request):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                self.variants[coding] if coding else self.body,
+                content_type=content_type,
+                status=status,
+            )
+            if coding:
+                response["Content-Encoding"] = coding
+        response["ETag"] = self.etag_for(coding)
+        response["Cache-Control"] = cache_control
+        if self.variants:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
+class CompressedJsonResponse(HttpResponse):
+    """JSON response encoded with ``dumps`` and compressed for the client (br, then gzip).
+
+    Only the negotiated variant is compressed. GZipMiddleware leaves the
+    response alone since it already carries Content-Encoding.
+    """
+
+    def __init__(self, request, data, *, min_size: int = 200, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        body = dumps(data)
+        coding = negotiate_encoding(request) if len(body) >= min_size else None
+        if coding:
+            compressed = compress(body, coding, fast=True)
+            if len(compressed) >= len(body):
+                coding = None
+            else:
+                body = compressed
+        super().__init__(body, **kwargs)
+        if coding:
+            self["Content-Encoding"] = coding
+        if len(body) >= min_size or coding:
+            patch_vary_headers(self, ("Accept-Encoding",))
+
+
+def cached_json_response(request, key: str, build, *, timeout: int, cache_name: str) -> HttpResponse:
+    """Serve ``build()`` as JSON through the cache.
+
+    The cache holds the encoded body with its compressed variants and ETag, so a
+    hit skips serialization and compression and can answer If-None-Match with a 304.
+
+    Misses are built from the primary: keys carry the catalog generation, and a
+    lagging replica would otherwise store a pre-change body under the new one.
+    """
+    body = cache.get(key)
+    record_cache_lookup(cache_name, body is not None)
+    if body is None:
+        with use_primary():
+            body = PrecompressedBody.build(dumps(build()), fast=True)
+        cache.set(key, body, timeout)
+    return body.response(request, content_type="application/json")
+
+
+async def acached_json_response(request, key: str, abuild, *, timeout: int, cache_name: str) -> HttpResponse:
+    """``cached_json_response`` for async views; ``abuild`` is a coroutine function."""
+    body = await cache.aget(key)
+    record_cache_lookup(cache_name, body is not None)
+    if body is None:
+        with use_primary():
+            body = PrecompressedBody.build(dumps(await abuild()), fast=True)
+        await cache.aset(key, body, timeout)
+    return body.response(request, content_type="application/json")
@@ -0,0 +1,16 @@
+"""MySQL backend (PyMySQL or mysqlclient) with a process-wide connection pool."""
+
+from django.db.backends.mysql import base
+
+from core.db_backends.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    @staticmethod
+    def ping_connection(raw) -> bool:
+        # Catches connections MySQL dropped after wait_timeout before a request trips over them.
+        try:
+            raw.ping()
+        except base.Database.Error:
+            return False
+        return True
@@ -0,0 +1,241 @@
+"""Process-wide connection pool for Django database backends.
+
+Django (5.2) pools only PostgreSQL connections. The backends in this package
+(``core.db_backends.mysql`` / ``core.db_backends.sqlite3``) wrap the stock
+ones so that ``get_new_connection`` checks a raw DB-API connection out of a
+``ConnectionPool`` and closing the Django connection hands it back instead of
+disconnecting. Run them with ``CONN_MAX_AGE=0``: every request returns its
+connection and the next request, on any thread, reuses it without the TCP and
+authentication round trips.
+
+Pool settings live in ``DATABASES[alias]["POOL"]``: ``SIZE`` idle connections
+kept, up to ``MAX_OVERFLOW`` extra under load, ``RECYCLE`` seconds before a
+connection is replaced, ``PRE_PING`` to check a connection before reuse, and
+``TIMEOUT`` seconds to wait for a free connection.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+from core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+pool_checked_out = registry.gauge(
+    "db_pool_connections_checked_out", "Pooled DB connections currently in use.", ("alias",)
+)
+pool_idle = registry.gauge("db_pool_connections_idle", "Pooled DB connections waiting for reuse.", ("alias",))
+pool_wait = registry.histogram(
+    "db_pool_wait_seconds", "Time to check out a pooled DB connection, including any connect.", ("alias",)
+)
+pool_events = registry.counter(
+    "db_pool_events_total",
+    "Pool connection lifecycle: opened, reused, recycled, overflow, ping_failed, discarded, timeout.",
+    ("alias", "event"),
+)
+
+DEFAULTS = {"SIZE": 5, "MAX_OVERFLOW": 10, "RECYCLE": 300, "PRE_PING": True, "TIMEOUT": 10}
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, alias: str, *, size: int, max_overflow: int, recycle: float, pre_ping: bool, timeout: float,
+                 ping=None):
+        self.alias = alias
+        self.size = max(0, size)
+        self.max_overflow = max(0, max_overflow)
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.timeout = timeout
+        self._ping = ping
+        self._cond = threading.Condition()
+        # LIFO: the most recently used connections stay warm, the rest age out via RECYCLE.
+        self._idle: deque[tuple[object, float]] = deque()
+        self._born: dict[int, float] = {}
+        self._checked_out = 0
+        self._pid = os.getpid()
+
+    @property
+    def checked_out(self) -> int:
+        return self._checked_out
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def _after_fork(self) -> None:
+        # Sockets inherited from the parent belong to it; drop them without closing.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle.clear()
+            self._born.clear()
+            self._checked_out = 0
+
+    def _update_gauges(self) -> None:
+        pool_checked_out.set(self._checked_out, alias=self.alias)
+        pool_idle.set(len(self._idle), alias=self.alias)
+
+    def acquire(self, connect):
+        """Return a usable raw connection, calling ``connect()`` when a new one is needed."""
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            self._after_fork()
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._checked_out < self.size + self.max_overflow:
+                    entry = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    pool_events.inc(alias=self.alias, event="timeout")
+                    raise PoolTimeout(
+                        f"No connection available in pool {self.alias!r} after {self.timeout}s "
+                        f"({self._checked_out} checked out)."
+                    )
+                self._cond.wait(remaining)
+            self._checked_out += 1
+            self._update_gauges()
+
+        try:
+            raw = self._usable(entry, connect)
+        except BaseException:
+            with self._cond:
+                self._checked_out -= 1
+                self._update_gauges()
+                self._cond.notify()
+            raise
+        pool_wait.observe(time.perf_counter() - started, alias=self.alias)
+        return raw
+
+    def _usable(self, entry, connect):
+        while entry is not None:
+            raw, born = entry
+            if self.recycle and time.monotonic() - born > self.recycle:
+                self._discard(raw, "recycled")
+            elif self.pre_ping and self._ping is not None and not self._ping(raw):
+                self._discard(raw, "ping_failed")
+            else:
+                pool_events.inc(alias=self.alias, event="reused")
+                return raw
+            with self._cond:
+                entry = self._idle.pop() if self._idle else None
+                self._update_gauges()
+
+        raw = connect()
+        self._born[id(raw)] = time.monotonic()
+        pool_events.inc(alias=self.alias, event="opened")
+        return raw
+
+    def release(self, raw, *, discard: bool = False) -> None:
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            self._checked_out = max(0, self._checked_out - 1)
+            born = self._born.get(id(raw), 0.0)
+            if discard:
+                event = "discarded"
+            elif self.recycle and time.monotonic() - born > self.recycle:
+                event = "recycled"
+            elif len(self._idle) >= self.size:
+                event = "overflow"
+            else:
+                event = None
+                self._idle.append((raw, born))
+            self._update_gauges()
+            self._cond.notify()
+        if event is not None:
+            self._discard(raw, event)
+
+    def _discard(self, raw, event: str) -> None:
+        self._born.pop(id(raw), None)
+        pool_events.inc(alias=self.alias, event=event)
+        try:
+            raw.close()
+        except Exception:
+            logger.debug("Closing a pooled %s connection failed", self.alias, exc_info=True)
+
+    def close(self) -> None:
+        """Close every idle connection (checked-out ones are closed when released)."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self.size = 0
+            self._update_gauges()
+        for raw, _born in idle:
+            self._discard(raw, "discarded")
+
+
+_pools: dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_for(alias: str, settings_dict: dict, *, ping=None) -> ConnectionPool:
+    # Keyed by target as well as alias: the test runner repoints NAME at the test database.
+    key = (alias, settings_dict.get("NAME"), settings_dict.get("HOST"), settings_dict.get("PORT"),
+           settings_dict.get("USER"))
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    options = {**DEFAULTS, **(settings_dict.get("POOL") or {})}
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(
+                alias,
+                size=int(options["SIZE"]),
+                max_overflow=int(options["MAX_OVERFLOW"]),
+                recycle=float(options["RECYCLE"]),
+                pre_ping=bool(options["PRE_PING"]),
+                timeout=float(options["TIMEOUT"]),
+                ping=ping,
+            )
+    return pool
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class PooledDatabaseWrapperMixin:
+    """Mixed into a backend's ``DatabaseWrapper`` ahead of the stock class."""
+
+    @staticmethod
+    def ping_connection(raw) -> bool:
+        return True
+
+    def _pool(self) -> ConnectionPool:
+        return pool_for(self.alias, self.settings_dict, ping=self.ping_connection)
+
+    def get_new_connection(self, conn_params):
+        return self._pool().acquire(lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params))
+
+    def _close(self):
+        raw = self.connection
+        if raw is None:
+            return
+        pool = self._pool()
+        # Closed mid-transaction, Django keeps the reference until rollback; never share it.
+        discard = self.in_atomic_block or (self.errors_occurred and not self.is_usable())
+        if not discard:
+            try:
+                raw.rollback()
+            except Exception:
+                discard = True
+        pool.release(raw, discard=discard)
@@ -0,0 +1,9 @@
+"""SQLite backend with the same connection pool, for development and benchmarks."""
+
+from django.db.backends.sqlite3 import base
+
+from core.db_backends.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
@@ -0,0 +1,105 @@
+"""Read-replica routing for catalog and content reads.
+
+When ``DATABASES["replica"]`` is configured, settings install ``ReplicaRouter``:
+reads of ``store``/``core`` content models made while serving a request go to
+the replica; everything else (writes, auth, sessions, analytics and auditing
+tables, and management commands or background tasks outside a request) stays
+on ``default``.
+
+Reads fall back to the primary while a write transaction is open on it, for
+the rest of a request once it has written a routed model, and for
+``DATABASE_REPLICA_STICKY_SECONDS`` after an unsafe request wrote one (the
+``ReplicaRoutingMiddleware`` sets a short-lived cookie), so a redirect after
+a POST reads its own writes despite replica lag.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY = DEFAULT_DB_ALIAS
+REPLICA = "replica"
+STICKY_COOKIE = "db_primary"
+
+ROUTED_APPS = frozenset({"store", "core"})
+# Write-heavy or transactional tables that are read right after being written.
+PRIMARY_ONLY_MODELS = frozenset(
+    {
+        "core.sitevisit",
+        "core.dailyvisitstat",
+        "core.contactmessage",
+        "store.manualinvoicesequence",
+        "store.cataloggeneration",
+    }
+)
+
+
+@dataclass
+class RoutingState:
+    pinned: bool = False
+    wrote: bool = False
+
+
+_state: ContextVar[RoutingState | None] = ContextVar("db_routing_state", default=None)
+
+
+def is_routed(model) -> bool:
+    meta = model._meta
+    return meta.app_label in ROUTED_APPS and meta.label_lower not in PRIMARY_ONLY_MODELS
+
+
+@contextmanager
+def routing_scope(*, pinned: bool = False):
+    """Track writes for one request (or task); yields its ``RoutingState``."""
+    state = RoutingState(pinned=pinned)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Read routed models from the primary inside the block."""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous = state.pinned
+    state.pinned = True
+    try:
+        yield
+    finally:
+        state.pinned = previous or state.wrote
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not is_routed(model):
+            return None
+        state = _state.get()
+        if state is None or state.pinned or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        if is_routed(model):
+            state = _state.get()
+            if state is not None:
+                state.pinned = state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {PRIMARY, REPLICA}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA:
+            return False
+        return None
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connections
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+MILLISECOND_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+_TOP_DUPLICATES = 10
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def fingerprint_sql(sql: str) -> str:
+    """Normalize SQL so the same statement with different parameters compares equal."""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class Histogram:
+    """Fixed-bucket histogram (upper bounds; the last bucket is +Inf)."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket containing quantile ``q`` (max for the overflow bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return float(self.bounds[index]) if index < len(self.bounds) else self.max
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "buckets": {
+                **{str(bound): n for bound, n in zip(self.bounds, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+@dataclass
+class RequestRecord:
+    view: str
+    queries: int
+    sql_ms: float
+    wall_ms: float
+    duplicates: dict[str, int]
+    budget: int | None
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.queries > self.budget
+
+
+@dataclass
+class ViewStats:
+    requests: int = 0
+    budget_violations: int = 0
+    queries: Histogram = field(default_factory=lambda: Histogram(QUERY_COUNT_BUCKETS))
+    sql_ms: Histogram = field(default_factory=lambda: Histogram(MILLISECOND_BUCKETS))
+    wall_ms: Histogram = field(default_factory=lambda: Histogram(MILLISECOND_BUCKETS))
+    duplicates: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "budget_violations": self.budget_violations,
+            "queries": self.queries.as_dict(),
+            "sql_ms": self.sql_ms.as_dict(),
+            "wall_ms": self.wall_ms.as_dict(),
+            "duplicate_queries": [
+                {"fingerprint": fp, "repeats": n} for fp, n in self.duplicates.most_common(_TOP_DUPLICATES)
+            ],
+        }
+
+
+class InstrumentationRegistry:
+    """Per-process aggregation of request records, keyed by view name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views: dict[str, ViewStats] = {}
+        self._listeners: list[list[RequestRecord]] = []
+
+    def record(self, record: RequestRecord) -> None:
+        with self._lock:
+            stats = self._views.get(record.view)
+            if stats is None:
+                stats = self._views[record.view] = ViewStats()
+            stats.requests += 1
+            stats.queries.observe(record.queries)
+            stats.sql_ms.observe(record.sql_ms)
+            stats.wall_ms.observe(record.wall_ms)
+            if record.over_budget:
+                stats.budget_violations += 1
+            for fp, repeats in record.duplicates.items():
+                stats.duplicates[fp] += repeats
+            for listener in self._listeners:
+                listener.append(record)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {view: stats.as_dict() for view, stats in sorted(self._views.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._views.clear()
+
+    @contextmanager
+    def capture(self):
+        """Collect the RequestRecords produced inside the block (for tests and load runs)."""
+        records: list[RequestRecord] = []
+        with self._lock:
+            self._listeners.append(records)
+        try:
+            yield records
+        finally:
+            with self._lock:
+                self._listeners.remove(records)
+
+
+registry = InstrumentationRegistry()
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` hook counting queries, SQL time and repeated statements."""
+
+    __slots__ = ("count", "elapsed", "fingerprints")
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - started
+            # Savepoint bookkeeping from atomic() blocks is not "work" for budget purposes.
+            if not sql.startswith(_TRANSACTION_CONTROL):
+                self.count += 1
+                self.fingerprints[fingerprint_sql(sql)] += 1
+
+    def duplicates(self) -> dict[str, int]:
+        return {fp: n for fp, n in self.fingerprints.items() if n > 1}
+
+    @contextmanager
+    def installed(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+
+def resolve_view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    func = match.func
+    view_class = getattr(func, "view_class", None)
+    if view_class is not None:
+        return view_class.__name__
+    return getattr(func, "__name__", None) or match.view_name or "<unknown>"
+
+
+def query_budget_for(view: str) -> int | None:
+    budgets = getattr(settings, "QUERY_BUDGETS", None) or {}
+    budget = budgets.get(view, getattr(settings, "QUERY_BUDGET_DEFAULT", None))
+    return int(budget) if budget is not None else None
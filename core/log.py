@@ -0,0 +1,251 @@
+"""Non-blocking, structured logging.
+
+``install_queue_logging`` (called from ``CoreConfig.ready`` when
+``LOG_QUEUE_ENABLED``) swaps every handler configured through ``LOGGING`` for
+a ``QueueForwarder`` that only enqueues the record; one ``LogQueueListener``
+thread per process writes them to the real handlers, so request threads never
+wait on file I/O or rotation locks. The queue is bounded (``LOG_QUEUE_SIZE``);
+when it is full records are dropped and counted instead of blocking.
+
+``RequestContextMiddleware`` puts a request id, client ip and start time in a
+context variable; ``RequestContextFilter`` copies them (plus the resolved view
+and the latency so far) onto each record in the thread that logs it, before it
+is queued, and ``JsonFormatter`` writes one JSON object per line.
+
+``ThrottleFilter`` bounds repeated records such as "Rate limit exceeded" per
+scope/ip: the first few per window pass, then one in ``sample`` does, carrying
+the number of records suppressed since the last one that passed.
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from core.instrumentation import resolve_view_name
+from core.metrics import registry
+
+log_records_dropped = registry.counter("log_records_dropped_total", "Log records dropped because the queue was full.")
+log_records_suppressed = registry.counter(
+    "log_records_suppressed_total", "Repeated log records suppressed by ThrottleFilter.", ("logger",)
+)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{8,64}")
+# Attributes every LogRecord has; anything else on a record came from ``extra=``.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_CONTEXT_ATTRS = ("request_id", "view", "ip", "latency_ms")
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    request_id: str
+    ip: str
+    started: float
+    request: object
+
+
+_request_context: ContextVar[RequestContext | None] = ContextVar("log_request_context", default=None)
+
+
+def current_request_id() -> str | None:
+    context = _request_context.get()
+    return context.request_id if context is not None else None
+
+
+def bind_request(request) -> object:
+    """Start the log context for ``request``; returns the token for ``unbind_request``."""
+    from auth_security.services import get_client_ip
+
+    incoming = request.headers.get(REQUEST_ID_HEADER, "")
+    request_id = incoming if _REQUEST_ID_PATTERN.fullmatch(incoming) else uuid.uuid4().hex
+    return _request_context.set(RequestContext(request_id, get_client_ip(request), time.perf_counter(), request))
+
+
+def unbind_request(token) -> None:
+    _request_context.reset(token)
+
+
+class RequestContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get()
+        if context is None or hasattr(record, "request_id"):
+            return True
+        record.request_id = context.request_id
+        record.ip = context.ip
+        record.view = resolve_view_name(context.request)
+        record.latency_ms = round((time.perf_counter() - context.started) * 1000, 2)
+        return True
+
+
+class ThrottleFilter(logging.Filter):
+    """Pass ``burst`` identical records per ``per`` seconds, then one in ``sample``.
+
+    Records are identical when logger, message template and the ``key_fields``
+    extras match. State is reset every window and capped at ``max_keys``.
+    """
+
+    def __init__(self, burst: int = 5, per: float = 60, sample: int = 100, key_fields=(), max_keys: int = 10_000):
+        super().__init__()
+        self.burst = burst
+        self.per = per
+        self.sample = max(1, sample)
+        self.key_fields = tuple(key_fields)
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._window_started = time.monotonic()
+        self._seen: dict[tuple, list[int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.msg, *(getattr(record, name, None) for name in self.key_fields))
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_started >= self.per:
+                self._window_started = now
+                self._seen.clear()
+            state = self._seen.get(key)
+            if state is None:
+                if len(self._seen) >= self.max_keys:
+                    key = (record.name, record.msg)  # under a key flood, throttle per message instead
+                    state = self._seen.setdefault(key, [0, 0])
+                else:
+                    state = self._seen[key] = [0, 0]
+            state[0] += 1
+            seen, suppressed = state
+            if seen <= self.burst or (seen - self.burst) % self.sample == 0:
+                state[1] = 0
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            state[1] += 1
+        log_records_suppressed.inc(logger=record.name)
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in _CONTEXT_ATTRS:
+            value = getattr(record, name, None)
+            if value is not None:
+                payload[name] = value
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS and name not in payload:
+                payload[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class QueueForwarder(logging.handlers.QueueHandler):
+    """Stands in for ``target`` on its loggers; the listener thread calls ``target``."""
+
+    def __init__(self, target: logging.Handler, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.target = target
+        self.setLevel(target.level)
+        self.addFilter(RequestContextFilter())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render args and tracebacks now (they may not be picklable or stay valid), keep the extras.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait((self.target, record))
+        except queue.Full:
+            log_records_dropped.inc()
+
+
+class LogQueueListener(logging.handlers.QueueListener):
+    def handle(self, item) -> None:
+        target, record = item
+        if record.levelno >= target.level:
+            target.handle(record)
+
+
+_listener: LogQueueListener | None = None
+_forwarders: list[QueueForwarder] = []
+
+
+def _wrap(handlers, log_queue, wrapped: dict) -> list[logging.Handler]:
+    result = []
+    for handler in handlers:
+        if isinstance(handler, QueueForwarder):
+            result.append(handler)
+            continue
+        if id(handler) not in wrapped:
+            wrapped[id(handler)] = QueueForwarder(handler, log_queue)
+        result.append(wrapped[id(handler)])
+    return result
+
+
+def install_queue_logging(maxsize: int = 10_000) -> LogQueueListener:
+    """Route every configured handler through one bounded queue and listener thread."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.Queue = queue.Queue(maxsize)
+    wrapped: dict[int, QueueForwarder] = {}
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)
+    ]
+    for logger in loggers:
+        if logger.handlers:
+            logger.handlers = _wrap(logger.handlers, log_queue, wrapped)
+
+    _forwarders[:] = wrapped.values()
+    _listener = LogQueueListener(log_queue)
+    _listener.start()
+    atexit.register(stop_queue_logging)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_restart_after_fork)
+    return _listener
+
+
+def _restart_after_fork() -> None:
+    # The listener thread does not survive fork; give the child its own queue and thread.
+    global _listener
+    if _listener is None:
+        return
+    log_queue: queue.Queue = queue.Queue(_listener.queue.maxsize)
+    for forwarder in _forwarders:
+        forwarder.queue = log_queue
+    _listener = LogQueueListener(log_queue)
+    _listener.start()
+
+
+def stop_queue_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
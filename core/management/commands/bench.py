@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.bench.runner import compare_reports, default_scenarios, load_report, run_benchmarks, write_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot catalog views through the test client and report p50/p95 latency and query counts. "
+        "Seed data first with `manage.py seed_catalog`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=30, help="Measured requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per scenario.")
+        parser.add_argument("--page-size", type=int, default=20, help="page_size for the api_products scenarios.")
+        parser.add_argument("--only", action="append", default=[], help="Run only these scenario names.")
+        parser.add_argument(
+            "--output",
+            help="JSON report path (default: tmp/bench/bench-<timestamp>.json under BASE_DIR).",
+        )
+        parser.add_argument("--compare", help="Previous JSON report to diff against.")
+
+    def handle(self, *args, **options):
+        scenarios = default_scenarios(page_size=max(1, options["page_size"]))
+        if options["only"]:
+            scenarios = [s for s in scenarios if s.name in set(options["only"])]
+            if not scenarios:
+                raise CommandError("No matching scenarios.")
+
+        report = run_benchmarks(scenarios, runs=max(1, options["runs"]), warmup=max(0, options["warmup"]))
+
+        dataset = report["dataset"]
+        self.stdout.write(
+            f"dataset: {dataset['categories']} categories, {dataset['products']} products, "
+            f"{dataset['images']} images, {dataset['reviews']} reviews ({report['database']})"
+        )
+        self.stdout.write(f"{'scenario':<20} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8}  statuses")
+        for name, row in report["scenarios"].items():
+            statuses = " ".join(f"{code}x{n}" for code, n in row["statuses"].items())
+            self.stdout.write(
+                f"{name:<20} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['queries_p50']:>8.0f}  {statuses}"
+            )
+
+        if options["compare"]:
+            try:
+                baseline = load_report(Path(options["compare"]))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+            self.stdout.write("")
+            self.stdout.write(f"vs {options['compare']} ({baseline.get('git_revision') or '?'}):")
+            for row in compare_reports(baseline, report):
+                self.stdout.write(
+                    f"{row['name']:<20} {row['p50_ms']:>+9.2f} {row['p95_ms']:>+9.2f} {row['queries_p50']:>+8.0f}"
+                )
+
+        output = options["output"]
+        if output:
+            path = Path(output)
+        else:
+            stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+            path = Path(settings.BASE_DIR) / "tmp" / "bench" / f"bench-{stamp}.json"
+        write_report(report, path)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {path}"))
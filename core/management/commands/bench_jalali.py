@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.utils.jalali import compile_jalali_format, format_jalali, format_jalali_many, jalali_date_parts
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark Jalali formatting (single calls vs. format_jalali_many)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=10_000, help="Number of datetimes to format.")
+        parser.add_argument("--days", type=int, default=365, help="Spread values across this many days.")
+        parser.add_argument("--format", dest="fmt", default="Y/m/d - H:i", help="Jalali format string.")
+
+    def handle(self, *args, **options):
+        count = max(1, int(options["count"]))
+        days = max(1, int(options["days"]))
+        fmt = options["fmt"]
+
+        start = timezone.now()
+        step = timedelta(seconds=days * 86400 // count or 1)
+        values: list[datetime] = [start - step * i for i in range(count)]
+
+        jalali_date_parts.cache_clear()
+        compile_jalali_format.cache_clear()
+        cold = self._time(lambda: [format_jalali(v, fmt) for v in values])
+        warm = self._time(lambda: [format_jalali(v, fmt) for v in values])
+        many = self._time(lambda: format_jalali_many(values, fmt))
+
+        self.stdout.write(f"values={count} distinct_days={days} fmt={fmt!r}")
+        for label, seconds in (("format_jalali (cold)", cold), ("format_jalali (warm)", warm), ("format_jalali_many", many)):
+            self.stdout.write(f"{label:<24} {seconds * 1000:8.2f} ms  {seconds / count * 1e6:6.2f} us/value")
+        self.stdout.write(f"date cache: {jalali_date_parts.cache_info()}")
+
+    @staticmethod
+    def _time(fn) -> float:
+        started = time.perf_counter()
+        fn()
+        return time.perf_counter() - started
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions and sessions with no data (left behind by anonymous "
+        "visit tracking), in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Only count what would be deleted.")
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        dry_run = options["dry_run"]
+        store = SessionStore()
+        now = timezone.now()
+        scanned = deleted = 0
+        last_key = ""
+
+        while True:
+            rows = list(
+                Session.objects.filter(session_key__gt=last_key)
+                .order_by("session_key")
+                .values_list("session_key", "session_data", "expire_date")[:batch_size]
+            )
+            if not rows:
+                break
+            last_key = rows[-1][0]
+            scanned += len(rows)
+            doomed = [key for key, data, expire_date in rows if expire_date <= now or not store.decode(data)]
+            if doomed and not dry_run:
+                Session.objects.filter(session_key__in=doomed).delete()
+            deleted += len(doomed)
+
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {deleted} of {scanned} session(s)."))
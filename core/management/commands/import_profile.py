@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bench.imports import LAZY_MODULES, app_module_costs, boot_worker, first_party_packages
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot a worker in a fresh interpreter under `python -X importtime` and report the import cost of "
+        "each project module, with the third-party packages it imports directly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=25, help="Show the N most expensive modules.")
+        parser.add_argument("--min-ms", type=float, default=0.0, help="Hide modules cheaper than this (cumulative).")
+        parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            boot = boot_worker(importtime=True)
+        except (OSError, RuntimeError) as exc:
+            raise CommandError(str(exc))
+
+        total_ms = sum(timing.cumulative_us for timing in boot.timings) / 1000
+        rows = app_module_costs(boot.timings, first_party_packages())
+        lazy_loaded = boot.loaded(LAZY_MODULES)
+
+        if options["json"]:
+            report = {"total_ms": total_ms, "modules": len(boot.modules), "lazy_loaded": lazy_loaded, "app_modules": rows}
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"worker boot: {len(boot.modules)} modules, {total_ms:.1f} ms of imports")
+        self.stdout.write(f"{'cumulative':>11} {'self':>8}  module")
+        shown = [row for row in rows if row["cumulative_ms"] >= options["min_ms"]][: max(1, options["limit"])]
+        for row in shown:
+            imports = ", ".join(f"{package} {ms:.1f}" for package, ms in list(row["imports"].items())[:4])
+            suffix = f"  <- {imports}" if imports else ""
+            self.stdout.write(
+                f"{row['cumulative_ms']:>8.1f} ms {row['self_ms']:>5.1f} ms  {row['module']}{suffix}"
+            )
+
+        if lazy_loaded:
+            self.stdout.write(self.style.WARNING(f"imported at boot but meant to be lazy: {', '.join(lazy_loaded)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"not imported at boot: {', '.join(LAZY_MODULES)}"))
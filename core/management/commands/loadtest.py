@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import os
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.bench.loadtest import (
+    API_MIX,
+    DEFAULT_MIX,
+    http_target,
+    in_process_target,
+    instrumentation_summary,
+    parse_mix,
+    run_load,
+)
+from core.bench.runner import quiet_request_errors
+
+
+class Command(BaseCommand):
+    help = (
+        "Closed-loop load test: N virtual users replay a weighted mix of catalog browsing, search, "
+        "product detail, contact and login traffic against shopproject.wsgi (in-process), "
+        "shopproject.asgi (--asgi) or --url. --compare runs the mix under both and reports the ratio."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="Base URL of a running server. Default: drive the WSGI app in-process.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Virtual users (threads).")
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run.")
+        parser.add_argument("--requests", type=int, help="Stop after this many requests in total.")
+        parser.add_argument(
+            "--mix",
+            help="Comma-separated action=weight pairs, or 'api' for the SPA's API traffic ("
+            + ", ".join(f"{k}={v}" for k, v in API_MIX.items())
+            + "). Default: "
+            + ", ".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+        )
+        parser.add_argument("--asgi", action="store_true", help="In-process: drive shopproject.asgi with the async API views.")
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="In-process: run the mix under WSGI (sync views) and then ASGI (async views) and compare throughput.",
+        )
+        parser.add_argument(
+            "--ips",
+            type=int,
+            help="Distinct client IPs shared by the users (default: one per user). Fewer IPs trip the rate limiters sooner.",
+        )
+        parser.add_argument("--think-ms", type=float, default=0.0, help="Mean think time between requests.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--token", default=os.getenv("HEALTH_CHECK_TOKEN", ""), help="HEALTH_CHECK_TOKEN for /metrics/ with --url.")
+        parser.add_argument("--real-email", action="store_true", help="In-process: keep EMAIL_BACKEND instead of the dummy backend.")
+        parser.add_argument("--output", help="JSON report path (default: tmp/loadtest/loadtest-<timestamp>.json).")
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options["compare"]:
+            if options["url"]:
+                raise CommandError("--compare drives both apps in-process; drop --url.")
+            reports = {server: self._run(mix, options, asgi=server == "asgi") for server in ("wsgi", "asgi")}
+            wsgi_rps, asgi_rps = reports["wsgi"]["throughput_rps"], reports["asgi"]["throughput_rps"]
+            report = {
+                "comparison": {
+                    "throughput_ratio_asgi_over_wsgi": round(asgi_rps / wsgi_rps, 3) if wsgi_rps else None,
+                    "p95_ms": {server: reports[server]["p95_ms"] for server in reports},
+                },
+                **reports,
+            }
+            self.stdout.write(
+                f"ASGI/WSGI throughput: {asgi_rps} / {wsgi_rps} req/s "
+                f"= {report['comparison']['throughput_ratio_asgi_over_wsgi']}x"
+            )
+        else:
+            report = self._run(mix, options, asgi=options["asgi"])
+        self._write_report(report, options["output"])
+
+    def _run(self, mix: dict, options: dict, *, asgi: bool) -> dict:
+        if options["url"]:
+            transport, snapshot = http_target(options["url"], token=options["token"])
+            overrides = nullcontext()
+            target = options["url"]
+        else:
+            transport, overrides, snapshot = in_process_target(real_email=options["real_email"], asgi=asgi)
+            target = "in-process (shopproject.asgi)" if asgi else "in-process (shopproject.wsgi)"
+
+        self.stdout.write(
+            f"target: {target}  concurrency={options['concurrency']}  duration={options['duration']}s  mix={mix}"
+        )
+        try:
+            with overrides, quiet_request_errors():
+                report = run_load(
+                    transport,
+                    mix=mix,
+                    concurrency=max(1, options["concurrency"]),
+                    duration=max(0.1, options["duration"]),
+                    max_requests=options["requests"],
+                    distinct_ips=options["ips"],
+                    think_ms=max(0.0, options["think_ms"]),
+                    seed=options["seed"],
+                    snapshot=snapshot,
+                )
+                if not options["url"]:
+                    report["instrumentation"] = instrumentation_summary()
+        finally:
+            close = getattr(transport, "close", None)
+            if close is not None:
+                close()
+        report["target"] = target
+        report["started_at"] = timezone.now().isoformat()
+
+        self.stdout.write(
+            f"{report['requests']} requests in {report['elapsed_s']}s = {report['throughput_rps']} req/s, "
+            f"errors {report['error_rate']:.2%}, p50 {report['p50_ms']} ms, p95 {report['p95_ms']} ms, p99 {report['p99_ms']} ms"
+        )
+        self.stdout.write(f"{'action':<16} {'reqs':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5} {'429':>5}")
+        for name, row in report["actions"].items():
+            self.stdout.write(
+                f"{name:<16} {row['requests']:>6} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+                f"{row['errors']:>5} {row['throttled']:>5}"
+            )
+        interesting = ("rate_limit_decisions", "login_protection_blocks", "site_visit_flush_seconds_count", "cache_requests")
+        for series, change in report["metrics_delta"].items():
+            if any(key in series for key in interesting):
+                self.stdout.write(f"  {series} +{change:g}")
+        return report
+
+    def _write_report(self, report: dict, output: str | None) -> None:
+        if output:
+            path = Path(output)
+        else:
+            stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+            path = Path(settings.BASE_DIR) / "tmp" / "loadtest" / f"loadtest-{stamp}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        self.stdout.write(self.style.SUCCESS(f"Report written to {path}"))
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+from .instrumentation import Histogram
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "shop_"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_FILE_PREFIX = "metrics-"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape_label(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{%s}" % ",".join(parts) if parts else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _worker_alive(path: Path) -> bool:
+    """Whether the worker that wrote ``metrics-<pid>.json`` is still running (on this host)."""
+    try:
+        pid = int(path.stem[len(_FILE_PREFIX):])
+        os.kill(pid, 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except OSError:  # e.g. EPERM: the pid exists but belongs to another user
+        return True
+    return True
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = METRIC_PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # One small lock per metric: updates only touch a dict slot, so contention stays negligible.
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def dump(self) -> list:
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """A value that goes up and down; per-worker values are summed at scrape time."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class LatencyHistogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        histogram = self._values.get(self._key(labels))
+        return histogram.count if histogram is not None else 0
+
+    def dump(self) -> list:
+        with self._lock:
+            return [[list(key), [list(h.counts), h.total, h.count]] for key, h in self._values.items()]
+
+
+class MetricsRegistry:
+    """Process-local metrics with optional per-worker files merged at scrape time.
+
+    When METRICS_MULTIPROCESS_DIR is set, every worker writes its own
+    ``metrics-<pid>.json`` (at most once per METRICS_FLUSH_INTERVAL seconds,
+    from the request thread) and the scraping worker sums all files. Workers
+    never read or lock each other's state. Counters and histograms of exited
+    workers still count; their gauges (a current value) do not.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS) -> LatencyHistogram:
+        return self.register(LatencyHistogram(name, documentation, labelnames, buckets))
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+    # -- multi-process support -------------------------------------------------
+
+    @staticmethod
+    def multiprocess_dir() -> Path | None:
+        raw = (getattr(settings, "METRICS_MULTIPROCESS_DIR", "") or "").strip()
+        return Path(raw) if raw else None
+
+    def dump(self) -> dict:
+        return {name: metric.dump() for name, metric in self._metrics.items()}
+
+    def flush(self) -> None:
+        directory = self.multiprocess_dir()
+        if directory is None:
+            return
+        with self._flush_lock:
+            self._last_flush = time.monotonic()
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+                target = directory / f"{_FILE_PREFIX}{os.getpid()}.json"
+                tmp = target.with_suffix(".tmp")
+                tmp.write_text(json.dumps(self.dump(), separators=(",", ":")), encoding="utf-8")
+                os.replace(tmp, target)
+            except OSError:
+                logger.exception("Failed to flush metrics to %s", directory)
+
+    def maybe_flush(self) -> None:
+        if self.multiprocess_dir() is None:
+            return
+        interval = float(getattr(settings, "METRICS_FLUSH_INTERVAL", 5) or 0)
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def collect(self) -> dict[str, dict[tuple, object]]:
+        """Return {metric name: {label values: value}} merged across worker files."""
+        directory = self.multiprocess_dir()
+        if directory is None:
+            dumps = [(self.dump(), True)]
+        else:
+            self.flush()
+            dumps = []
+            for path in sorted(directory.glob(f"{_FILE_PREFIX}*.json")):
+                try:
+                    dump = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    # A worker may be mid-rename; its next flush will be picked up on the next scrape.
+                    continue
+                dumps.append((dump, _worker_alive(path)))
+
+        merged: dict[str, dict[tuple, object]] = {name: {} for name in self._metrics}
+        for dump, alive in dumps:
+            for name, samples in dump.items():
+                metric = self._metrics.get(name)
+                if metric is None or (metric.kind == "gauge" and not alive):
+                    continue
+                target = merged[name]
+                for labels, value in samples:
+                    key = tuple(labels)
+                    if metric.kind in ("counter", "gauge"):
+                        target[key] = target.get(key, 0) + value
+                        continue
+                    counts, total, count = value
+                    if len(counts) != len(metric.buckets) + 1:
+                        continue
+                    current = target.get(key)
+                    if current is None:
+                        target[key] = [list(counts), total, count]
+                    else:
+                        current[0] = [a + b for a, b in zip(current[0], counts)]
+                        current[1] += total
+                        current[2] += count
+        return merged
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        merged = self.collect()
+        lines: list[str] = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(merged[name].items()):
+                if metric.kind in ("counter", "gauge"):
+                    lines.append(f"{name}{_format_labels(metric.labelnames, key)} {_format_number(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip((*metric.buckets, float("inf")), counts):
+                    cumulative += bucket_count
+                    le = 'le="%s"' % _format_number(bound)
+                    lines.append(f"{name}_bucket{_format_labels(metric.labelnames, key, le)} {cumulative}")
+                labels = _format_labels(metric.labelnames, key)
+                lines.append(f"{name}_sum{labels} {_format_number(round(total, 6))}")
+                lines.append(f"{name}_count{labels} {count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Request latency by resolved view.", ("view", "method")
+)
+http_requests = registry.counter(
+    "http_requests_total", "Requests by resolved view and status code.", ("view", "method", "status")
+)
+rate_limit_decisions = registry.counter(
+    "rate_limit_decisions_total", "check_rate_limit outcomes by scope.", ("scope", "decision")
+)
+login_protection_blocks = registry.counter(
+    "login_protection_blocks_total", "Login attempts rejected before authentication.", ("reason",)
+)
+otp_sends = registry.counter("otp_sends_total", "OTP challenge sends.", ("channel", "result"))
+otp_verifies = registry.counter("otp_verifies_total", "OTP token verifications.", ("channel", "result"))
+delivery_duration = registry.histogram(
+    "outbound_delivery_duration_seconds", "Time spent handing email/SMS to the provider.", ("channel", "purpose")
+)
+delivery_failures = registry.counter(
+    "outbound_delivery_failures_total", "Email/SMS sends that raised.", ("channel", "purpose")
+)
+cache_requests = registry.counter("cache_requests_total", "Cache lookups by consumer.", ("cache", "result"))
+site_visit_flush = registry.histogram(
+    "site_visit_flush_seconds", "Time spent recording SiteVisit/DailyVisitStat rows per request."
+)
+
+
+def record_cache_lookup(cache_name: str, hit: bool) -> None:
+    cache_requests.inc(cache=cache_name, result="hit" if hit else "miss")
+
+
+@contextmanager
+def timed_delivery(channel: str, purpose: str):
+    """Time an outbound email/SMS send and count it as failed if the block raises."""
+    started = time.perf_counter()
+    try:
+        with span(channel, purpose=purpose):
+            yield
+    except Exception:
+        delivery_failures.inc(channel=channel, purpose=purpose)
+        raise
+    finally:
+        delivery_duration.observe(time.perf_counter() - started, channel=channel, purpose=purpose)
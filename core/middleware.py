@@ -1,80 +1,233 @@
 from __future__ import annotations
 
 import logging
+import random
+import time
+from abc import ABC, abstractmethod
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
 from django.db.models import F
 from django.utils import timezone, translation
-
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from core import db_router, log, metrics, profiling, tracing, visitors
+from core.instrumentation import (
+    QueryRecorder,
+    RequestRecord,
+    query_budget_for,
+    registry,
+    resolve_view_name,
+)
 from core.models import DailyVisitStat, SiteVisit
 
 logger = logging.getLogger(__name__)
 error_logger = logging.getLogger("core.errors")
 
+_KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
 
-class AdminEnglishMiddleware:
-    """Force Django admin UI to English (LTR) while keeping the public site Persian."""
+
+class HybridMiddleware(ABC):
+    """Base for middleware that runs natively under both WSGI and ASGI.
+
+    Django builds the chain in async mode under ASGI; a sync-only middleware
+    anywhere in it would push every request (and async views) through a
+    thread. Subclasses must implement both ``handle`` (sync) and ``ahandle``
+    (async); a missing one fails when the middleware is instantiated.
+    """
+
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.ahandle(request)
+        return self.handle(request)
+
+    @abstractmethod
+    def handle(self, request):
+        ...
+
+    @abstractmethod
+    async def ahandle(self, request):
+        ...
+
+
+class RequestContextMiddleware(HybridMiddleware):
+    """Tag log records with a request id (echoed as X-Request-ID), view, ip and latency."""
+
+    def handle(self, request):
+        token = log.bind_request(request)
+        try:
+            response = self.get_response(request)
+            response[log.REQUEST_ID_HEADER] = log.current_request_id()
+            return response
+        finally:
+            log.unbind_request(token)
+
+    async def ahandle(self, request):
+        token = log.bind_request(request)
+        try:
+            response = await self.get_response(request)
+            response[log.REQUEST_ID_HEADER] = log.current_request_id()
+            return response
+        finally:
+            log.unbind_request(token)
+
+
+class TracingMiddleware(HybridMiddleware):
+    """Trace each request (see core.tracing) and log the slow ones as one structured line."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.enabled = getattr(settings, "TRACE_ENABLED", True)
+        self.slow_ms = float(getattr(settings, "TRACE_SLOW_MS", 500))
+        self.sample_rate = float(getattr(settings, "TRACE_SAMPLE_RATE", 1.0))
+
+    def handle(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        token = tracing.start_trace()
+        try:
+            response = self.get_response(request)
+            self._finish(request, response)
+            return response
+        finally:
+            tracing.end_trace(token)
+
+    async def ahandle(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        token = tracing.start_trace()
+        try:
+            response = await self.get_response(request)
+            self._finish(request, response)
+            return response
+        finally:
+            tracing.end_trace(token)
+
+    def _finish(self, request, response) -> None:
+        tracing.log_if_slow(
+            tracing.current_trace(),
+            request,
+            response.status_code,
+            slow_ms=self.slow_ms,
+            sample_rate=self.sample_rate,
+            rand=random.random,
+        )
+
+
+class WhiteNoiseMiddleware(HybridMiddleware, BaseWhiteNoiseMiddleware):
+    """WhiteNoise, async-capable: static files are served from a thread, everything else stays async."""
+
+    def __init__(self, get_response):
+        BaseWhiteNoiseMiddleware.__init__(self, get_response)
+        HybridMiddleware.__init__(self, get_response)
+
+    def handle(self, request):
+        return BaseWhiteNoiseMiddleware.__call__(self, request)
+
+    async def ahandle(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class AdminEnglishMiddleware(HybridMiddleware):
+    """Force Django admin UI to English (LTR) while keeping the public site Persian."""
+
+    def _activate(self, request) -> None:
+        if request.path.startswith("/admin"):
+            translation.activate("en")
+            request.LANGUAGE_CODE = "en"
+
+    def handle(self, request):
         previous_language = translation.get_language()
         try:
-            if request.path.startswith("/admin"):
-                translation.activate("en")
-                request.LANGUAGE_CODE = "en"
+            self._activate(request)
             return self.get_response(request)
         finally:
             translation.activate(previous_language)
 
+    async def ahandle(self, request):
+        previous_language = translation.get_language()
+        try:
+            self._activate(request)
+            return await self.get_response(request)
+        finally:
+            translation.activate(previous_language)
 
-class SiteVisitMiddleware:
-    """Track unique site visits per session per day for analytics."""
 
-    def __init__(self, get_response):
-        self.get_response = get_response
+class SiteVisitMiddleware(HybridMiddleware):
+    """Track unique site visits per visitor per day for analytics.
 
-    def __call__(self, request):
+    Visitors are identified by core.visitors (signed cookie / daily
+    fingerprint), so anonymous traffic never creates a session row;
+    ``SiteVisit.session_key`` holds that visitor id. Crawlers are skipped.
+    Under ASGI the writes run in a thread once the response is ready.
+    """
+
+    def handle(self, request):
         response = self.get_response(request)
+        if self._should_track(request):
+            self._record(request, response)
+        return response
 
-        try:
-            if request.method not in ("GET", "HEAD"):
-                return response
+    async def ahandle(self, request):
+        response = await self.get_response(request)
+        if self._should_track(request):
+            await sync_to_async(self._record)(request, response)
+        return response
+
+    @staticmethod
+    def _should_track(request) -> bool:
+        if request.method not in ("GET", "HEAD"):
+            return False
 
-            path = request.path or "/"
-            if path.startswith("/admin"):
-                return response
+        path = request.path or "/"
+        if path.startswith("/admin"):
+            return False
 
-            static_url = getattr(settings, "STATIC_URL", "/static/") or "/static/"
-            media_url = getattr(settings, "MEDIA_URL", "/media/") or "/media/"
-            if path.startswith(static_url) or path.startswith(media_url):
-                return response
+        static_url = getattr(settings, "STATIC_URL", "/static/") or "/static/"
+        media_url = getattr(settings, "MEDIA_URL", "/media/") or "/media/"
+        if path.startswith(static_url) or path.startswith(media_url):
+            return False
 
-            session = request.session
-            if not session.session_key:
-                session.save()
-            session_key = session.session_key
-            if not session_key:
-                return response
+        return not visitors.is_crawler(request.META.get("HTTP_USER_AGENT", ""))
 
+    @staticmethod
+    def _record(request, response) -> None:
+        started = time.perf_counter()
+        try:
+            visitor_key, set_cookie = visitors.visitor_id(request)
+            if set_cookie:
+                visitors.set_visitor_cookie(response, visitor_key)
+
+            user = getattr(request, "user", None)
+            is_authenticated = bool(user is not None and user.is_authenticated)
             visited_on = timezone.localdate()
-            defaults = {"first_path": path}
-            if request.user.is_authenticated:
-                defaults["user"] = request.user
+            defaults = {"first_path": (request.path or "/")[:200]}
+            if is_authenticated:
+                defaults["user"] = user
 
             visit, created = SiteVisit.objects.get_or_create(
-                session_key=session_key,
+                session_key=visitor_key,
                 visited_on=visited_on,
                 defaults=defaults,
             )
 
-            if request.user.is_authenticated:
-                SiteVisit.objects.filter(
-                    session_key=session_key,
-                    visited_on=visited_on,
-                    user__isnull=True,
-                ).update(user=request.user)
+            if is_authenticated and visit.user_id is None:
+                SiteVisit.objects.filter(pk=visit.pk, user__isnull=True).update(user=user)
 
             stat, _created = DailyVisitStat.objects.get_or_create(date=visited_on)
             DailyVisitStat.objects.filter(pk=stat.pk).update(total_hits=F("total_hits") + 1)
@@ -82,24 +235,61 @@ class SiteVisitMiddleware:
                 DailyVisitStat.objects.filter(pk=stat.pk).update(
                     unique_sessions=F("unique_sessions") + 1
                 )
+            metrics.site_visit_flush.observe(time.perf_counter() - started)
         except Exception:
             logger.exception("Failed to record site visit")
 
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """Scope read-replica routing to the request (see ``core.db_router``).
+
+    Unsafe methods and clients inside their sticky window read from the
+    primary; an unsafe request that wrote a routed model opens that window.
+    Safe requests that write (view counters) stay pinned only for themselves.
+    """
+
+    def handle(self, request):
+        with db_router.routing_scope(pinned=self._pinned(request)) as state:
+            response = self.get_response(request)
+        return self._finish(request, response, state)
+
+    async def ahandle(self, request):
+        with db_router.routing_scope(pinned=self._pinned(request)) as state:
+            response = await self.get_response(request)
+        return self._finish(request, response, state)
+
+    @staticmethod
+    def _pinned(request) -> bool:
+        return request.method not in ("GET", "HEAD", "OPTIONS") or db_router.STICKY_COOKIE in request.COOKIES
+
+    @staticmethod
+    def _finish(request, response, state):
+        if state.wrote and request.method not in ("GET", "HEAD", "OPTIONS"):
+            response.set_cookie(
+                db_router.STICKY_COOKIE,
+                "1",
+                max_age=getattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 10),
+                secure=getattr(settings, "SESSION_COOKIE_SECURE", False),
+                httponly=True,
+                samesite="Lax",
+            )
         return response
 
 
-class SecurityHeadersMiddleware:
+class SecurityHeadersMiddleware(HybridMiddleware):
     """Add strict security headers (CSP, clickjacking, XSS)."""
 
-    def __init__(self, get_response):
-        self.get_response = get_response
+    def handle(self, request):
+        return self._apply(self.get_response(request))
 
-    def __call__(self, request):
+    async def ahandle(self, request):
+        return self._apply(await self.get_response(request))
+
+    @staticmethod
+    def _apply(response):
         from core.security import build_csp_header
         from django.conf import settings
 
-        response = self.get_response(request)
-
         csp_value = build_csp_header()
         if csp_value:
             response["Content-Security-Policy"] = csp_value
@@ -111,22 +301,134 @@ class SecurityHeadersMiddleware:
         return response
 
 
-class ExceptionLoggingMiddleware:
+class ExceptionLoggingMiddleware(HybridMiddleware):
     """Log unhandled exceptions for centralized monitoring."""
 
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request):
+    def handle(self, request):
         try:
             return self.get_response(request)
         except Exception:
-            error_logger.exception(
-                "Unhandled exception",
-                extra={
-                    "path": request.path,
-                    "method": request.method,
-                    "user": getattr(request.user, "id", None),
-                },
-            )
+            self._log(request, getattr(request.user, "id", None))
             raise
+
+    async def ahandle(self, request):
+        try:
+            return await self.get_response(request)
+        except Exception:
+            user = await request.auser() if hasattr(request, "auser") else None
+            self._log(request, getattr(user, "id", None))
+            raise
+
+    @staticmethod
+    def _log(request, user_id) -> None:
+        error_logger.exception(
+            "Unhandled exception",
+            extra={
+                "path": request.path,
+                "method": request.method,
+                "user": user_id,
+            },
+        )
+
+
+class RequestInstrumentationMiddleware(HybridMiddleware):
+    """Record per-view query count, SQL time, repeated queries and wall time.
+
+    Aggregates are kept in-process (core.instrumentation.registry) and exposed to
+    staff via core.views.instrumentation_stats. Views that exceed their configured
+    QUERY_BUDGETS entry are logged as warnings. Latency and status counts always
+    feed the Prometheus metrics in core.metrics, even with query tracking off.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.enabled = getattr(settings, "REQUEST_INSTRUMENTATION_ENABLED", True)
+
+    def handle(self, request):
+        if not self.enabled:
+            started = time.perf_counter()
+            response = self.get_response(request)
+            self._observe(request, response, resolve_view_name(request), time.perf_counter() - started)
+            return response
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with recorder.installed():
+            response = self.get_response(request)
+        self._record(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    async def ahandle(self, request):
+        if not self.enabled:
+            started = time.perf_counter()
+            response = await self.get_response(request)
+            self._observe(request, response, resolve_view_name(request), time.perf_counter() - started)
+            return response
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with recorder.installed():
+            response = await self.get_response(request)
+        self._record(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    def _record(self, request, response, recorder: QueryRecorder, elapsed: float) -> None:
+        wall_ms = elapsed * 1000
+        try:
+            view = resolve_view_name(request)
+            self._observe(request, response, view, elapsed)
+            record = RequestRecord(
+                view=view,
+                queries=recorder.count,
+                sql_ms=recorder.elapsed * 1000,
+                wall_ms=wall_ms,
+                duplicates=recorder.duplicates(),
+                budget=query_budget_for(view),
+            )
+            registry.record(record)
+            if record.over_budget:
+                logger.warning(
+                    "Query budget exceeded",
+                    extra={
+                        "view": view,
+                        "path": request.path,
+                        "queries": record.queries,
+                        "budget": record.budget,
+                        "duplicates": len(record.duplicates),
+                    },
+                )
+        except Exception:
+            logger.exception("Failed to record request instrumentation")
+
+    @staticmethod
+    def _observe(request, response, view: str, elapsed: float) -> None:
+        try:
+            # Arbitrary client-supplied verbs would otherwise create unbounded label sets.
+            method = request.method if request.method in _KNOWN_METHODS else "OTHER"
+            metrics.http_request_duration.observe(elapsed, view=view, method=method)
+            metrics.http_requests.inc(view=view, method=method, status=response.status_code)
+            metrics.registry.maybe_flush()
+        except Exception:
+            logger.exception("Failed to record request metrics")
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    """cProfile a PROFILE_SAMPLE_RATE share of requests, and staff requests sending X-Profile.
+
+    Keep it last in MIDDLEWARE so the profile covers the view and its template
+    rendering only. ASGI requests pass straight through (see core.profiling).
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sample_rate = float(getattr(settings, "PROFILE_SAMPLE_RATE", 0.0))
+
+    def handle(self, request):
+        if random.random() >= self.sample_rate and not (
+            profiling.PROFILE_HEADER_META in request.META and request.user.is_staff
+        ):
+            return self.get_response(request)
+        return profiling.profile_request(request, self.get_response)
+
+    async def ahandle(self, request):
+        return await self.get_response(request)
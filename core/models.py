@@ -1,7 +1,8 @@
 ﻿from django.conf import settings
 from django.db import models
 from django.utils import timezone
-from django.utils.text import slugify
+
+from core.utils.slugs import slugged_save
 
 
 class News(models.Model):
@@ -21,15 +22,7 @@ class News(models.Model):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base = slugify(self.title, allow_unicode=True) or "project"
-            candidate = base
-            suffix = 1
-            while News.objects.filter(slug=candidate).exclude(pk=self.pk).exists():
-                candidate = f"{base}-{suffix}"
-                suffix += 1
-            self.slug = candidate
-        super().save(*args, **kwargs)
+        return slugged_save(self, super().save, *args, source=self.title, fallback="project", **kwargs)
 
 
 class Download(models.Model):
@@ -49,15 +42,7 @@ class Download(models.Model):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base = slugify(self.title, allow_unicode=True) or "download"
-            candidate = base
-            suffix = 1
-            while Download.objects.filter(slug=candidate).exclude(pk=self.pk).exists():
-                candidate = f"{base}-{suffix}"
-                suffix += 1
-            self.slug = candidate
-        super().save(*args, **kwargs)
+        return slugged_save(self, super().save, *args, source=self.title, fallback="download", **kwargs)
 
 
 class ContactMessage(models.Model):
@@ -0,0 +1,142 @@
+"""Service packages (Basic / VIP / CIP) and their precomputed JSON bodies.
+
+The package data is static, so the API bodies are serialized once per process
+(on first use) together with their brotli/gzip variants and strong ETags; a
+request is a dict lookup plus an If-None-Match check. The same data is
+inlined into the React shell bootstrap (core.spa).
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+
+from .compression import PrecompressedBody
+
+PACKAGE_DATA = {
+    "basic": {
+        "type": "Basic",
+        "title": "راه‌اندازی استاندارد (Basic)",
+        "subtitle": "شروعی مطمئن و اقتصادی برای کسب‌وکارهای نوپا با تمرکز بر استانداردهای ضروری.",
+        "description": (
+            "این پکیج برای کارآفرینانی طراحی شده که می‌خواهند با بودجه‌ای مدیریت‌شده، "
+            "آشپزخانه‌ای استاندارد و قابل اخذ مجوز داشته باشند. تمرکز ما بر انتخاب "
+            "تجهیزات اصلی و چیدمان صحیح برای مسیرهای کاری سالم است."
+        ),
+        "features": [
+            "طراحی پلن دوبعدی (2D) چیدمان تجهیزات",
+            "مشاوره خرید تجهیزات اصلی و تهیه لیست ضروری",
+            "نظارت بر نصب و تاسیسات پایه",
+            "آموزش اولیه کار با دستگاه‌ها",
+        ],
+        "targets": [
+            "کافه‌های کوچک و اقتصادی",
+            "فست‌فودهای بیرون‌بر",
+            "کترینگ‌های خانگی و نوپا",
+        ],
+        "audience": [
+            "کافه‌های کوچک و اقتصادی",
+            "فست‌فودهای بیرون‌بر",
+            "کترینگ‌های خانگی و نوپا",
+        ],
+        "estimated_time": "۲۰ تا ۳۰ روز کاری",
+        "supervision_level": "نظارت پایه و کنترل استاندارد",
+    },
+    "vip": {
+        "type": "VIP",
+        "title": "مهندسی منو و فرآیند (VIP)",
+        "subtitle": "بهینه‌سازی دقیق گردش کار برای مجموعه‌هایی که حجم سفارش بالا و حساسیت عملیاتی دارند.",
+        "description": (
+            "در پکیج VIP فراتر از چیدمان حرکت می‌کنیم. تمرکز بر مهندسی منو و "
+            "طراحی فرآیند است تا تجهیزات بر اساس ظرفیت دقیق پخت انتخاب شوند و "
+            "پرت انرژی و نیروی انسانی به حداقل برسد."
+        ),
+        "features": [
+            "تمام خدمات پکیج Basic",
+            "تحلیل و آنالیز منو و تعیین ظرفیت دقیق پخت",
+            "طراحی جریان کاری (Workflow) برای سرعت سرویس‌دهی",
+            "انتخاب تجهیزات تخصصی و برندهای میان‌رده با دوام بالا",
+            "تست عملکردی منو (Recipe Calibration)",
+        ],
+        "targets": [
+            "رستوران‌های ایرانی و فرنگی متوسط",
+            "فودکورت‌ها و آشپزخانه‌های پرتردد",
+            "کافه‌رستوران‌های با حجم سفارش بالا",
+        ],
+        "audience": [
+            "رستوران‌های ایرانی و فرنگی متوسط",
+            "فودکورت‌ها و آشپزخانه‌های پرتردد",
+            "کافه‌رستوران‌های با حجم سفارش بالا",
+        ],
+        "estimated_time": "۴۵ تا ۶۰ روز کاری",
+        "supervision_level": "نظارت پیشرفته و کنترل فرآیند",
+    },
+    "cip": {
+        "type": "CIP",
+        "title": "راه‌اندازی جامع و کلید تحویل (CIP)",
+        "subtitle": "از ایده تا افتتاحیه؛ مدیریت صفر تا صد پروژه با استانداردهای اجرایی کامل.",
+        "description": (
+            "این کامل‌ترین سطح خدمات است. ما به‌عنوان بازوی اجرایی شما عمل می‌کنیم؛ "
+            "از برندینگ و کانسپت‌سازی تا خرید تجهیزات و آماده‌سازی بهره‌برداری، "
+            "همه‌چیز تحت مدیریت یکپارچه انجام می‌شود."
+        ),
+        "features": [
+            "مدیریت پیمان کامل (طراحی، خرید، اجرا)",
+            "استخدام و آموزش حرفه‌ای پرسنل آشپزخانه و سالن",
+            "هماهنگی با تیم‌های معماری و برندینگ",
+            "تامین تجهیزات از برندهای تاپ‌لول جهانی",
+            "راه‌اندازی نرم‌افزاری و سیستم‌های کنترل هزینه",
+            "پشتیبانی ویژه پس از افتتاح",
+        ],
+        "targets": [
+            "هتل‌ها و مجموعه‌های بزرگ",
+            "رستوران‌های زنجیره‌ای",
+            "سرمایه‌گذاران بدون تیم اجرایی",
+            "پروژه‌های لوکس و برند محور",
+        ],
+        "audience": [
+            "هتل‌ها و مجموعه‌های بزرگ",
+            "رستوران‌های زنجیره‌ای",
+            "سرمایه‌گذاران بدون تیم اجرایی",
+            "پروژه‌های لوکس و برند محور",
+        ],
+        "estimated_time": "۳ تا ۶ ماه",
+        "supervision_level": "مدیریت یکپارچه و نظارت کامل",
+    },
+}
+
+_lock = threading.Lock()
+_bodies: dict[str | None, PrecompressedBody] | None = None
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _build_bodies() -> dict[str | None, PrecompressedBody]:
+    bodies: dict[str | None, PrecompressedBody] = {
+        key: PrecompressedBody.build(_encode(dict(package, key=key))) for key, package in PACKAGE_DATA.items()
+    }
+    bodies[None] = PrecompressedBody.build(
+        _encode({"packages": [dict(package, key=key) for key, package in PACKAGE_DATA.items()]})
+    )
+    return bodies
+
+
+def _get_bodies() -> dict[str | None, PrecompressedBody]:
+    global _bodies
+    bodies = _bodies
+    if bodies is None:
+        with _lock:
+            if _bodies is None:
+                _bodies = _build_bodies()
+            bodies = _bodies
+    return bodies
+
+
+def package_body(package_key: str) -> PrecompressedBody | None:
+    return _get_bodies().get(package_key)
+
+
+def package_list_body() -> PrecompressedBody:
+    return _get_bodies()[None]
@@ -0,0 +1,189 @@
+"""Sampled cProfile runs of production requests.
+
+``ProfilingMiddleware`` (innermost in ``MIDDLEWARE``) profiles the view and
+template rendering of a random ``PROFILE_SAMPLE_RATE`` share of requests, plus
+any staff request that sends ``X-Profile``. Everything else costs one
+``random()`` call and a header lookup.
+
+Each profile is reduced to its ``PROFILE_TOP_N`` functions by cumulative time
+and the caller/callee edges between them, and kept in a per-view ring buffer
+of ``PROFILE_BUFFER_SIZE`` samples. ``store.report()`` sums the buffer per
+view: the top functions, and collapsed stacks ("view;caller;callee ms"
+lines, as read by flamegraph.pl and speedscope) rebuilt from the edges.
+``core.views.profile_report`` serves it to staff. Samples live in this
+process only; each worker keeps its own.
+
+Only one request per process is profiled at a time, and requests under ASGI
+are not profiled at all: cProfile only sees the thread that enabled it, which
+the event loop shares with every other request.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from core.instrumentation import resolve_view_name
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_HEADER_META = "HTTP_X_PROFILE"
+MAX_FLAME_DEPTH = 48
+MAX_FLAME_NODES = 2000
+
+_STRIP_PREFIXES = tuple(
+    sorted({os.path.join(str(path), "") for path in (settings.BASE_DIR, *sys.path) if path}, key=len, reverse=True)
+)
+
+
+def _label(func: tuple[str, int, str]) -> str:
+    filename, lineno, name = func
+    if filename == "~":  # built-ins, e.g. "<built-in method time.sleep>"
+        return name
+    for prefix in _STRIP_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    return f"{filename}:{lineno}({name})"
+
+
+@dataclass(frozen=True)
+class ProfileSample:
+    # (label, calls, tottime, cumtime) for the top functions, by cumtime
+    functions: tuple[tuple[str, int, float, float], ...]
+    # (caller, callee) -> cumulative seconds spent in callee when called from caller
+    edges: dict[tuple[str, str], float]
+
+
+def summarize(stats, top_n: int) -> ProfileSample:
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top_n]
+    labels = {func: _label(func) for func, _ in rows}
+    functions = tuple((labels[func], nc, tt, ct) for func, (_cc, nc, tt, ct, _callers) in rows)
+    edges = {}
+    for func, (*_totals, callers) in rows:
+        for caller, caller_totals in callers.items():
+            if caller in labels:
+                edges[(labels[caller], labels[func])] = caller_totals[3]
+    return ProfileSample(functions, edges)
+
+
+def collapsed_stacks(view: str, functions: dict[str, float], edges: dict[tuple[str, str], float]) -> list[str]:
+    """Rebuild "view;a;b self_ms" lines from summed cumulative times and call edges."""
+    children: dict[str, list[tuple[str, float]]] = defaultdict(list)
+    called = set()
+    for (caller, callee), seconds in edges.items():
+        if caller != callee:
+            children[caller].append((callee, seconds))
+            called.add(callee)
+    lines: list[str] = []
+    budget = [MAX_FLAME_NODES]
+
+    def walk(path: list[str], seconds: float) -> None:
+        budget[0] -= 1
+        if budget[0] < 0:
+            return
+        below = 0.0
+        if len(path) < MAX_FLAME_DEPTH:
+            for callee, child_seconds in sorted(children[path[-1]], key=lambda child: -child[1]):
+                if callee in path:
+                    continue
+                child_seconds = min(child_seconds, seconds - below)
+                if child_seconds <= 0:
+                    continue
+                below += child_seconds
+                walk(path + [callee], child_seconds)
+        own = seconds - below
+        if own * 1000 >= 0.01:
+            lines.append(f"{';'.join([view, *path])} {own * 1000:.2f}")
+
+    for root in sorted(set(functions) - called, key=lambda label: -functions[label]):
+        walk([root], functions[root])
+    return lines
+
+
+class ProfileStore:
+    """Per-process ring buffers of ProfileSamples, keyed by view name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views: dict[str, deque[ProfileSample]] = {}
+
+    def record(self, view: str, sample: ProfileSample, size: int) -> None:
+        with self._lock:
+            samples = self._views.get(view)
+            if samples is None or samples.maxlen != size:
+                samples = self._views[view] = deque(samples or (), maxlen=size)
+            samples.append(sample)
+
+    def report(self, view: str | None = None, limit: int = 30) -> dict[str, dict]:
+        with self._lock:
+            views = {name: list(samples) for name, samples in self._views.items() if view in (None, name)}
+        return {name: self._aggregate(name, samples, limit) for name, samples in sorted(views.items())}
+
+    def _aggregate(self, view: str, samples: list[ProfileSample], limit: int) -> dict:
+        calls: dict[str, int] = defaultdict(int)
+        tottime: dict[str, float] = defaultdict(float)
+        cumtime: dict[str, float] = defaultdict(float)
+        edges: dict[tuple[str, str], float] = defaultdict(float)
+        for sample in samples:
+            for label, nc, tt, ct in sample.functions:
+                calls[label] += nc
+                tottime[label] += tt
+                cumtime[label] += ct
+            for edge, seconds in sample.edges.items():
+                edges[edge] += seconds
+
+        count = len(samples)
+        top = sorted(cumtime, key=cumtime.get, reverse=True)[:limit]
+        return {
+            "samples": count,
+            "top": [
+                {
+                    "function": label,
+                    "calls": calls[label],
+                    "tottime_ms": round(tottime[label] * 1000, 2),
+                    "cumtime_ms": round(cumtime[label] * 1000, 2),
+                    "cumtime_ms_per_sample": round(cumtime[label] * 1000 / count, 2),
+                }
+                for label in top
+            ],
+            "flame": collapsed_stacks(view, cumtime, edges),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._views.clear()
+
+
+store = ProfileStore()
+_profiling = threading.Lock()
+
+
+def profile_request(request, get_response):
+    """Run ``get_response`` under cProfile and file the result under the request's view."""
+    import cProfile  # with pstats, a few ms at worker boot for a rarely taken path
+    import pstats
+
+    if not _profiling.acquire(blocking=False):
+        return get_response(request)
+    try:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler (debugger, coverage) owns the hook
+            return get_response(request)
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+    finally:
+        _profiling.release()
+
+    top_n = int(getattr(settings, "PROFILE_TOP_N", 30))
+    size = int(getattr(settings, "PROFILE_BUFFER_SIZE", 50))
+    store.record(resolve_view_name(request), summarize(pstats.Stats(profiler), top_n), size)
+    return response
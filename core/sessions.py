@@ -0,0 +1,95 @@
+"""Hybrid session engine (``SESSION_ENGINE = "core.sessions"``).
+
+Sessions live in the cache (``SESSION_CACHE_ALIAS``) and are written through
+to ``django_session`` only when they belong to staff, marked by
+``PERSIST_SESSION_KEY`` at login (see core.signals). Anonymous and customer
+sessions are never written to the database (a cache miss still costs one
+lookup, as with ``cached_db``); staff sessions behave like ``cached_db``:
+reads come from the cache and survive cache eviction or restarts.
+
+The cache must be shared by every worker (``CACHE_URL``): on a per-process
+cache a session would only exist in the worker that created it, and a logout
+would leave it valid in the others. ``core.checks`` enforces this.
+
+Expired rows are purged in batches: ``clearsessions`` deletes them all, and a
+staff session save deletes one batch at most every ``SESSION_PURGE_INTERVAL``
+seconds.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.base import CreateError, UpdateError
+from django.core.cache import caches
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PERSIST_SESSION_KEY = "_persist"
+PURGE_GATE_KEY = "core:sessions:purge"
+
+
+def _setting_int(name: str, default: int) -> int:
+    try:
+        return int(getattr(settings, name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class SessionStore(cached_db.SessionStore):
+    def is_persistent(self, no_load: bool = False) -> bool:
+        return bool(self._get_session(no_load=no_load).get(PERSIST_SESSION_KEY))
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        if not self.is_persistent(no_load=must_create):
+            return self._save_to_cache(must_create)
+        try:
+            super().save(must_create=must_create)
+        except UpdateError:
+            # The session was cache-only until now (staff just logged in): insert its row.
+            super().save(must_create=True)
+        self._maybe_purge()
+
+    def _save_to_cache(self, must_create: bool) -> None:
+        data = self._get_session(no_load=must_create)
+        if must_create:
+            if not self._cache.add(self.cache_key, data, self.get_expiry_age()):
+                raise CreateError
+        else:
+            self._cache.set(self.cache_key, data, self.get_expiry_age())
+
+    @classmethod
+    def purge_batch(cls, batch_size: int | None = None) -> int:
+        """Delete up to ``batch_size`` expired session rows; return how many were deleted."""
+        batch_size = batch_size or _setting_int("SESSION_PURGE_BATCH_SIZE", 500)
+        model = cls.get_model_class()
+        keys = list(
+            model.objects.filter(expire_date__lt=timezone.now()).values_list("session_key", flat=True)[:batch_size]
+        )
+        if keys:
+            model.objects.filter(session_key__in=keys).delete()
+        return len(keys)
+
+    @classmethod
+    def clear_expired(cls):
+        batch_size = _setting_int("SESSION_PURGE_BATCH_SIZE", 500)
+        while cls.purge_batch(batch_size) == batch_size:
+            pass
+
+    @classmethod
+    def _maybe_purge(cls) -> None:
+        interval = _setting_int("SESSION_PURGE_INTERVAL", 300)
+        if interval <= 0:
+            return
+        cache = caches[settings.SESSION_CACHE_ALIAS]
+        try:
+            if not cache.add(PURGE_GATE_KEY, 1, interval):
+                return
+            cls.purge_batch()
+        except Exception:
+            logger.exception("Expired session purge failed")
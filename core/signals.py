@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from store.models import Category
+
+from .models import PaymentSettings
+from .sessions import PERSIST_SESSION_KEY
+from .spa import invalidate_bootstrap
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=PaymentSettings)
+@receiver(post_delete, sender=PaymentSettings)
+def invalidate_spa_bootstrap(sender, **kwargs):
+    """Categories and contact settings are inlined into the React shell; rebuild on change."""
+    invalidate_bootstrap()
+
+
+@receiver(user_logged_in)
+def persist_staff_session(sender, request, user, **kwargs):
+    """Staff sessions are written through to the DB by core.sessions; everyone else stays cache-only."""
+    if request is not None and user.is_staff and hasattr(request, "session"):
+        request.session[PERSIST_SESSION_KEY] = True
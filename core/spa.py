@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.html import json_script
+
+from .compression import PrecompressedBody
+from .metrics import record_cache_lookup
+
+BOOTSTRAP_CACHE_KEY = "spa:bootstrap"
+BOOTSTRAP_CACHE_TIMEOUT = 60 * 60
+BOOTSTRAP_ELEMENT_ID = "app-bootstrap"
+_MAX_RENDERED = 16
+
+
+@dataclass(frozen=True)
+class Shell:
+    html: str
+    mtime_ns: int
+    digest: str
+
+
+_lock = threading.Lock()
+_shell: Shell | None = None
+_rendered: OrderedDict[tuple, PrecompressedBody] = OrderedDict()
+
+
+def shell_path() -> Path:
+    base_dir = Path(getattr(settings, "BASE_DIR", Path.cwd()))
+    return base_dir / "frontend" / "dist" / "index.html"
+
+
+def get_shell() -> Shell | None:
+    """Return the built index.html, read once per process.
+
+    In DEBUG the file's mtime is checked on every call so rebuilt assets show up
+    without restarting the dev server. Returns None when the frontend is not built.
+    """
+    global _shell
+    shell = _shell
+    if shell is not None and not settings.DEBUG:
+        return shell
+
+    path = shell_path()
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if shell is not None and shell.mtime_ns == mtime_ns:
+        return shell
+
+    with _lock:
+        if _shell is None or _shell.mtime_ns != mtime_ns:
+            html = path.read_text(encoding="utf-8")
+            _shell = Shell(html=html, mtime_ns=mtime_ns, digest=hashlib.sha256(html.encode("utf-8")).hexdigest()[:16])
+            _rendered.clear()
+        return _shell
+
+
+def _build_bootstrap_data(request) -> dict:
+    from store.models import Category
+
+    from .context_processors import site_info
+    from .packages import PACKAGE_DATA
+
+    return {
+        "categories": list(Category.objects.order_by("name").values("id", "name", "slug")),
+        "packages": PACKAGE_DATA,
+        "site_info": site_info(request),
+    }
+
+
+def get_bootstrap(request) -> tuple[str, dict]:
+    """Return (digest, data) for the shared (not per-user) part of the bootstrap blob."""
+    cached = cache.get(BOOTSTRAP_CACHE_KEY)
+    record_cache_lookup("spa_bootstrap", cached is not None)
+    if cached is None:
+        data = _build_bootstrap_data(request)
+        encoded = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode("utf-8")
+        cached = (hashlib.sha256(encoded).hexdigest()[:16], data)
+        cache.set(BOOTSTRAP_CACHE_KEY, cached, BOOTSTRAP_CACHE_TIMEOUT)
+    return cached
+
+
+def invalidate_bootstrap() -> None:
+    cache.delete(BOOTSTRAP_CACHE_KEY)
+
+
+def render_shell(shell: Shell, bootstrap: dict) -> bytes:
+    tag = json_script(bootstrap, BOOTSTRAP_ELEMENT_ID)
+    html = shell.html
+    marker = html.find("</head>")
+    if marker == -1:
+        return (tag + html).encode("utf-8")
+    return (html[:marker] + tag + html[marker:]).encode("utf-8")
+
+
+def shell_body(request, shell: Shell) -> PrecompressedBody:
+    """Return the precompressed shell with the bootstrap blob for this kind of visitor."""
+    digest, data = get_bootstrap(request)
+    user = getattr(request, "user", None)
+    is_staff = bool(user is not None and user.is_authenticated and user.is_staff)
+    key = (shell.digest, digest, is_staff)
+
+    body = _rendered.get(key)
+    record_cache_lookup("spa_shell", body is not None)
+    if body is not None:
+        return body
+
+    bootstrap = dict(data, user={"is_staff": is_staff})
+    body = PrecompressedBody.build(render_shell(shell, bootstrap))
+    with _lock:
+        _rendered[key] = body
+        while len(_rendered) > _MAX_RENDERED:
+            _rendered.popitem(last=False)
+    return body
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 from django import template
 
-from core.utils.jalali import PERSIAN_DIGITS_TRANS, format_jalali
+from core.utils.jalali import PERSIAN_DIGITS_TRANS, compile_jalali_format, format_jalali
 
 register = template.Library()
 
+_format_date = compile_jalali_format("Y/m/d")
+_format_datetime = compile_jalali_format("Y/m/d - H:i")
+
 
 @register.filter(name="jalali")
 def jalali(value, fmt: str = "Y/m/d") -> str:
@@ -14,12 +17,12 @@ def jalali(value, fmt: str = "Y/m/d") -> str:
 
 @register.filter(name="jalali_date")
 def jalali_date(value) -> str:
-    return format_jalali(value, "Y/m/d")
+    return _format_date(value)
 
 
 @register.filter(name="jalali_datetime")
 def jalali_datetime(value) -> str:
-    return format_jalali(value, "Y/m/d - H:i")
+    return _format_datetime(value)
 
 
 @register.filter(name="money")
@@ -0,0 +1,42 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from core.bench.runner import Scenario, compare_reports, default_scenarios, percentile, run_benchmarks
+from store.models import Category, Product
+from store.seeding import SEED_SLUG_PREFIX, clear_seeded_catalog, seed_catalog
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="styra-test-media-")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BenchRunnerTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_percentile_is_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 0.50), 50)
+        self.assertEqual(percentile(samples, 0.95), 95)
+        self.assertEqual(percentile([], 0.95), 0.0)
+
+    def test_seed_and_bench_api_products(self):
+        result = seed_catalog(categories=3, products=30, images_per_product=1, reviews_per_product=1)
+        self.assertEqual(result.products, 30)
+        self.assertEqual(Product.objects.filter(category__slug__startswith=SEED_SLUG_PREFIX).count(), 30)
+
+        names = {scenario.name for scenario in default_scenarios(page_size=10)}
+        self.assertTrue({"catalog_home", "category_detail", "product_detail", "api_products_deep"} <= names)
+
+        report = run_benchmarks([Scenario("api_products_first", "/api/products/?page_size=10")], runs=3, warmup=1)
+        row = report["scenarios"]["api_products_first"]
+        self.assertEqual(row["statuses"], {"200": 3})
+        self.assertGreater(row["queries_p50"], 0)
+        self.assertEqual(report["dataset"]["products"], 30)
+        self.assertEqual(compare_reports(report, report)[0]["p50_ms"], 0)
+
+        clear_seeded_catalog()
+        self.assertFalse(Category.objects.filter(slug__startswith=SEED_SLUG_PREFIX).exists())
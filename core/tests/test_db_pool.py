@@ -0,0 +1,123 @@
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from core.db_backends import pool as pool_module
+from core.db_backends.pool import ConnectionPool, PoolTimeout, pool_checked_out, pool_events, pool_idle
+from core.db_backends.sqlite3.base import DatabaseWrapper
+
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**overrides):
+    options = {"size": 2, "max_overflow": 1, "recycle": 0, "pre_ping": True, "timeout": 0.05}
+    options.update(overrides)
+    return ConnectionPool("pooltest", ping=lambda raw: raw.alive, **options)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        for metric in (pool_checked_out, pool_idle, pool_events):
+            metric.clear()
+
+    def test_reuses_connections_and_bounds_overflow(self):
+        pool = make_pool()
+        first = pool.acquire(FakeConnection)
+        pool.release(first)
+        self.assertIs(pool.acquire(FakeConnection), first)
+
+        held = [first, pool.acquire(FakeConnection), pool.acquire(FakeConnection)]
+        self.assertEqual(pool_checked_out.value(alias="pooltest"), 3)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(FakeConnection)
+
+        for raw in held:
+            pool.release(raw)
+        # Overflow connections are closed rather than kept idle.
+        self.assertEqual([raw.closed for raw in held], [False, False, True])
+        self.assertEqual((pool.checked_out, pool.idle), (0, 2))
+        self.assertEqual(pool_idle.value(alias="pooltest"), 2)
+        self.assertEqual(pool_events.value(alias="pooltest", event="timeout"), 1)
+        self.assertEqual(pool_events.value(alias="pooltest", event="overflow"), 1)
+
+    def test_waiters_get_released_connections(self):
+        pool = make_pool(size=1, max_overflow=0, timeout=2)
+        raw = pool.acquire(FakeConnection)
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire(FakeConnection)))
+        waiter.start()
+        pool.release(raw)
+        waiter.join(2)
+        self.assertEqual(got, [raw])
+
+    def test_dead_and_expired_connections_are_replaced(self):
+        pool = make_pool()
+        dead = pool.acquire(FakeConnection)
+        pool.release(dead)
+        dead.alive = False
+        fresh = pool.acquire(FakeConnection)
+        self.assertIsNot(fresh, dead)
+        self.assertTrue(dead.closed)
+        self.assertEqual(pool_events.value(alias="pooltest", event="ping_failed"), 1)
+
+        pool.recycle = 60
+        pool.release(fresh)
+        with mock.patch.object(pool_module.time, "monotonic", return_value=pool_module.time.monotonic() + 61):
+            self.assertIsNot(pool.acquire(FakeConnection), fresh)
+        self.assertTrue(fresh.closed)
+
+
+class PooledBackendTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_dict = {
+            **connection.settings_dict,
+            "ENGINE": "core.db_backends.sqlite3",
+            "NAME": str(Path(directory.name) / "pool.sqlite3"),
+            "POOL": {"SIZE": 1, "MAX_OVERFLOW": 0},
+        }
+        self.addCleanup(pool_module.close_pools)
+
+    def _wrapper(self):
+        return DatabaseWrapper(dict(self.settings_dict), alias="pooltest")
+
+    def test_closing_returns_the_connection_for_the_next_request(self):
+        first = self._wrapper()
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+        self.assertIsNone(first.connection)
+
+        second = self._wrapper()
+        with second.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            self.assertEqual(cursor.fetchone(), (1,))
+        self.assertIs(second.connection, raw)
+        second.close()
+
+    def test_connections_closed_inside_a_transaction_are_not_shared(self):
+        wrapper = self._wrapper()
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.in_atomic_block = True
+        wrapper.close()
+        wrapper.in_atomic_block = False
+        other = self._wrapper()
+        other.ensure_connection()
+        self.assertIsNot(other.connection, raw)
+        other.close()
@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+
+from core import db_router
+from core.compression import cached_json_response
+from core.db_router import ReplicaRouter, routing_scope, use_primary
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import News, SiteVisit
+from store.models import Category, Product
+
+
+class ReplicaRouterTests(TransactionTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_request_content_reads_use_the_replica_outside_write_transactions(self):
+        self.assertEqual(self.router.db_for_read(Product), "default")
+        with routing_scope():
+            self.assertEqual(self.router.db_for_read(Product), "replica")
+            self.assertEqual(self.router.db_for_read(News), "replica")
+            self.assertIsNone(self.router.db_for_read(SiteVisit))
+            self.assertIsNone(self.router.db_for_read(User))
+            with transaction.atomic():
+                self.assertEqual(self.router.db_for_read(Product), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "store"))
+
+    def test_a_write_pins_the_rest_of_the_scope(self):
+        with routing_scope() as state:
+            self.router.db_for_write(SiteVisit)
+            self.assertEqual(self.router.db_for_read(Product), "replica")
+            self.assertEqual(self.router.db_for_write(Product), "default")
+            self.assertEqual(self.router.db_for_read(Category), "default")
+        self.assertTrue(state.wrote)
+
+        with routing_scope():
+            with use_primary():
+                self.assertEqual(self.router.db_for_read(Product), "default")
+            self.assertEqual(self.router.db_for_read(Product), "replica")
+
+    def test_cached_api_bodies_are_built_from_the_primary(self):
+        built_from = []
+
+        def build():
+            built_from.append(self.router.db_for_read(Product))
+            return {"products": []}
+
+        cache.delete("test:api:body")
+        request = RequestFactory().get("/api/products/")
+        with routing_scope():
+            cached_json_response(request, "test:api:body", build, timeout=5, cache_name="test")
+            self.assertEqual(self.router.db_for_read(Product), "replica")
+        self.assertEqual(built_from, ["default"])
+
+
+@override_settings(DATABASE_ROUTERS=["core.db_router.ReplicaRouter"], DATABASE_REPLICA_STICKY_SECONDS=7)
+class ReplicaRoutingMiddlewareTests(TransactionTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.reads = []
+
+    def _view(self, request):
+        if request.GET.get("write") or request.POST.get("write"):
+            Category.objects.create(name="فر", slug=f"oven-{len(self.reads)}")
+        self.reads.append(ReplicaRouter().db_for_read(Product))
+        return HttpResponse()
+
+    def test_unsafe_writes_open_a_sticky_window(self):
+        middleware = ReplicaRoutingMiddleware(self._view)
+        response = middleware(self.factory.post("/contact/", {"write": "1"}))
+        cookie = response.cookies[db_router.STICKY_COOKIE]
+        self.assertEqual(cookie["max-age"], 7)
+
+        request = self.factory.get("/shop/")
+        request.COOKIES[db_router.STICKY_COOKIE] = "1"
+        middleware(request)
+        middleware(self.factory.get("/shop/"))
+        self.assertEqual(self.reads, ["default", "default", "replica"])
+
+    def test_safe_writes_pin_only_their_own_request(self):
+        middleware = ReplicaRoutingMiddleware(self._view)
+        response = middleware(self.factory.get("/shop/", {"write": "1"}))
+        self.assertNotIn(db_router.STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.reads, ["default"])
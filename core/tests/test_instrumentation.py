@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.instrumentation import fingerprint_sql, query_budget_for, registry
+from core.middleware import HybridMiddleware
+from store.models import Category, Product
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RequestInstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="گریل", slug="grill")
+        for i in range(5):
+            Product.objects.create(name=f"گریل {i}", description="-", domain="-", category=category)
+
+    def setUp(self):
+        registry.reset()
+        cache.clear()
+
+    def test_api_products_stays_within_query_budget(self):
+        with registry.capture() as records:
+            response = self.client.get("/api/products/")
+        self.assertEqual(response.status_code, 200)
+
+        record = records[-1]
+        self.assertEqual(record.view, "api_products")
+        self.assertIsNotNone(record.budget)
+        self.assertFalse(record.over_budget, f"{record.queries} queries > budget {record.budget}")
+        self.assertEqual(registry.snapshot()["api_products"]["requests"], 1)
+
+    def test_configured_budgets_cover_hot_views(self):
+        for view in ("home", "catalog_home", "api_products"):
+            self.assertIsNotNone(query_budget_for(view), view)
+
+    @override_settings(QUERY_BUDGETS={"api_products": 1})
+    def test_budget_violation_is_logged(self):
+        with self.assertLogs("core.middleware", level="WARNING") as logs:
+            self.client.get("/api/products/")
+        self.assertIn("Query budget exceeded", logs.output[0])
+        self.assertEqual(registry.snapshot()["api_products"]["budget_violations"], 1)
+
+    def test_fingerprint_groups_repeated_statements(self):
+        self.assertEqual(
+            fingerprint_sql("SELECT * FROM \"t\" WHERE \"id\" = 12 AND \"name\" = 'x'"),
+            fingerprint_sql("SELECT * FROM \"t\" WHERE \"id\" = 7  AND \"name\" = 'y'"),
+        )
+        self.assertEqual(
+            fingerprint_sql('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            'SELECT * FROM "t" WHERE "id" IN (...)',
+        )
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get("/health/queries/").status_code, 404)
+
+        staff = User.objects.create_user(username="ops", password="pass", is_staff=True)
+        self.client.force_login(staff)
+        self.client.get("/api/products/")
+        payload = self.client.get("/health/queries/").json()
+        self.assertIn("api_products", payload["views"])
+        self.assertIn("p95", payload["views"]["api_products"]["wall_ms"])
+
+
+class HybridMiddlewareTests(SimpleTestCase):
+    def test_subclasses_must_implement_both_modes(self):
+        class SyncOnly(HybridMiddleware):
+            def handle(self, request):
+                return self.get_response(request)
+
+        with self.assertRaises(TypeError):
+            SyncOnly(lambda request: HttpResponse())
@@ -0,0 +1,41 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.test import SimpleTestCase, override_settings
+
+from core.utils.jalali import (
+    compile_jalali_format,
+    format_jalali,
+    format_jalali_many,
+    gregorian_to_jalali,
+)
+
+
+class JalaliFormatTests(SimpleTestCase):
+    def test_known_dates(self):
+        self.assertEqual(format_jalali(date(2024, 3, 20), persian_digits=False), "1403/01/01")
+        self.assertEqual(format_jalali(date(2025, 3, 20), "j F Y"), "۳۰ اسفند ۱۴۰۳")
+
+    @override_settings(TIME_ZONE="Asia/Tehran")
+    def test_aware_datetime_is_localized(self):
+        value = datetime(2024, 3, 19, 21, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(format_jalali(value, "Y/m/d - H:i", persian_digits=False), "1403/01/01 - 00:30")
+
+    def test_compiled_formatter_is_shared(self):
+        self.assertIs(compile_jalali_format("Y/m/d"), compile_jalali_format("Y/m/d"))
+
+    def test_literals_and_tokens_match_conversion(self):
+        start = date(2020, 1, 1)
+        for offset in range(0, 800, 7):
+            d = start + timedelta(days=offset)
+            jy, jm, jd = gregorian_to_jalali(d.year, d.month, d.day)
+            self.assertEqual(
+                format_jalali(d, "Y-m-d (n/j) 10", persian_digits=False),
+                f"{jy:04d}-{jm:02d}-{jd:02d} ({jm}/{jd}) 10",
+            )
+
+    def test_format_many_matches_single(self):
+        values = [datetime(2024, 5, d, 8, 15) for d in range(1, 10)] + [None, "x"]
+        self.assertEqual(
+            format_jalali_many(values, "Y/m/d - H:i"),
+            [format_jalali(v, "Y/m/d - H:i") for v in values],
+        )
@@ -0,0 +1,58 @@
+from django.test import TransactionTestCase
+
+from core.bench.loadtest import API_MIX, ActionStats, in_process_target, metrics_delta, parse_exposition, parse_mix, run_load
+from store.models import Category, Product
+
+
+class LoadTestHarnessTests(TransactionTestCase):
+    # The in-process run goes through the replica router when one is configured.
+    databases = "__all__"
+
+    def setUp(self):
+        category = Category.objects.create(name="گریل", slug="grill")
+        for i in range(3):
+            Product.objects.create(name=f"گریل صنعتی {i}", description="-", domain="-", category=category)
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("browse=3,search"), {"browse": 3, "search": 1})
+        with self.assertRaises(ValueError):
+            parse_mix("checkout=1")
+
+    def test_parse_exposition_and_delta(self):
+        before = parse_exposition('# TYPE x counter\nshop_x_total{scope="a"} 1\nshop_h_bucket{le="1"} 2\n')
+        after = parse_exposition('shop_x_total{scope="a"} 4\nshop_y_total 2\n')
+        self.assertEqual(before, {'shop_x_total{scope="a"}': 1.0})
+        self.assertEqual(metrics_delta(before, after), {'shop_x_total{scope="a"}': 3.0, "shop_y_total": 2.0})
+
+    def test_in_process_run_reports_actions_and_metrics(self):
+        transport, overrides, snapshot = in_process_target()
+        with overrides:
+            report = run_load(
+                transport,
+                mix={"browse": 2, "search": 1, "suggest": 1, "contact": 1},
+                concurrency=2,
+                duration=30,
+                max_requests=12,
+                snapshot=snapshot,
+            )
+
+        self.assertEqual(report["requests"], 12)
+        self.assertEqual(report["catalog_sample"], {"categories": 1, "products": 3})
+        for row in report["actions"].values():
+            self.assertEqual(row["exceptions"], {})
+            self.assertEqual(row["errors"], 0, row["statuses"])
+        self.assertTrue(any("http_requests_total" in series for series in report["metrics_delta"]))
+
+    def test_in_process_asgi_run_serves_the_api(self):
+        transport, serving, snapshot = in_process_target(asgi=True)
+        with serving:
+            report = run_load(transport, mix=API_MIX, concurrency=2, duration=30, max_requests=12, snapshot=snapshot)
+
+        self.assertEqual(report["requests"], 12)
+        self.assertEqual(report["errors"], 0, report["actions"])
+
+    def test_unexpected_statuses_count_as_errors(self):
+        stats = ActionStats()
+        stats.statuses.update({200: 3, 301: 2, 429: 1})
+        row = stats.as_dict()
+        self.assertEqual((row["errors"], row["unexpected_statuses"], row["throttled"]), (2, 2, 1))
@@ -0,0 +1,93 @@
+import io
+import json
+import logging
+import queue
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core.log import (
+    JsonFormatter,
+    LogQueueListener,
+    QueueForwarder,
+    RequestContextFilter,
+    ThrottleFilter,
+    log_records_dropped,
+)
+from core.middleware import RequestContextMiddleware
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class StructuredLoggingTests(SimpleTestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("core.tests.log")
+        self.logger.propagate = False
+        self.addCleanup(setattr, self.logger, "handlers", [])
+
+    def test_json_lines_carry_request_context(self):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        handler.addFilter(RequestContextFilter())
+        self.logger.addHandler(handler)
+
+        def view(request):
+            self.logger.warning("Query budget exceeded for %s", "api", extra={"queries": 30})
+            return HttpResponse()
+
+        request = RequestFactory().get("/api/products/", HTTP_X_REQUEST_ID="abc12345-req", REMOTE_ADDR="10.1.2.3")
+        response = RequestContextMiddleware(view)(request)
+        self.assertEqual(response["X-Request-ID"], "abc12345-req")
+
+        line = json.loads(stream.getvalue())
+        self.assertEqual(line["message"], "Query budget exceeded for api")
+        self.assertEqual((line["request_id"], line["ip"], line["queries"]), ("abc12345-req", "10.1.2.3", 30))
+        self.assertIn("latency_ms", line)
+
+        bogus = RequestFactory().get("/", HTTP_X_REQUEST_ID="<script>")
+        self.assertRegex(RequestContextMiddleware(lambda r: HttpResponse())(bogus)["X-Request-ID"], r"^[0-9a-f]{32}$")
+
+    def test_throttle_samples_repeated_records(self):
+        target = CollectingHandler()
+        self.logger.addHandler(target)
+        self.logger.addFilter(throttle := ThrottleFilter(burst=2, sample=3, key_fields=["ip"]))
+        self.addCleanup(self.logger.removeFilter, throttle)
+
+        for _ in range(10):
+            self.logger.warning("Rate limit exceeded", extra={"ip": "1.1.1.1"})
+        self.logger.warning("Rate limit exceeded", extra={"ip": "2.2.2.2"})
+
+        passed = [(record.ip, getattr(record, "suppressed", 0)) for record in target.records]
+        self.assertEqual(passed, [("1.1.1.1", 0), ("1.1.1.1", 0), ("1.1.1.1", 2), ("1.1.1.1", 2), ("2.2.2.2", 0)])
+
+    def test_queue_forwarder_hands_prepared_records_to_the_listener(self):
+        target = CollectingHandler()
+        log_queue = queue.Queue()
+        listener = LogQueueListener(log_queue)
+        listener.start()
+        self.logger.addHandler(QueueForwarder(target, log_queue))
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.logger.exception("Failed for %s", "order-7", extra={"scope": "checkout"})
+        listener.stop()
+
+        [record] = target.records
+        self.assertEqual((record.getMessage(), record.scope), ("Failed for order-7", "checkout"))
+        self.assertIsNone(record.exc_info)
+        self.assertIn("ValueError: boom", record.exc_text)
+
+    def test_a_full_queue_drops_instead_of_blocking(self):
+        log_records_dropped.clear()
+        self.logger.addHandler(QueueForwarder(CollectingHandler(), queue.Queue(maxsize=1)))
+        self.logger.warning("first")
+        self.logger.warning("second")
+        self.assertEqual(log_records_dropped.value(), 1)
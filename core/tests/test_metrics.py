@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+
+from auth_security.ratelimit import check_rate_limit
+from core import metrics
+from core.db_backends.pool import pool_idle
+from store.models import Category
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, METRICS_MULTIPROCESS_DIR="")
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        metrics.registry.reset()
+
+    def test_requires_token_or_staff(self):
+        with mock.patch.dict(os.environ, {"HEALTH_CHECK_TOKEN": "secret"}):
+            self.assertEqual(self.client.get("/metrics/").status_code, 404)
+            response = self.client.get("/metrics/", HTTP_X_HEALTH_TOKEN="secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+        with mock.patch.dict(os.environ, {"HEALTH_CHECK_TOKEN": ""}):
+            self.assertEqual(self.client.get("/metrics/").status_code, 404)
+            User.objects.create_user("ops", password="pw", is_staff=True)
+            self.client.login(username="ops", password="pw")
+            self.assertEqual(self.client.get("/metrics/").status_code, 200)
+
+    def test_request_latency_is_recorded_per_view(self):
+        Category.objects.create(name="گریل", slug="grill")
+        self.client.get("/api/categories/")
+        self.assertEqual(metrics.http_request_duration.count(view="api_categories", method="GET"), 1)
+        self.assertEqual(metrics.http_requests.value(view="api_categories", method="GET", status=200), 1)
+
+        with mock.patch.dict(os.environ, {"HEALTH_CHECK_TOKEN": "secret"}):
+            body = self.client.get("/metrics/?token=secret").content.decode()
+        self.assertIn('shop_http_request_duration_seconds_bucket{view="api_categories",method="GET",le="+Inf"} 1', body)
+        self.assertIn('shop_http_requests_total{view="api_categories",method="GET",status="200"} 1', body)
+        self.assertIn("# TYPE shop_site_visit_flush_seconds histogram", body)
+
+    def test_rate_limit_decisions_and_cache_lookups(self):
+        request = RequestFactory().post("/contact/", REMOTE_ADDR="203.0.113.9")
+        for _ in range(3):
+            check_rate_limit(request, scope="metrics-test", limit=2, window_seconds=60)
+        self.assertEqual(metrics.rate_limit_decisions.value(scope="metrics-test", decision="allowed"), 2)
+        self.assertEqual(metrics.rate_limit_decisions.value(scope="metrics-test", decision="blocked"), 1)
+        self.assertEqual(metrics.cache_requests.value(cache="ratelimit", result="miss"), 1)
+        self.assertEqual(metrics.cache_requests.value(cache="ratelimit", result="hit"), 2)
+
+    def test_timed_delivery_counts_failures(self):
+        with self.assertRaises(RuntimeError):
+            with metrics.timed_delivery("sms", "otp"):
+                raise RuntimeError("provider down")
+        with metrics.timed_delivery("sms", "otp"):
+            pass
+        self.assertEqual(metrics.delivery_failures.value(channel="sms", purpose="otp"), 1)
+        self.assertEqual(metrics.delivery_duration.count(channel="sms", purpose="otp"), 2)
+
+
+class MultiprocessMetricsTests(TestCase):
+    def setUp(self):
+        metrics.registry.reset()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_scrape_merges_worker_files(self):
+        other_worker = {
+            "shop_otp_sends_total": [[["sms", "sent"], 4]],
+            "shop_site_visit_flush_seconds": [[[], [[1] + [0] * len(metrics.LATENCY_BUCKETS), 0.002, 1]]],
+        }
+        with open(os.path.join(self.directory, "metrics-999999.json"), "w", encoding="utf-8") as fh:
+            json.dump(other_worker, fh)
+
+        metrics.otp_sends.inc(channel="sms", result="sent")
+        metrics.site_visit_flush.observe(0.2)
+        with override_settings(METRICS_MULTIPROCESS_DIR=self.directory):
+            body = metrics.registry.render()
+            self.assertTrue(os.path.exists(os.path.join(self.directory, f"metrics-{os.getpid()}.json")))
+
+        self.assertIn('shop_otp_sends_total{channel="sms",result="sent"} 5', body)
+        self.assertIn("shop_site_visit_flush_seconds_count 2", body)
+        self.assertIn('shop_site_visit_flush_seconds_bucket{le="0.005"} 1', body)
+        self.assertIn('shop_site_visit_flush_seconds_bucket{le="0.25"} 2', body)
+
+    def test_gauges_of_exited_workers_are_not_merged(self):
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        stale = {
+            "shop_otp_sends_total": [[["sms", "sent"], 4]],
+            "shop_db_pool_connections_idle": [[["default"], 3]],
+        }
+        with open(os.path.join(self.directory, f"metrics-{exited.pid}.json"), "w", encoding="utf-8") as fh:
+            json.dump(stale, fh)
+
+        pool_idle.set(2, alias="default")
+        with override_settings(METRICS_MULTIPROCESS_DIR=self.directory):
+            merged = metrics.registry.collect()
+
+        self.assertEqual(merged["shop_db_pool_connections_idle"], {("default",): 2})
+        self.assertEqual(merged["shop_otp_sends_total"], {("sms", "sent"): 4})
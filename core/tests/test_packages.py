@@ -0,0 +1,29 @@
+import json
+
+from django.test import TestCase, override_settings
+
+from core import packages
+from core.packages import PACKAGE_DATA
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PackagesApiTests(TestCase):
+    def test_detail_is_precompressed_and_revalidates(self):
+        response = self.client.get("/api/packages/vip/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+
+        plain = self.client.get("/api/packages/vip/")
+        self.assertEqual(json.loads(plain.content), dict(PACKAGE_DATA["vip"], key="vip"))
+
+        cached = self.client.get("/api/packages/vip/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_bodies_are_built_once(self):
+        self.assertIs(packages.package_body("basic"), packages.package_body("basic"))
+        listing = json.loads(self.client.get("/api/packages/").content)
+        self.assertEqual([p["key"] for p in listing["packages"]], list(PACKAGE_DATA))
+
+    def test_unknown_package_is_404(self):
+        self.assertEqual(self.client.get("/api/packages/gold/").status_code, 404)
@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.profiling import ProfileSample, collapsed_stacks, store
+from store.models import Category, Product
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Ovens", slug="ovens")
+        Product.objects.create(name="Oven 1", description="-", domain="-", category=category)
+        cls.staff = User.objects.create_user(username="ops", password="pass", is_staff=True)
+
+    def setUp(self):
+        store.reset()
+        cache.clear()
+        self.addCleanup(store.reset)
+
+    def test_requests_are_not_profiled_by_default(self):
+        self.client.get("/api/products/", HTTP_X_PROFILE="1")
+        self.assertEqual(store.report(), {})
+
+    def test_staff_header_profiles_the_view_and_reports_it(self):
+        self.client.force_login(self.staff)
+        self.client.get("/api/products/", HTTP_X_PROFILE="1")
+
+        payload = self.client.get("/health/profiles/", {"view": "api_products"}).json()
+        report = payload["views"]["api_products"]
+        self.assertEqual(report["samples"], 1)
+        self.assertTrue(any("api_products" in row["function"] for row in report["top"]))
+        self.assertTrue(all(line.startswith("api_products;") for line in report["flame"]))
+
+        collapsed = self.client.get("/health/profiles/", {"format": "collapsed"})
+        self.assertEqual(collapsed["Content-Type"], "text/plain; charset=utf-8")
+        self.assertRegex(collapsed.content.decode(), r"(?m)^api_products;.+ \d+\.\d\d$")
+
+    @override_settings(PROFILE_SAMPLE_RATE=1.0, PROFILE_BUFFER_SIZE=2)
+    def test_sampled_requests_fill_a_bounded_buffer(self):
+        for _ in range(3):
+            self.client.get("/api/products/")
+        self.assertEqual(store.report()["api_products"]["samples"], 2)
+
+    def test_report_is_staff_only(self):
+        self.assertEqual(self.client.get("/health/profiles/").status_code, 404)
+
+
+class CollapsedStackTests(SimpleTestCase):
+    def test_self_time_is_cumulative_minus_children(self):
+        sample = ProfileSample(
+            functions=(("view", 1, 0.001, 0.010), ("render", 1, 0.002, 0.006), ("query", 2, 0.003, 0.003)),
+            edges={("view", "render"): 0.006, ("render", "query"): 0.003},
+        )
+        functions = {label: cumtime for label, _calls, _tottime, cumtime in sample.functions}
+        self.assertEqual(
+            collapsed_stacks("home", functions, sample.edges),
+            ["home;view;render;query 3.00", "home;view;render 3.00", "home;view 4.00"],
+        )
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core.checks import check_session_cache
+from core.sessions import PERSIST_SESSION_KEY, PURGE_GATE_KEY, SessionStore
+
+
+@override_settings(SESSION_ENGINE="core.sessions")
+class HybridSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_sessions_stay_in_the_cache(self):
+        store = SessionStore()
+        store["cart"] = [1, 2]
+        store.save()
+
+        self.assertFalse(Session.objects.exists())
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(store.session_key)["cart"], [1, 2])
+
+    def test_staff_login_writes_through_to_the_database(self):
+        User.objects.create_user("staff", password="pw", is_staff=True)
+        User.objects.create_user("customer", password="pw")
+
+        self.client.login(username="customer", password="pw")
+        self.assertFalse(Session.objects.exists())
+
+        self.client.login(username="staff", password="pw")
+        row = Session.objects.get()
+        self.assertTrue(row.get_decoded()[PERSIST_SESSION_KEY])
+
+        # Served from the cache, and from the DB once the cache entry is gone.
+        with self.assertNumQueries(0):
+            self.assertIn("_auth_user_id", SessionStore(row.session_key).load())
+        cache.clear()
+        self.assertIn("_auth_user_id", SessionStore(row.session_key).load())
+
+    @override_settings(SESSION_PURGE_BATCH_SIZE=2)
+    def test_expired_rows_are_purged_in_batches(self):
+        expired = timezone.now() - timedelta(days=1)
+        for number in range(5):
+            Session.objects.create(session_key=f"old{number}", session_data="", expire_date=expired)
+
+        self.assertEqual(SessionStore.purge_batch(), 2)
+        SessionStore.clear_expired()
+        self.assertFalse(Session.objects.exists())
+
+        # A staff session save purges one batch, then waits for the interval.
+        Session.objects.create(session_key="old-again", session_data="", expire_date=expired)
+        store = SessionStore()
+        store[PERSIST_SESSION_KEY] = True
+        store.save()
+        self.assertFalse(Session.objects.filter(session_key="old-again").exists())
+        self.assertTrue(cache.get(PURGE_GATE_KEY))
+
+
+class SessionCacheCheckTests(SimpleTestCase):
+    @override_settings(SESSION_ENGINE="core.sessions")
+    def test_hybrid_sessions_are_rejected_on_a_per_process_cache(self):
+        [error] = check_session_cache(None)
+        self.assertEqual(error.id, "core.E001")
+
+    @override_settings(
+        SESSION_ENGINE="core.sessions",
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache:6379/0"}},
+    )
+    def test_a_shared_cache_passes(self):
+        self.assertEqual(check_session_cache(None), [])
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from core.models import News
+from core.utils import slugs
+from core.utils.slugs import allocate_slugs, next_free_slug
+from store.models import Category, Product
+
+
+class SlugAllocationTests(TestCase):
+    def test_next_free_slug_fills_the_first_gap(self):
+        self.assertEqual(next_free_slug("fer", set()), "fer")
+        self.assertEqual(next_free_slug("fer", {"fer", "fer-1", "fer-3"}), "fer-2")
+
+    def test_collisions_cost_one_lookup_query(self):
+        category = Category.objects.create(name="فر")
+        for _ in range(5):
+            Product.objects.create(name="فر پیتزا", description="-", domain="-", category=category)
+
+        product = Product(name="فر پیتزا", description="-", domain="-", category=category)
+        # lookup + SAVEPOINT + INSERT + RELEASE
+        with self.assertNumQueries(4):
+            product.save()
+        self.assertEqual(product.slug, "فر-پیتزا-5")
+
+    def test_similar_prefixes_are_not_treated_as_collisions(self):
+        News.objects.create(title="grill", text="-")
+        News.objects.create(title="grill pro", text="-")
+        self.assertEqual(News.objects.create(title="grill", text="-").slug, "grill-1")
+
+    def test_product_slugs_are_scoped_to_category(self):
+        first = Category.objects.create(name="الف")
+        second = Category.objects.create(name="ب")
+        a = Product.objects.create(name="سینک", description="-", domain="-", category=first)
+        b = Product.objects.create(name="سینک", description="-", domain="-", category=second)
+        self.assertEqual(a.slug, b.slug)
+
+    def test_unique_constraint_race_is_retried(self):
+        Category.objects.create(name="گریل")
+        real = slugs.taken_slugs
+        calls = []
+
+        def stale_then_real(queryset, base, **kwargs):
+            calls.append(base)
+            return set() if len(calls) == 1 else real(queryset, base, **kwargs)
+
+        with mock.patch.object(slugs, "taken_slugs", side_effect=stale_then_real):
+            category = Category.objects.create(name="گریل")
+        self.assertEqual(category.slug, "گریل-1")
+        self.assertEqual(len(calls), 2)
+
+    def test_bulk_allocation_reserves_slugs_within_the_batch(self):
+        category = Category.objects.create(name="فر")
+        Product.objects.create(name="فر پیتزا", description="-", domain="-", category=category)
+        other = Category.objects.create(name="هود")
+
+        with self.assertNumQueries(2):
+            allocated = allocate_slugs(
+                Product,
+                ["فر پیتزا", "فر پیتزا", "هود", "هود"],
+                fallback="product",
+                scope=[{"category_id": category.pk}] * 2 + [{"category_id": other.pk}] * 2,
+            )
+        self.assertEqual(allocated, ["فر-پیتزا-1", "فر-پیتزا-2", "هود", "هود-1"])
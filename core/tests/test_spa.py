@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core import spa
+from store.models import Category
+
+SHELL = "<!doctype html><html><head><title>styra</title></head><body><div id=\"root\"></div>" + "x" * 500 + "</body></html>"
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ReactShellTests(TestCase):
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp(prefix="styra-spa-"))
+        (self.base_dir / "frontend" / "dist").mkdir(parents=True)
+        self.index = self.base_dir / "frontend" / "dist" / "index.html"
+        self.index.write_text(SHELL, encoding="utf-8")
+        override = override_settings(BASE_DIR=self.base_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(shutil.rmtree, self.base_dir, True)
+        spa._shell = None
+        spa._rendered.clear()
+        cache.clear()
+
+    def test_shell_inlines_bootstrap_and_supports_304(self):
+        Category.objects.create(name="گریل", slug="grill")
+
+        response = self.client.get("/about/", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        plain = self.client.get("/about/")
+        self.assertNotIn("Content-Encoding", plain)
+        html = plain.content.decode("utf-8")
+        self.assertIn('<script id="app-bootstrap" type="application/json">', html)
+        self.assertIn('"slug": "grill"', html)
+        self.assertIn('"is_staff": false', html)
+
+        cached = self.client.get("/about/", HTTP_ACCEPT_ENCODING="br", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_category_change_rebuilds_bootstrap(self):
+        self.client.get("/")
+        Category.objects.create(name="دیسپلی", slug="display")
+        self.assertIn('"slug": "display"', self.client.get("/").content.decode("utf-8"))
+
+    @override_settings(DEBUG=True)
+    def test_debug_reloads_when_index_changes(self):
+        self.client.get("/")
+        self.index.write_text(SHELL.replace("styra", "rebuilt"), encoding="utf-8")
+        stat = self.index.stat()
+        os.utime(self.index, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertIn("rebuilt", self.client.get("/").content.decode("utf-8"))
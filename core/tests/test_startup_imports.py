@@ -0,0 +1,41 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.bench.imports import LAZY_MODULES, app_module_costs, boot_worker, parse_importtime
+
+
+class WorkerStartupTests(SimpleTestCase):
+    def test_worker_boot_does_not_import_pdf_or_excel_stacks(self):
+        boot = boot_worker()
+        self.assertIn("store.views", boot.modules)
+        self.assertEqual(boot.loaded(LAZY_MODULES), [])
+
+    def test_importtime_costs_are_attributed_to_app_modules(self):
+        output = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       300 |        300 |     reportlab.lib",
+                "import time:       200 |        500 |   reportlab",
+                "import time:        50 |         50 |   core.utils",
+                "import time:       100 |        650 | store.invoice",
+            ]
+        )
+        [root] = parse_importtime(output)
+        self.assertEqual([child.name for child in root.children], ["reportlab", "core.utils"])
+
+        rows = app_module_costs([root], {"core", "store"})
+        self.assertEqual([row["module"] for row in rows], ["store.invoice", "core.utils"])
+        self.assertEqual((rows[0]["cumulative_ms"], rows[0]["imports"]), (0.65, {"reportlab": 0.5}))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class LazyInvoiceImportTests(TestCase):
+    def test_manual_invoice_pdf_imports_the_renderer_on_first_use(self):
+        User.objects.create_user("staff", password="pw", is_staff=True)
+        self.client.login(username="staff", password="pw")
+        payload = {"invoice_number": "1402-17", "items": [{"name": "فر", "qty": 2, "price": 1000}]}
+        response = self.client.post("/shop/invoice/manual/pdf/", json.dumps(payload), content_type="application/json")
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(response.content.startswith(b"%PDF"))
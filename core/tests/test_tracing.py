@@ -0,0 +1,89 @@
+import logging
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory, TestCase, override_settings
+
+from core import background, tracing
+from core.instrumentation import QueryRecorder
+from core.log import current_request_id
+from core.metrics import timed_delivery
+from core.middleware import RequestContextMiddleware, TracingMiddleware
+
+
+class TracingTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_spans_record_nesting_sql_and_templates(self):
+        token = tracing.start_trace()
+        self.addCleanup(tracing.end_trace, token)
+
+        with tracing.span("outer", step=1):
+            with tracing.span("inner"):
+                User.objects.count()
+            engines["django"].from_string("{{ value }}").render({"value": 1})
+        with timed_delivery("sms", "otp"):
+            pass
+
+        spans = {span.name: span for span in tracing.current_trace().spans}
+        self.assertEqual(set(spans), {"outer", "inner", "template", "sms"})
+        self.assertEqual((spans["inner"].depth, spans["inner"].db_queries), (1, 1))
+        self.assertEqual(spans["outer"].db_queries, 0)
+        self.assertEqual(spans["sms"].attrs, {"purpose": "otp"})
+        self.assertEqual(tracing.current_trace().db_queries, 1)
+
+    def test_query_timer_survives_reconnects_inside_a_query_recorder(self):
+        self.addCleanup(setattr, connection, "execute_wrappers", list(connection.execute_wrappers))
+        for _ in range(3):
+            connection.execute_wrappers.remove(tracing._time_query)
+            with QueryRecorder().installed():
+                # What a (re)connection opened inside the recorder's scope does.
+                connection_created.send(sender=type(connection), connection=connection)
+                User.objects.count()
+            self.assertEqual(connection.execute_wrappers, [tracing._time_query])
+
+    def test_span_is_a_noop_outside_a_trace(self):
+        with tracing.span("idle") as record:
+            User.objects.count()
+        self.assertIsNone(record)
+        self.assertIsNone(tracing.current_trace())
+
+    @override_settings(TRACE_SLOW_MS=0, TRACE_SAMPLE_RATE=1.0)
+    def test_slow_requests_log_one_trace_line_with_the_request_id(self):
+        def view(request):
+            with tracing.span("work"):
+                User.objects.count()
+            return HttpResponse()
+
+        request = self.factory.get("/slow/", HTTP_X_REQUEST_ID="trace-req-0001")
+        with self.assertLogs("core.trace", logging.WARNING) as logs:
+            RequestContextMiddleware(TracingMiddleware(view))(request)
+
+        [record] = logs.records
+        self.assertEqual((record.path, record.status), ("/slow/", 200))
+        self.assertEqual(record.trace["db_queries"], 1)
+        self.assertEqual([span["name"] for span in record.trace["spans"]], ["work"])
+        self.assertIsNone(tracing.current_trace())
+
+    @override_settings(TRACE_SLOW_MS=0, TRACE_SAMPLE_RATE=0.0)
+    def test_sampling_can_drop_slow_traces(self):
+        with self.assertNoLogs("core.trace", logging.WARNING):
+            TracingMiddleware(lambda request: HttpResponse())(self.factory.get("/"))
+
+    def test_background_tasks_keep_the_request_id_but_not_the_trace(self):
+        seen = []
+
+        def task():
+            seen.append((current_request_id(), tracing.current_trace()))
+
+        def view(request):
+            background.submit(task).result(timeout=5)
+            return HttpResponse()
+
+        request = self.factory.get("/", HTTP_X_REQUEST_ID="bg-req-00001")
+        RequestContextMiddleware(TracingMiddleware(view))(request)
+        self.assertEqual(seen, [("bg-req-00001", None)])
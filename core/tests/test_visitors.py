@@ -0,0 +1,57 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import DailyVisitStat, SiteVisit
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0"
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class VisitorIdentityTests(TestCase):
+    def test_anonymous_visits_use_the_cookie_not_the_session_store(self):
+        self.client.get("/", HTTP_USER_AGENT=BROWSER)
+        self.assertIn("vid", self.client.cookies)
+        self.client.get("/about/", HTTP_USER_AGENT=BROWSER)
+
+        self.assertFalse(Session.objects.exists())
+        stat = DailyVisitStat.objects.get()
+        self.assertEqual((stat.total_hits, stat.unique_sessions), (2, 1))
+        self.assertEqual(SiteVisit.objects.get().first_path, "/")
+
+    def test_crawlers_are_not_counted(self):
+        self.client.get("/", HTTP_USER_AGENT="Googlebot/2.1 (+http://www.google.com/bot.html)")
+        self.client.get("/")
+        self.assertFalse(DailyVisitStat.objects.exists())
+        self.assertNotIn("vid", self.client.cookies)
+
+    def test_tampered_cookie_falls_back_to_the_fingerprint(self):
+        self.client.cookies["vid"] = "forged"
+        self.client.get("/", HTTP_USER_AGENT=BROWSER)
+        self.assertRegex(SiteVisit.objects.get().session_key, r"^[0-9a-f]{32}$")
+
+
+class ClearEmptySessionsTests(TestCase):
+    def test_deletes_expired_and_empty_sessions(self):
+        for data in ({}, {"cart": [1]}):
+            store = SessionStore()
+            store.update(data)
+            store.save()
+        Session.objects.create(
+            session_key="expired", session_data=SessionStore().encode({"cart": [2]}),
+            expire_date=timezone.now() - timedelta(days=1),
+        )
+
+        out = StringIO()
+        call_command("clear_empty_sessions", "--dry-run", stdout=out)
+        self.assertIn("Would delete 2 of 3", out.getvalue())
+        self.assertEqual(Session.objects.count(), 3)
+
+        call_command("clear_empty_sessions", "--batch-size", "1", stdout=StringIO())
+        remaining = Session.objects.get()
+        self.assertEqual(SessionStore().decode(remaining.session_data), {"cart": [1]})
@@ -0,0 +1,187 @@
+"""Lightweight request tracing.
+
+``TracingMiddleware`` starts a ``Trace`` for each request in a context
+variable; ``span("name", **attrs)`` (or ``@traced("name")``) times a section of
+it. SQL is timed by an execute wrapper added to every connection when it is
+created, and attributed to the innermost open span. Spans already wrap
+template rendering (``TracedDjangoTemplates``), email/SMS delivery
+(``core.metrics.timed_delivery``), rate-limit checks and invoice PDFs.
+
+Requests slower than ``TRACE_SLOW_MS`` are logged to ``core.trace`` as one
+structured line (request id, view, latency and the span tree), sampled at
+``TRACE_SAMPLE_RATE``. Outside a traced request ``span`` costs one context
+variable lookup.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+
+logger = logging.getLogger("core.trace")
+
+MAX_SPANS = 200
+
+
+@dataclass
+class Span:
+    name: str
+    start_ms: float
+    depth: int
+    attrs: dict
+    duration_ms: float = 0.0
+    db_queries: int = 0
+    db_ms: float = 0.0
+
+    def as_dict(self) -> dict:
+        data = {"name": self.name, "start_ms": round(self.start_ms, 2), "ms": round(self.duration_ms, 2)}
+        if self.depth:
+            data["depth"] = self.depth
+        if self.db_queries:
+            data["db_queries"] = self.db_queries
+            data["db_ms"] = round(self.db_ms, 2)
+        data.update(self.attrs)
+        return data
+
+
+@dataclass
+class Trace:
+    started: float = field(default_factory=time.perf_counter)
+    spans: list[Span] = field(default_factory=list)
+    open: list[Span] = field(default_factory=list)
+    dropped: int = 0
+    db_queries: int = 0
+    db_ms: float = 0.0
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def as_dict(self) -> dict:
+        data = {
+            "ms": round(self.elapsed_ms(), 2),
+            "db_queries": self.db_queries,
+            "db_ms": round(self.db_ms, 2),
+            "spans": [span.as_dict() for span in sorted(self.spans, key=lambda span: span.start_ms)],
+        }
+        if self.dropped:
+            data["dropped_spans"] = self.dropped
+        return data
+
+
+_current: ContextVar[Trace | None] = ContextVar("trace", default=None)
+
+
+def current_trace() -> Trace | None:
+    return _current.get()
+
+
+def start_trace():
+    """Begin a trace in the current context; returns the token for ``end_trace``."""
+    return _current.set(Trace())
+
+
+def end_trace(token) -> None:
+    _current.reset(token)
+
+
+def detach() -> None:
+    """Stop recording into the inherited trace (background tasks outlive their request)."""
+    _current.set(None)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    trace = _current.get()
+    if trace is None:
+        yield None
+        return
+    record = Span(name, (time.perf_counter() - trace.started) * 1000, len(trace.open), attrs)
+    trace.open.append(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.duration_ms = (time.perf_counter() - started) * 1000
+        trace.open.remove(record)
+        if len(trace.spans) < MAX_SPANS:
+            trace.spans.append(record)
+        else:
+            trace.dropped += 1
+
+
+def traced(name: str):
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _time_query(execute, sql, params, many, context):
+    trace = _current.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        trace.db_queries += 1
+        trace.db_ms += elapsed
+        if trace.open:
+            trace.open[-1].db_queries += 1
+            trace.open[-1].db_ms += elapsed
+
+
+@receiver(connection_created)
+def _install_query_timer(sender, connection, **kwargs):
+    # At the head: a connection opened inside ``connection.execute_wrapper()`` (QueryRecorder)
+    # gets the timer after the scoped wrapper, and leaving the scope pops the last entry.
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+def log_if_slow(trace: Trace, request, status_code: int, *, slow_ms: float, sample_rate: float, rand) -> bool:
+    elapsed = trace.elapsed_ms()
+    if elapsed < slow_ms or rand() >= sample_rate:
+        return False
+    logger.warning(
+        "Slow request %s %s took %.0f ms",
+        request.method,
+        request.path,
+        elapsed,
+        extra={"method": request.method, "path": request.path, "status": status_code, "trace": trace.as_dict()},
+    )
+    return True
+
+
+class TracedTemplate(Template):
+    def render(self, context=None, request=None):
+        with span("template", template=self.origin.template_name):
+            return super().render(context, request)
+
+
+class TracedDjangoTemplates(DjangoTemplates):
+    """``DjangoTemplates`` whose templates render inside a ``template`` span."""
+
+    def from_string(self, template_code):
+        return TracedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TracedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -23,4 +23,7 @@ urlpatterns = [
     path("sitemap.xml", views.sitemap_xml, name="sitemap_xml"),
     path("robots.txt", views.robots_txt, name="robots_txt"),
     path("health/", views.health_check, name="health_check"),
+    path("health/queries/", views.instrumentation_stats, name="instrumentation_stats"),
+    path("health/profiles/", views.profile_report, name="profile_report"),
+    path("metrics/", views.metrics_view, name="metrics"),
 ]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import date, datetime
+from functools import lru_cache
 
 from django.utils import timezone
 
@@ -72,6 +73,109 @@ def _to_persian_digits(value: str) -> str:
     return value.translate(PERSIAN_DIGITS_TRANS)
 
 
+@lru_cache(maxsize=4096)
+def jalali_date_parts(d: date) -> tuple[int, int, int]:
+    """Memoized ``gregorian_to_jalali`` keyed by date (lists render the same days over and over)."""
+    return gregorian_to_jalali(d.year, d.month, d.day)
+
+
+# Zero-padded 0..99 lookup tables so rendering a token is a tuple index, not an f-string.
+_PADDED_ASCII = tuple(f"{i:02d}" for i in range(100))
+_PADDED_PERSIAN = tuple(_to_persian_digits(v) for v in _PADDED_ASCII)
+_PLAIN_ASCII = tuple(str(i) for i in range(100))
+_PLAIN_PERSIAN = tuple(_to_persian_digits(v) for v in _PLAIN_ASCII)
+
+_DATE_TOKENS = frozenset("YmndjF")
+_TIME_TOKENS = frozenset("Hi")
+
+
+class JalaliFormatter:
+    """A format string tokenized once into literal chunks and token codes.
+
+    Instances are immutable and shared; obtain them via ``compile_jalali_format``.
+    """
+
+    __slots__ = ("fmt", "persian_digits", "_parts")
+
+    def __init__(self, fmt: str, *, persian_digits: bool = True):
+        self.fmt = fmt
+        self.persian_digits = persian_digits
+
+        parts: list[tuple[bool, str]] = []
+        literal: list[str] = []
+        for ch in fmt:
+            if ch in _DATE_TOKENS or ch in _TIME_TOKENS:
+                if literal:
+                    parts.append((False, "".join(literal)))
+                    literal = []
+                parts.append((True, ch))
+            else:
+                literal.append(ch)
+        if literal:
+            parts.append((False, "".join(literal)))
+
+        if persian_digits:
+            parts = [(is_token, text if is_token else _to_persian_digits(text)) for is_token, text in parts]
+
+        self._parts = tuple(parts)
+
+    def __repr__(self) -> str:
+        return f"JalaliFormatter({self.fmt!r}, persian_digits={self.persian_digits})"
+
+    def __call__(self, value) -> str:
+        return self.format(value)
+
+    def format(self, value, *, tz=None) -> str:
+        if value is None:
+            return ""
+
+        if isinstance(value, datetime):
+            dt = value
+            if timezone.is_aware(dt):
+                dt = dt.astimezone(tz) if tz is not None else timezone.localtime(dt)
+            return self._render(dt.date(), dt.hour, dt.minute)
+        if isinstance(value, date):
+            return self._render(value, 0, 0)
+        return str(value)
+
+    def _render(self, d: date, hour: int, minute: int) -> str:
+        jy, jm, jd = jalali_date_parts(d)
+        if self.persian_digits:
+            padded, plain = _PADDED_PERSIAN, _PLAIN_PERSIAN
+            year = _to_persian_digits(f"{jy:04d}")
+        else:
+            padded, plain = _PADDED_ASCII, _PLAIN_ASCII
+            year = f"{jy:04d}"
+
+        out: list[str] = []
+        for is_token, text in self._parts:
+            if not is_token:
+                out.append(text)
+            elif text == "Y":
+                out.append(year)
+            elif text == "m":
+                out.append(padded[jm])
+            elif text == "n":
+                out.append(plain[jm])
+            elif text == "d":
+                out.append(padded[jd])
+            elif text == "j":
+                out.append(plain[jd])
+            elif text == "F":
+                out.append(PERSIAN_MONTH_NAMES[jm - 1])
+            elif text == "H":
+                out.append(padded[hour])
+            else:
+                out.append(padded[minute])
+        return "".join(out)
+
+
+@lru_cache(maxsize=128)
+def compile_jalali_format(fmt: str, persian_digits: bool = True) -> JalaliFormatter:
+    """Return the shared compiled formatter for ``fmt``."""
+    return JalaliFormatter(fmt, persian_digits=persian_digits)
+
+
 def format_jalali(value, fmt: str = "Y/m/d", *, persian_digits: bool = True) -> str:
     """Format a date/datetime in Jalali calendar using a small Django-like format.
 
@@ -85,41 +189,12 @@ def format_jalali(value, fmt: str = "Y/m/d", *, persian_digits: bool = True) ->
       - H: 2-digit hour (24h)
       - i: 2-digit minute
     """
-    if value is None:
-        return ""
-
-    dt: datetime | None = None
-    d: date | None = None
-
-    if isinstance(value, datetime):
-        dt = value
-        if timezone.is_aware(dt):
-            dt = timezone.localtime(dt)
-        d = dt.date()
-    elif isinstance(value, date):
-        d = value
-    else:
-        return str(value)
-
-    jy, jm, jd = gregorian_to_jalali(d.year, d.month, d.day)
-
-    hour = dt.hour if dt else 0
-    minute = dt.minute if dt else 0
-
-    tokens = {
-        "Y": f"{jy:04d}",
-        "m": f"{jm:02d}",
-        "n": f"{jm:d}",
-        "d": f"{jd:02d}",
-        "j": f"{jd:d}",
-        "F": PERSIAN_MONTH_NAMES[jm - 1],
-        "H": f"{hour:02d}",
-        "i": f"{minute:02d}",
-    }
+    return compile_jalali_format(fmt, persian_digits).format(value)
 
-    out_chars: list[str] = []
-    for ch in fmt:
-        out_chars.append(tokens.get(ch, ch))
-    out = "".join(out_chars)
-    return _to_persian_digits(out) if persian_digits else out
 
+def format_jalali_many(values, fmt: str = "Y/m/d", *, persian_digits: bool = True) -> list[str]:
+    """Format an iterable of dates/datetimes with one compiled formatter (admin lists, exports)."""
+    formatter = compile_jalali_format(fmt, persian_digits)
+    tz = timezone.get_current_timezone()
+    render = formatter.format
+    return [render(value, tz=tz) for value in values]
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from functools import partial
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Room kept at the end of max_length for a "-NNNN" suffix.
+_SUFFIX_RESERVE = 6
+_BULK_CHUNK = 200
+
+
+def slug_base(text: str, *, fallback: str, max_length: int | None = None) -> str:
+    base = slugify(text or "", allow_unicode=True) or fallback
+    if max_length:
+        base = base[: max(1, max_length - _SUFFIX_RESERVE)].rstrip("-") or fallback
+    return base
+
+
+def next_free_slug(base: str, taken) -> str:
+    """``base`` if free, otherwise ``base-N`` with the smallest free N >= 1."""
+    if base not in taken:
+        return base
+    suffix = 1
+    while f"{base}-{suffix}" in taken:
+        suffix += 1
+    return f"{base}-{suffix}"
+
+
+def _matching(base: str, candidates) -> set[str]:
+    pattern = re.compile(re.escape(base) + r"(?:-\d+)?")
+    return {slug for slug in candidates if slug and pattern.fullmatch(slug)}
+
+
+def _scope_filter(instance, scope_fields) -> dict:
+    attnames = (instance._meta.get_field(name).attname for name in scope_fields)
+    return {attname: getattr(instance, attname) for attname in attnames}
+
+
+def taken_slugs(queryset, base: str, *, field: str = "slug") -> set[str]:
+    """All values of ``field`` in ``queryset`` equal to ``base`` or ``base-N`` (one query)."""
+    candidates = queryset.filter(**{f"{field}__startswith": base}).values_list(field, flat=True)
+    return _matching(base, candidates)
+
+
+def allocate_slug(instance, source: str, *, fallback: str, scope_fields=(), field: str = "slug") -> str:
+    """Pick a free slug for ``instance`` using a single query for all ``base``/``base-N`` rows."""
+    model = type(instance)
+    max_length = model._meta.get_field(field).max_length
+    base = slug_base(source, fallback=fallback, max_length=max_length)
+    queryset = model._default_manager.filter(**_scope_filter(instance, scope_fields))
+    if instance.pk is not None:
+        queryset = queryset.exclude(pk=instance.pk)
+    return next_free_slug(base, taken_slugs(queryset, base, field=field))
+
+
+def save_with_slug(instance, save, *, source: str, fallback: str, scope_fields=(), field: str = "slug", attempts: int = 3):
+    """Allocate ``instance.<field>`` and call ``save()``.
+
+    If a concurrent writer takes the same slug first, the unique constraint
+    fails; the save is retried with a freshly allocated slug. Integrity errors
+    that are not slug collisions are re-raised unchanged.
+    """
+    for attempt in range(attempts):
+        slug = allocate_slug(instance, source, fallback=fallback, scope_fields=scope_fields, field=field)
+        setattr(instance, field, slug)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            setattr(instance, field, "")
+            clash = type(instance)._default_manager.filter(
+                **{field: slug, **_scope_filter(instance, scope_fields)}
+            )
+            if instance.pk is not None:
+                clash = clash.exclude(pk=instance.pk)
+            if attempt == attempts - 1 or not clash.exists():
+                raise
+
+
+def slugged_save(instance, save_method, *args, source: str, fallback: str, scope_fields=(), **kwargs):
+    """Model.save() helper: only allocates when the slug is blank."""
+    save = partial(save_method, *args, **kwargs)
+    if instance.slug:
+        return save()
+    return save_with_slug(instance, save, source=source, fallback=fallback, scope_fields=scope_fields)
+
+
+def allocate_slugs(model, sources, *, fallback: str, scope=None, field: str = "slug") -> list[str]:
+    """Bulk mode for importers: free slugs for every text in ``sources``.
+
+    ``scope`` is a list of filter dicts (one per source, e.g. ``{"category_id": 3}``)
+    or None for globally unique slugs. Existing slugs are read with one query per
+    scope and chunk of bases; slugs allocated earlier in the same batch are
+    reserved too, so duplicate names in one import get ``-1``, ``-2``, ...
+    """
+    sources = list(sources)
+    scopes = list(scope) if scope is not None else [{}] * len(sources)
+    if len(scopes) != len(sources):
+        raise ValueError("scope must have one entry per source")
+
+    max_length = model._meta.get_field(field).max_length
+    bases = [slug_base(text, fallback=fallback, max_length=max_length) for text in sources]
+
+    grouped: dict[tuple, set[str]] = defaultdict(set)
+    for base, filters in zip(bases, scopes):
+        grouped[tuple(sorted(filters.items()))].add(base)
+
+    taken: dict[tuple, set[str]] = {}
+    for key, group_bases in grouped.items():
+        queryset = model._default_manager.filter(**dict(key))
+        ordered = sorted(group_bases)
+        existing: set[str] = set()
+        for start in range(0, len(ordered), _BULK_CHUNK):
+            chunk = ordered[start : start + _BULK_CHUNK]
+            condition = Q()
+            for base in chunk:
+                condition |= Q(**{f"{field}__startswith": base})
+            candidates = list(queryset.filter(condition).values_list(field, flat=True))
+            for base in chunk:
+                existing |= _matching(base, candidates)
+        taken[key] = existing
+
+    allocated: list[str] = []
+    for base, filters in zip(bases, scopes):
+        used = taken[tuple(sorted(filters.items()))]
+        slug = next_free_slug(base, used)
+        used.add(slug)
+        allocated.append(slug)
+    return allocated
@@ -13,117 +13,32 @@ from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
 from django.utils.text import slugify
 from django.views.decorators.csrf import csrf_exempt
 
+from core import metrics, profiling
+from core.tracing import span
+from core.instrumentation import registry as instrumentation_registry
 from core.utils.jalali import format_jalali
 from store.models import Category, Product, ProductReview
-from store.utils import get_primary_image_url
+from store.utils import get_primary_image_srcset, get_primary_image_url
 
 from auth_security.ratelimit import check_rate_limit
 
 from .forms import ContactForm
 from .models import ContactMessage, Download, News
+from .packages import PACKAGE_DATA, package_body, package_list_body
+from .spa import get_shell, shell_body
 
 logger = logging.getLogger(__name__)
 
 
-PACKAGE_DATA = {
-    "basic": {
-        "type": "Basic",
-        "title": "راه‌اندازی استاندارد (Basic)",
-        "subtitle": "شروعی مطمئن و اقتصادی برای کسب‌وکارهای نوپا با تمرکز بر استانداردهای ضروری.",
-        "description": (
-            "این پکیج برای کارآفرینانی طراحی شده که می‌خواهند با بودجه‌ای مدیریت‌شده، "
-            "آشپزخانه‌ای استاندارد و قابل اخذ مجوز داشته باشند. تمرکز ما بر انتخاب "
-            "تجهیزات اصلی و چیدمان صحیح برای مسیرهای کاری سالم است."
-        ),
-        "features": [
-            "طراحی پلن دوبعدی (2D) چیدمان تجهیزات",
-            "مشاوره خرید تجهیزات اصلی و تهیه لیست ضروری",
-            "نظارت بر نصب و تاسیسات پایه",
-            "آموزش اولیه کار با دستگاه‌ها",
-        ],
-        "targets": [
-            "کافه‌های کوچک و اقتصادی",
-            "فست‌فودهای بیرون‌بر",
-            "کترینگ‌های خانگی و نوپا",
-        ],
-        "audience": [
-            "کافه‌های کوچک و اقتصادی",
-            "فست‌فودهای بیرون‌بر",
-            "کترینگ‌های خانگی و نوپا",
-        ],
-        "estimated_time": "۲۰ تا ۳۰ روز کاری",
-        "supervision_level": "نظارت پایه و کنترل استاندارد",
-    },
-    "vip": {
-        "type": "VIP",
-        "title": "مهندسی منو و فرآیند (VIP)",
-        "subtitle": "بهینه‌سازی دقیق گردش کار برای مجموعه‌هایی که حجم سفارش بالا و حساسیت عملیاتی دارند.",
-        "description": (
-            "در پکیج VIP فراتر از چیدمان حرکت می‌کنیم. تمرکز بر مهندسی منو و "
-            "طراحی فرآیند است تا تجهیزات بر اساس ظرفیت دقیق پخت انتخاب شوند و "
-            "پرت انرژی و نیروی انسانی به حداقل برسد."
-        ),
-        "features": [
-            "تمام خدمات پکیج Basic",
-            "تحلیل و آنالیز منو و تعیین ظرفیت دقیق پخت",
-            "طراحی جریان کاری (Workflow) برای سرعت سرویس‌دهی",
-            "انتخاب تجهیزات تخصصی و برندهای میان‌رده با دوام بالا",
-            "تست عملکردی منو (Recipe Calibration)",
-        ],
-        "targets": [
-            "رستوران‌های ایرانی و فرنگی متوسط",
-            "فودکورت‌ها و آشپزخانه‌های پرتردد",
-            "کافه‌رستوران‌های با حجم سفارش بالا",
-        ],
-        "audience": [
-            "رستوران‌های ایرانی و فرنگی متوسط",
-            "فودکورت‌ها و آشپزخانه‌های پرتردد",
-            "کافه‌رستوران‌های با حجم سفارش بالا",
-        ],
-        "estimated_time": "۴۵ تا ۶۰ روز کاری",
-        "supervision_level": "نظارت پیشرفته و کنترل فرآیند",
-    },
-    "cip": {
-        "type": "CIP",
-        "title": "راه‌اندازی جامع و کلید تحویل (CIP)",
-        "subtitle": "از ایده تا افتتاحیه؛ مدیریت صفر تا صد پروژه با استانداردهای اجرایی کامل.",
-        "description": (
-            "این کامل‌ترین سطح خدمات است. ما به‌عنوان بازوی اجرایی شما عمل می‌کنیم؛ "
-            "از برندینگ و کانسپت‌سازی تا خرید تجهیزات و آماده‌سازی بهره‌برداری، "
-            "همه‌چیز تحت مدیریت یکپارچه انجام می‌شود."
-        ),
-        "features": [
-            "مدیریت پیمان کامل (طراحی، خرید، اجرا)",
-            "استخدام و آموزش حرفه‌ای پرسنل آشپزخانه و سالن",
-            "هماهنگی با تیم‌های معماری و برندینگ",
-            "تامین تجهیزات از برندهای تاپ‌لول جهانی",
-            "راه‌اندازی نرم‌افزاری و سیستم‌های کنترل هزینه",
-            "پشتیبانی ویژه پس از افتتاح",
-        ],
-        "targets": [
-            "هتل‌ها و مجموعه‌های بزرگ",
-            "رستوران‌های زنجیره‌ای",
-            "سرمایه‌گذاران بدون تیم اجرایی",
-            "پروژه‌های لوکس و برند محور",
-        ],
-        "audience": [
-            "هتل‌ها و مجموعه‌های بزرگ",
-            "رستوران‌های زنجیره‌ای",
-            "سرمایه‌گذاران بدون تیم اجرایی",
-            "پروژه‌های لوکس و برند محور",
-        ],
-        "estimated_time": "۳ تا ۶ ماه",
-        "supervision_level": "مدیریت یکپارچه و نظارت کامل",
-    },
-}
-
 
 def home(request):
     categories = Category.objects.all()
-    products = Product.objects.prefetch_related("images").order_by("-created_at")[:6]
+    products = Product.objects.prefetch_related("images__derivatives").order_by("-created_at")[:6]
     projects = News.objects.all()[:3]
     latest_reviews = (
         ProductReview.objects.filter(is_approved=True)
@@ -133,6 +48,7 @@ def home(request):
 
     for product in products:
         product.card_image_url = get_primary_image_url(product)
+        product.card_image_srcset = get_primary_image_srcset(product)
 
     return render(
         request,
@@ -200,7 +116,8 @@ def contact(request):
 
     def _send_email_message(message: EmailMultiAlternatives) -> None:
         try:
-            message.send(fail_silently=False)
+            with metrics.timed_delivery("email", "contact"):
+                message.send(fail_silently=False)
             return
         except Exception:
             if not getattr(settings, "DEBUG", False):
@@ -253,7 +170,8 @@ def contact(request):
             )
 
         if form.is_valid():
-            message = form.save()
+            with span("contact.save"):
+                message = form.save()
 
             admin_emails = _admin_emails()
             
@@ -360,6 +278,32 @@ def user_status_api(request):
     })
 
 
+@csrf_exempt
+async def user_status_api_async(request):
+    """``user_status_api`` for ASGI (shopproject.asgi_urls)."""
+    user = await request.auser()
+    return JsonResponse({
+        "is_staff": user.is_authenticated and user.is_staff,
+    })
+
+
+PACKAGES_CACHE_CONTROL = "public, max-age=3600"
+
+
+def api_packages(request):
+    """All service packages, served from the precomputed body (see core.packages)."""
+    return package_list_body().response(
+        request, content_type="application/json", cache_control=PACKAGES_CACHE_CONTROL
+    )
+
+
+def api_package_detail(request, package_key: str):
+    body = package_body(package_key)
+    if body is None:
+        return JsonResponse({"error": "Package not found"}, status=404)
+    return body.response(request, content_type="application/json", cache_control=PACKAGES_CACHE_CONTROL)
+
+
 @csrf_exempt
 def contact_api(request):
     """
@@ -378,7 +322,8 @@ def contact_api(request):
 
     def _send_email_message(message: EmailMultiAlternatives) -> None:
         try:
-            message.send(fail_silently=False)
+            with metrics.timed_delivery("email", "contact"):
+                message.send(fail_silently=False)
             return
         except Exception:
             if not getattr(settings, "DEBUG", False):
@@ -435,7 +380,8 @@ def contact_api(request):
         return JsonResponse({"error": "Validation failed", "errors": errors}, status=400)
 
     # Save the message
-    message = form.save()
+    with span("contact.save"):
+        message = form.save()
 
     # Send email to admins
     admin_emails = _admin_emails()
@@ -576,7 +522,8 @@ def robots_txt(request):
     return HttpResponse(content, content_type="text/plain")
 
 
-def health_check(request):
+def _operational_access_allowed(request) -> bool:
+    """HEALTH_CHECK_TOKEN (header or ?token=) when configured, otherwise staff only."""
     token = (os.getenv("HEALTH_CHECK_TOKEN") or "").strip()
     if token:
         provided = (
@@ -584,9 +531,12 @@ def health_check(request):
             or request.GET.get("token")
             or ""
         ).strip()
-        if provided != token:
-            return HttpResponse(status=404)
-    elif not request.user.is_staff:
+        return constant_time_compare(provided, token)
+    return request.user.is_staff
+
+
+def health_check(request):
+    if not _operational_access_allowed(request):
         return HttpResponse(status=404)
 
     db_ok = True
@@ -605,25 +555,76 @@ def health_check(request):
     return JsonResponse(payload, status=200 if db_ok else 503)
 
 
+def instrumentation_stats(request):
+    """Staff-only per-view query/latency aggregates for this worker process."""
+    if not request.user.is_staff:
+        return HttpResponse(status=404)
+
+    return JsonResponse(
+        {
+            "pid": os.getpid(),
+            "time": timezone.now().isoformat(),
+            "budgets": getattr(settings, "QUERY_BUDGETS", {}),
+            "views": instrumentation_registry.snapshot(),
+        }
+    )
+
+
+def profile_report(request):
+    """Staff-only sampled profiles for this worker: top functions and collapsed stacks per view.
+
+    ``?view=<name>`` limits the report to one view; ``?format=collapsed`` returns
+    the stacks as text for flamegraph.pl or speedscope.
+    """
+    if not request.user.is_staff:
+        return HttpResponse(status=404)
+
+    views = profiling.store.report(view=request.GET.get("view") or None)
+    if request.GET.get("format") == "collapsed":
+        lines = [line for report in views.values() for line in report["flame"]]
+        return HttpResponse("\n".join(lines), content_type="text/plain; charset=utf-8")
+
+    return JsonResponse(
+        {
+            "pid": os.getpid(),
+            "time": timezone.now().isoformat(),
+            "sample_rate": getattr(settings, "PROFILE_SAMPLE_RATE", 0.0),
+            "views": views,
+        }
+    )
+
+
+def metrics_view(request):
+    """Prometheus text exposition, merged across workers when METRICS_MULTIPROCESS_DIR is set."""
+    if not _operational_access_allowed(request):
+        return HttpResponse(status=404)
+
+    response = HttpResponse(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+    response["Cache-Control"] = "no-store"
+    return response
+
+
 def react_app(request, path=""):
     """
     Serve the React application for all frontend routes.
     This view serves the built React app's index.html for all routes
     that don't match API endpoints or admin.
+
+    The shell is read once per process (see core.spa), the bootstrap blob with
+    categories/site info/user status is inlined, and precompressed variants are
+    served with a strong ETag so repeat visits get a 304.
     """
-    base_dir = Path(getattr(settings, "BASE_DIR", Path.cwd()))
-    frontend_dist = base_dir / "frontend" / "dist"
-    index_html = frontend_dist / "index.html"
-    
-    if not index_html.exists():
-        return HttpResponse(
-            "<h1>Frontend not built</h1><p>Please run 'npm run build' in the frontend directory.</p>",
-            status=503
-        )
-    
     try:
-        content = index_html.read_text(encoding="utf-8")
-        return HttpResponse(content, content_type="text/html")
+        shell = get_shell()
+        if shell is None:
+            return HttpResponse(
+                "<h1>Frontend not built</h1><p>Please run 'npm run build' in the frontend directory.</p>",
+                status=503
+            )
+        response = shell_body(request, shell).response(request, content_type="text/html; charset=utf-8")
     except Exception as e:
         logger.exception("Failed to serve React app")
         return HttpResponse(f"<h1>Error loading frontend</h1><p>{str(e)}</p>", status=500)
+
+    patch_vary_headers(response, ("Cookie",))
+    return response
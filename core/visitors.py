@@ -0,0 +1,68 @@
+"""Anonymous visitor identity for visit analytics, without the session store.
+
+A visitor is identified by a signed ``VISITOR_COOKIE_NAME`` cookie. A first
+request without the cookie gets an id derived from a daily fingerprint
+(HMAC of date + client IP + User-Agent), and that same id is then set as the
+cookie, so the first and later requests of a visit count once. Crawlers are
+not counted and get no cookie.
+"""
+
+from __future__ import annotations
+
+import re
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from auth_security.services import get_client_ip
+
+_SALT = "core.visitors"
+_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+_CRAWLER_PATTERN = re.compile(
+    r"bot|crawl|spider|slurp|scrap|fetch|preview|monitor|uptime|pingdom|headless|lighthouse|"
+    r"facebookexternalhit|embedly|quora link|whatsapp|telegram|curl|wget|python-|httpclient|"
+    r"okhttp|java/|go-http|libwww|axios/|node-fetch",
+    re.IGNORECASE,
+)
+
+
+def is_crawler(user_agent: str) -> bool:
+    """Treat empty User-Agents and the usual bots, link previewers and HTTP libraries as crawlers."""
+    user_agent = (user_agent or "").strip()
+    return not user_agent or bool(_CRAWLER_PATTERN.search(user_agent))
+
+
+def cookie_name() -> str:
+    return getattr(settings, "VISITOR_COOKIE_NAME", "vid")
+
+
+def daily_fingerprint(request) -> str:
+    user_agent = request.META.get("HTTP_USER_AGENT", "")[:512]
+    value = f"{timezone.localdate().isoformat()}|{get_client_ip(request)}|{user_agent}"
+    return salted_hmac(_SALT, value, algorithm="sha256").hexdigest()[:32]
+
+
+def visitor_id(request) -> tuple[str, bool]:
+    """Return (visitor id, whether the response should set the cookie)."""
+    max_age = getattr(settings, "VISITOR_COOKIE_AGE", 365 * 24 * 60 * 60)
+    try:
+        value = request.get_signed_cookie(cookie_name(), salt=_SALT, max_age=max_age)
+    except (KeyError, signing.BadSignature):
+        value = None
+    if value and _ID_PATTERN.fullmatch(value):
+        return value, False
+    return daily_fingerprint(request), True
+
+
+def set_visitor_cookie(response, value: str) -> None:
+    response.set_signed_cookie(
+        cookie_name(),
+        value,
+        salt=_SALT,
+        max_age=getattr(settings, "VISITOR_COOKIE_AGE", 365 * 24 * 60 * 60),
+        secure=getattr(settings, "SESSION_COOKIE_SECURE", False),
+        httponly=True,
+        samesite=getattr(settings, "SESSION_COOKIE_SAMESITE", "Lax"),
+    )
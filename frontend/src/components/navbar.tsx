@@ -5,6 +5,7 @@ import { Button } from "@/components/ui/button";
 import { FileText, Menu, X } from "lucide-react";
 import { motion, AnimatePresence } from "framer-motion";
 import axios from "axios";
+import { getBootstrap } from "@/lib/bootstrap";
 
 const navItems = [
   { name: "صفحه اصلی", path: "/" },
@@ -16,7 +17,7 @@ const navItems = [
 
 export function Navbar() {
   const location = useLocation();
-  const [isStaff, setIsStaff] = useState(false);
+  const [isStaff, setIsStaff] = useState(() => getBootstrap().user?.is_staff ?? false);
   const [isOpen, setIsOpen] = useState(false);
 
   useEffect(() => {
@@ -24,6 +25,7 @@ export function Navbar() {
   }, [location.pathname]);
 
   useEffect(() => {
+    if (getBootstrap().user) return;
     axios
       .get("/api/user/status/")
       .then((res) => {
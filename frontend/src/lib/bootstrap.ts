@@ -0,0 +1,22 @@
+// Data inlined by Django into the HTML shell (core.spa) so the first render
+// does not need the /api/categories/, /api/packages/ and /api/user/status/
+// round trips.
+export interface BootstrapData {
+  categories?: Array<{ id: number; name: string; slug: string }>;
+  site_info?: Record<string, string>;
+  packages?: Record<string, unknown>;
+  user?: { is_staff: boolean };
+}
+
+let cached: BootstrapData | null = null;
+
+export function getBootstrap(): BootstrapData {
+  if (cached) return cached;
+  try {
+    const el = document.getElementById("app-bootstrap");
+    cached = el?.textContent ? (JSON.parse(el.textContent) as BootstrapData) : {};
+  } catch {
+    cached = {};
+  }
+  return cached;
+}
@@ -4,6 +4,7 @@ import { Search, ArrowLeft, Loader2 } from "lucide-react";
 import { Link, useSearchParams } from "react-router-dom";
 import { cn } from "@/lib/utils";
 import axios from "axios";
+import { getBootstrap } from "@/lib/bootstrap";
 
 interface Category {
   id: number;
@@ -22,7 +23,8 @@ interface Product {
     name: string;
     slug: string;
   };
-  image: string;
+  image_url: string;
+  image_srcset?: { webp: string; jpeg: string };
   brand: string;
   domain: string;
   price: number;
@@ -32,7 +34,9 @@ interface Product {
 export function Catalog() {
   const [searchParams] = useSearchParams();
   const categoryFilter = searchParams.get("category") || "";
-  const [categories, setCategories] = useState<Category[]>([]);
+  const [categories, setCategories] = useState<Category[]>(
+    () => (getBootstrap().categories as Category[] | undefined) ?? []
+  );
   const [products, setProducts] = useState<Product[]>([]);
   const [loading, setLoading] = useState(true);
   const [searchQuery, setSearchQuery] = useState("");
@@ -41,10 +45,12 @@ export function Catalog() {
   const [total, setTotal] = useState(0);
 
   useEffect(() => {
-    // Fetch categories
-    axios.get("/api/categories/").then((res) => {
-      setCategories(res.data.categories);
-    });
+    // Fetch categories (already inlined in the shell on first load)
+    if (!getBootstrap().categories) {
+      axios.get("/api/categories/").then((res) => {
+        setCategories(res.data.categories);
+      });
+    }
 
     // Fetch products
     fetchProducts();
@@ -52,7 +58,7 @@ export function Catalog() {
 
   const fetchProducts = () => {
     setLoading(true);
-    const params: any = { page, page_size: 20 };
+    const params: any = { page, page_size: 20, view: "card" };
     if (categoryFilter) params.category = categoryFilter;
     if (searchQuery) params.search = searchQuery;
 
@@ -175,12 +181,24 @@ export function Catalog() {
                   <Link to={`/catalog/${product.category.slug}/${product.slug}`}>
                     {/* Product Image */}
                     <div className="relative h-64 overflow-hidden bg-white/5">
-                      {product.image ? (
-                        <img
-                          src={product.image}
-                          alt={product.name}
-                          className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-700"
-                        />
+                      {product.image_url ? (
+                        <picture>
+                          {product.image_srcset?.webp && (
+                            <source
+                              type="image/webp"
+                              srcSet={product.image_srcset.webp}
+                              sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+                            />
+                          )}
+                          <img
+                            src={product.image_url}
+                            srcSet={product.image_srcset?.jpeg || undefined}
+                            sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+                            alt={product.name}
+                            loading="lazy"
+                            className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-700"
+                          />
+                        </picture>
                       ) : (
                         <div className="w-full h-full flex items-center justify-center text-white/20">
                           <span className="font-iran">بدون تصویر</span>
@@ -15,7 +15,7 @@ interface ProductDetail {
     name: string;
     slug: string;
   };
-  images: Array<{ url: string; alt: string }>;
+  images: Array<{ url: string; alt: string; srcset?: { webp?: string; jpeg?: string } }>;
   features: Array<{ name: string; value: string }>;
   brand: string;
   sku: string;
@@ -29,6 +29,14 @@ interface ProductDetail {
     count: number;
     average_rating: number;
   };
+  related?: Array<{
+    id: number;
+    name: string;
+    slug: string;
+    category_slug: string;
+    price: number;
+    image_url: string;
+  }>;
 }
 
 export function ProductDetail() {
@@ -125,6 +133,8 @@ export function ProductDetail() {
                 <div className="relative aspect-square rounded-[2rem] overflow-hidden border border-white/10 bg-white/5">
                   <img
                     src={product.images[selectedImageIndex]?.url}
+                    srcSet={product.images[selectedImageIndex]?.srcset?.jpeg || undefined}
+                    sizes="(min-width: 1024px) 50vw, 100vw"
                     alt={product.images[selectedImageIndex]?.alt || product.name}
                     className="w-full h-full object-cover"
                   />
@@ -148,7 +158,10 @@ export function ProductDetail() {
                       >
                         <img
                           src={img.url}
+                          srcSet={img.srcset?.jpeg || undefined}
+                          sizes="96px"
                           alt={img.alt}
+                          loading="lazy"
                           className="w-full h-full object-cover"
                         />
                       </button>
@@ -264,6 +277,32 @@ export function ProductDetail() {
               </div>
             )}
 
+            {/* Related products */}
+            {product.related && product.related.length > 0 && (
+              <div className="space-y-3">
+                <h3 className="text-xl font-bold font-divan">محصولات مرتبط</h3>
+                <div className="grid grid-cols-2 gap-3">
+                  {product.related.map((item) => (
+                    <Link
+                      key={item.id}
+                      to={`/catalog/${item.category_slug}/${item.slug}`}
+                      className="flex items-center gap-3 p-3 rounded-2xl bg-white/5 border border-white/10 hover:border-rose-500/50 transition-colors"
+                    >
+                      {item.image_url && (
+                        <img
+                          src={item.image_url}
+                          alt={item.name}
+                          loading="lazy"
+                          className="w-12 h-12 rounded-xl object-cover flex-shrink-0"
+                        />
+                      )}
+                      <span className="text-sm font-iran text-white/80 line-clamp-2">{item.name}</span>
+                    </Link>
+                  ))}
+                </div>
+              </div>
+            )}
+
             {/* Additional Info */}
             <div className="grid grid-cols-2 gap-4 pt-6 border-t border-white/10">
               {product.sku && (
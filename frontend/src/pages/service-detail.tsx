@@ -5,6 +5,7 @@ import { Button } from "@/components/ui/button";
 import { ChefHat, UtensilsCrossed, Sparkles, CheckCircle2, ArrowRight, ArrowLeft, Loader2 } from "lucide-react";
 import { cn } from "@/lib/utils";
 import axios from "axios";
+import { getBootstrap } from "@/lib/bootstrap";
 
 interface PackageData {
   type: string;
@@ -30,14 +31,26 @@ const colorMap: Record<string, string> = {
   cip: "rose",
 };
 
+function inlinedPackage(serviceId?: string): PackageData | undefined {
+  return serviceId ? (getBootstrap().packages?.[serviceId] as PackageData | undefined) : undefined;
+}
+
 export function ServiceDetail() {
   const { serviceId } = useParams<{ serviceId: string }>();
   const navigate = useNavigate();
-  const [packageData, setPackageData] = useState<PackageData | null>(null);
-  const [loading, setLoading] = useState(true);
+  const inlined = inlinedPackage(serviceId);
+  const [packageData, setPackageData] = useState<PackageData | null>(inlined ?? null);
+  const [loading, setLoading] = useState(!inlined);
 
   useEffect(() => {
+    const bootstrapped = inlinedPackage(serviceId);
+    if (bootstrapped) {
+      setPackageData(bootstrapped);
+      setLoading(false);
+      return;
+    }
     if (serviceId) {
+      setLoading(true);
       axios
         .get(`/api/packages/${serviceId}/`)
         .then((res) => {
@@ -12,6 +12,8 @@ from django.utils.crypto import constant_time_compare
 
 from django_otp.models import Device, GenerateNotAllowed, VerifyNotAllowed
 
+from core.metrics import otp_sends, otp_verifies, timed_delivery
+
 
 def _new_salt() -> str:
     return secrets.token_urlsafe(16)
@@ -98,8 +100,10 @@ class EmailOTPDevice(Device):
             self.valid_until = None
             self.verify_fail_count = 0
             self.save(update_fields=["token_hash", "valid_until", "verify_fail_count"])
+            otp_verifies.inc(channel="email", result="success")
             return True
 
+        otp_verifies.inc(channel="email", result="failure")
         self.verify_fail_count += 1
         max_attempts = _settings_int("EMAIL_OTP_MAX_VERIFY_ATTEMPTS", 5)
         if self.verify_fail_count >= max_attempts:
@@ -162,6 +166,7 @@ class EmailOTPDevice(Device):
     def send_challenge(self) -> None:
         is_allowed, data = self.generate_is_allowed()
         if not is_allowed:
+            otp_sends.inc(channel="email", result="throttled")
             raise PermissionError(data or {})
 
         now = timezone.now()
@@ -214,10 +219,13 @@ class EmailOTPDevice(Device):
         message.attach_alternative(html_body, "text/html")
 
         try:
-            message.send(fail_silently=False)
+            with timed_delivery("email", "otp"):
+                message.send(fail_silently=False)
+            otp_sends.inc(channel="email", result="sent")
             return
         except Exception:
             if not getattr(settings, "DEBUG", False):
+                otp_sends.inc(channel="email", result="error")
                 raise
 
             # Fallback to filebased backend in DEBUG to avoid console/stdout issues on Windows.
@@ -231,6 +239,7 @@ class EmailOTPDevice(Device):
             )
             message.connection = connection
             message.send(fail_silently=False)
+            otp_sends.inc(channel="email", result="sent")
             return
 
     def generate_challenge(self):
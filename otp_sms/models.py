@@ -10,6 +10,7 @@ from django.utils.crypto import constant_time_compare
 from django_otp.models import Device, GenerateNotAllowed, VerifyNotAllowed
 
 from accounts.sms import send_sms
+from core.metrics import otp_sends, otp_verifies
 
 
 def _new_salt() -> str:
@@ -93,8 +94,10 @@ class SmsOTPDevice(Device):
             self.valid_until = None
             self.verify_fail_count = 0
             self.save(update_fields=["token_hash", "valid_until", "verify_fail_count"])
+            otp_verifies.inc(channel="sms", result="success")
             return True
 
+        otp_verifies.inc(channel="sms", result="failure")
         self.verify_fail_count += 1
         max_attempts = _settings_int("SMS_OTP_MAX_VERIFY_ATTEMPTS", 5)
         if self.verify_fail_count >= max_attempts:
@@ -155,6 +158,7 @@ class SmsOTPDevice(Device):
     def send_challenge(self) -> None:
         is_allowed, data = self.generate_is_allowed()
         if not is_allowed:
+            otp_sends.inc(channel="sms", result="throttled")
             raise PermissionError(data or {})
 
         now = timezone.now()
@@ -175,7 +179,12 @@ class SmsOTPDevice(Device):
         minutes = max(1, int(ttl_seconds // 60))
         brand = getattr(settings, "SITE_NAME", "استیرا")
         message = f"کد تایید {brand}: {token}\nاین کد تا {minutes} دقیقه معتبر است."
-        send_sms(self.phone, message)
+        try:
+            send_sms(self.phone, message, purpose="otp")
+        except Exception:
+            otp_sends.inc(channel="sms", result="error")
+            raise
+        otp_sends.inc(channel="sms", result="sent")
 
     def generate_challenge(self):
         self.send_challenge()
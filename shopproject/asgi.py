@@ -3,6 +3,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "shopproject.settings")
+# Route the read-only API to its async views (see shopproject.asgi_urls).
+os.environ.setdefault("ASYNC_VIEWS", "true")
 
 application = get_asgi_application()
 
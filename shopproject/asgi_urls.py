@@ -0,0 +1,42 @@
+"""URLconf for the ASGI entry point (``ASYNC_VIEWS`` on, see shopproject.asgi).
+
+Same routes as shopproject.urls, with the read-only API views swapped for
+their async variants; everything else stays sync and is run in a thread by
+Django as usual.
+"""
+
+from django.urls import URLPattern, URLResolver
+
+from core import views as core_views
+from store import views as store_views
+
+from .urls import urlpatterns as sync_urlpatterns
+
+ASYNC_VIEWS = {
+    "user_status_api": core_views.user_status_api_async,
+    "api_categories": store_views.api_categories_async,
+    "api_products": store_views.api_products_async,
+    "api_product_detail": store_views.api_product_detail_async,
+    "catalog_suggest": store_views.catalog_suggest_async,
+}
+
+
+def with_async_views(patterns) -> list:
+    """Copy ``patterns`` (recursing into includes) with ASYNC_VIEWS swapped in by route name."""
+    swapped = []
+    for entry in patterns:
+        if isinstance(entry, URLResolver):
+            entry = URLResolver(
+                entry.pattern,
+                with_async_views(entry.url_patterns),
+                entry.default_kwargs,
+                entry.app_name,
+                entry.namespace,
+            )
+        elif isinstance(entry, URLPattern) and entry.name in ASYNC_VIEWS:
+            entry = URLPattern(entry.pattern, ASYNC_VIEWS[entry.name], entry.default_args, entry.name)
+        swapped.append(entry)
+    return swapped
+
+
+urlpatterns = with_async_views(sync_urlpatterns)
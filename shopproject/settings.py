@@ -1,5 +1,8 @@
 ﻿import os
 from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # بارگذاری تنظیمات محلی از فایل .env (داخل ریپو ذخیره نمی‌شود چون در .gitignore است)
@@ -79,13 +82,17 @@ INSTALLED_APPS=[
     'store',
 ]
 MIDDLEWARE=[
+    'core.middleware.RequestContextMiddleware',
+    'core.middleware.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.RequestInstrumentationMiddleware',
     'core.middleware.SecurityHeadersMiddleware',
     'core.middleware.ExceptionLoggingMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.WhiteNoiseMiddleware',
     'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'core.middleware.SiteVisitMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'auth_security.middleware.LoginProtectionMiddleware',
@@ -93,16 +100,19 @@ MIDDLEWARE=[
     'core.middleware.AdminEnglishMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
-ROOT_URLCONF='shopproject.urls'
-TEMPLATES=[{'BACKEND':'django.template.backends.django.DjangoTemplates','DIRS':[BASE_DIR/'templates'],'APP_DIRS':True,'OPTIONS':{'context_processors':['django.template.context_processors.debug','django.template.context_processors.request','django.contrib.auth.context_processors.auth','django.contrib.messages.context_processors.messages','core.context_processors.site_info']}}]
+# shopproject.asgi turns this on: the read-only API routes then use their async views.
+ASYNC_VIEWS = _env_bool("ASYNC_VIEWS", False)
+ROOT_URLCONF = 'shopproject.asgi_urls' if ASYNC_VIEWS else 'shopproject.urls'
+TEMPLATES=[{'NAME':'django','BACKEND':'core.tracing.TracedDjangoTemplates','DIRS':[BASE_DIR/'templates'],'APP_DIRS':True,'OPTIONS':{'context_processors':['django.template.context_processors.debug','django.template.context_processors.request','django.contrib.auth.context_processors.auth','django.contrib.messages.context_processors.messages','core.context_processors.site_info']}}]
 
 # تنظیم ASGI
 ASGI_APPLICATION = 'shopproject.asgi.application'
 
 DB_ENGINE = os.getenv("DB_ENGINE", "django.db.backends.sqlite3").strip()
 USE_PYMYSQL = _env_bool("USE_PYMYSQL", True)
-if DB_ENGINE == "django.db.backends.mysql" and USE_PYMYSQL:
+if DB_ENGINE in ("django.db.backends.mysql", "core.db_backends.mysql") and USE_PYMYSQL:
     try:
         import pymysql
 
@@ -116,8 +126,24 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
-
-if DB_ENGINE == "django.db.backends.sqlite3":
+# Pooling swaps in core.db_backends.<vendor>: connections go back to a per-process pool after each
+# request (CONN_MAX_AGE=0) and are pinged before reuse instead of being reopened every minute.
+DB_POOL = _env_bool("DB_POOL", False)
+DB_POOL_OPTIONS = {
+    "SIZE": int(os.getenv("DB_POOL_SIZE", "5")),
+    "MAX_OVERFLOW": int(os.getenv("DB_POOL_MAX_OVERFLOW", "10")),
+    "RECYCLE": int(os.getenv("DB_POOL_RECYCLE", "300")),
+    "PRE_PING": _env_bool("DB_POOL_PRE_PING", True),
+    "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+}
+if DB_POOL:
+    DB_ENGINE = {
+        "django.db.backends.mysql": "core.db_backends.mysql",
+        "django.db.backends.sqlite3": "core.db_backends.sqlite3",
+    }.get(DB_ENGINE, DB_ENGINE)
+    DB_CONN_MAX_AGE = 0
+
+if DB_ENGINE in ("django.db.backends.sqlite3", "core.db_backends.sqlite3"):
     DATABASES = {
         "default": {
             "ENGINE": DB_ENGINE,
@@ -135,8 +161,33 @@ else:
             "PORT": DB_PORT,
             "OPTIONS": {"charset": "utf8mb4"},
             "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            # Persistent connections are checked before reuse, so MySQL's wait_timeout doesn't surface as errors.
+            "CONN_HEALTH_CHECKS": True,
         }
     }
+if DB_POOL:
+    DATABASES["default"]["POOL"] = DB_POOL_OPTIONS
+
+# Optional read replica (same engine and credentials unless overridden). core.db_router sends
+# catalog/content reads there; writes, and reads right after a write, stay on "default".
+DB_REPLICA_NAME = os.getenv("DB_REPLICA_NAME", "")
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST", "")
+if DB_REPLICA_NAME or DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": DB_REPLICA_NAME or DATABASES["default"]["NAME"],
+        "TEST": {"MIRROR": "default"},
+    }
+    if "sqlite3" not in DB_ENGINE:
+        DATABASES["replica"].update(
+            USER=os.getenv("DB_REPLICA_USER", DB_USER),
+            PASSWORD=os.getenv("DB_REPLICA_PASSWORD", DB_PASSWORD),
+            HOST=DB_REPLICA_HOST or DB_HOST,
+            PORT=os.getenv("DB_REPLICA_PORT", DB_PORT),
+            OPTIONS=dict(DATABASES["default"]["OPTIONS"]),
+        )
+    DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "10"))
 
 def _normalize_url(value: str | None, default: str) -> str:
     cleaned = (value or default).strip() or default
@@ -168,11 +219,37 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 DATA_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("DATA_UPLOAD_MAX_MEMORY_SIZE", str(25 * 1024 * 1024)))
 FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("FILE_UPLOAD_MAX_MEMORY_SIZE", str(25 * 1024 * 1024)))
 
+# Shared cache: CACHE_URL=redis://host:6379/0 (needs the "redis" package) or memcached://host:11211
+# (needs "pymemcache"). Without it each worker has its own LocMemCache, and everything that must agree
+# across workers (sessions, catalog generation, cached API bodies) falls back to per-process behaviour.
+CACHE_URL = os.getenv("CACHE_URL", "").strip()
+if CACHE_URL.startswith(("redis://", "rediss://", "unix://")):
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_URL}}
+elif CACHE_URL.startswith("memcached://"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": CACHE_URL.removeprefix("memcached://"),
+        }
+    }
+elif CACHE_URL:
+    raise ImproperlyConfigured(f"Unsupported CACHE_URL scheme: {CACHE_URL.split(':', 1)[0]}")
+SHARED_CACHE = bool(CACHE_URL)
+
 # Security defaults (production settings are enabled automatically when DEBUG is false)
 X_FRAME_OPTIONS = os.getenv("X_FRAME_OPTIONS", "DENY")
 SECURE_CONTENT_TYPE_NOSNIFF = True
 SECURE_REFERRER_POLICY = os.getenv("SECURE_REFERRER_POLICY", "same-origin")
 SESSION_COOKIE_HTTPONLY = True
+# core.sessions keeps sessions in the cache and writes only staff sessions through to the DB. It needs
+# a cache every worker shares (CACHE_URL below), so it is only the default when one is configured;
+# core.checks rejects it on a per-process cache.
+SESSION_ENGINE = os.getenv(
+    "SESSION_ENGINE", "core.sessions" if SHARED_CACHE else "django.contrib.sessions.backends.db"
+)
+SESSION_CACHE_ALIAS = os.getenv("SESSION_CACHE_ALIAS", "default")
+SESSION_PURGE_BATCH_SIZE = int(os.getenv("SESSION_PURGE_BATCH_SIZE", "500"))
+SESSION_PURGE_INTERVAL = int(os.getenv("SESSION_PURGE_INTERVAL", "300"))
 SESSION_COOKIE_SAMESITE = os.getenv("SESSION_COOKIE_SAMESITE", "Lax")
 CSRF_COOKIE_SAMESITE = os.getenv("CSRF_COOKIE_SAMESITE", "Lax")
 
@@ -193,6 +270,21 @@ if not DEBUG:
 
 
 
+# Product image derivatives (responsive WebP/JPEG variants rendered in the background)
+PRODUCT_IMAGE_DERIVATIVE_WIDTHS = [
+    int(w) for w in os.getenv("PRODUCT_IMAGE_DERIVATIVE_WIDTHS", "320,640,960,1280").split(",") if w.strip().isdigit()
+]
+PRODUCT_IMAGE_DERIVATIVE_QUALITY = int(os.getenv("PRODUCT_IMAGE_DERIVATIVE_QUALITY", "80"))
+
+# Catalog generation (store.facets): workers re-read it from the DB at most this often, so a catalog
+# change reaches every worker's facet index and cached API bodies within this many seconds.
+CATALOG_GENERATION_CHECK_SECONDS = int(os.getenv("CATALOG_GENERATION_CHECK_SECONDS", "5"))
+
+# In-process background worker pool (core.background)
+BACKGROUND_TASK_WORKERS = int(os.getenv("BACKGROUND_TASK_WORKERS", "2"))
+BACKGROUND_TASKS_EAGER = _env_bool("BACKGROUND_TASKS_EAGER", False)
+
+
 # SMS settings
 SMS_BACKEND = os.getenv('SMS_BACKEND', 'console')  # console | kavenegar
 KAVENEGAR_API_KEY = os.getenv('KAVENEGAR_API_KEY', '')
@@ -218,6 +310,11 @@ EMAIL_USE_SSL = os.getenv('EMAIL_USE_SSL', '0').strip().lower() in ('1', 'true',
 LOG_DIR = BASE_DIR / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
+# Handlers below are written from a background thread (core.log, LOG_QUEUE_ENABLED): request threads
+# only enqueue records, and drop them when LOG_QUEUE_SIZE records are already waiting.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+LOG_QUEUE_ENABLED = _env_bool("LOG_QUEUE_ENABLED", True)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -225,6 +322,22 @@ LOGGING = {
         "verbose": {
             "format": "%(asctime)s %(levelname)s %(name)s %(message)s",
         },
+        "json": {
+            "()": "core.log.JsonFormatter",
+        },
+    },
+    "filters": {
+        "request_context": {
+            "()": "core.log.RequestContextFilter",
+        },
+        # At most 5 "Rate limit exceeded" lines per scope/ip a minute, then 1 in 100.
+        "throttle_by_scope_ip": {
+            "()": "core.log.ThrottleFilter",
+            "burst": 5,
+            "per": 60,
+            "sample": 100,
+            "key_fields": ["scope", "ip"],
+        },
     },
     "handlers": {
         "file_errors": {
@@ -235,6 +348,20 @@ LOGGING = {
             "backupCount": 5,
             "formatter": "verbose",
         },
+        "file_json": {
+            "level": LOG_LEVEL,
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": str(LOG_DIR / "app.jsonl"),
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+            "formatter": "json",
+            # Also set when the queue is off; with it on, core.log tags records before enqueueing.
+            "filters": ["request_context"],
+        },
+    },
+    "root": {
+        "handlers": ["file_json"],
+        "level": LOG_LEVEL,
     },
     "loggers": {
         "django.request": {
@@ -245,11 +372,53 @@ LOGGING = {
         "core.errors": {
             "handlers": ["file_errors"],
             "level": "ERROR",
-            "propagate": False,
+            "propagate": True,
+        },
+        "auth_security.ratelimit": {
+            "filters": ["throttle_by_scope_ip"],
         },
     },
 }
 
+# Request instrumentation (core.middleware.RequestInstrumentationMiddleware)
+REQUEST_INSTRUMENTATION_ENABLED = _env_bool("REQUEST_INSTRUMENTATION_ENABLED", True)
+# Max queries per request, keyed by view function name (includes middleware work such as visit tracking).
+QUERY_BUDGETS = {
+    "home": 16,
+    "catalog_home": 16,
+    "category_detail": 16,
+    "product_detail": 20,
+    "api_categories": 12,
+    "api_products": 16,
+    "api_product_detail": 20,
+}
+# The async variants (shopproject.asgi_urls) report under their own names.
+QUERY_BUDGETS.update({f"{view}_async": QUERY_BUDGETS[view] for view in ("api_categories", "api_products", "api_product_detail")})
+_query_budget_default = os.getenv("QUERY_BUDGET_DEFAULT", "").strip()
+QUERY_BUDGET_DEFAULT = int(_query_budget_default) if _query_budget_default else None
+
+# Request tracing (core.tracing): requests slower than TRACE_SLOW_MS are logged to "core.trace" as one
+# JSON line with their spans (templates, SQL, email/SMS, invoice PDFs); TRACE_SAMPLE_RATE keeps a fraction.
+TRACE_ENABLED = _env_bool("TRACE_ENABLED", True)
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "500"))
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+
+# Sampling profiler (core.profiling): cProfile this share of requests (staff can force one with an
+# X-Profile header); the top functions per view are kept per worker and served at /health/profiles/.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "30"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+
+# Prometheus metrics (core.metrics, served at /metrics/ behind HEALTH_CHECK_TOKEN).
+# With several workers, point this at a shared writable directory (cleared on deploy)
+# so every worker's counters are merged on scrape.
+METRICS_MULTIPROCESS_DIR = os.getenv("METRICS_MULTIPROCESS_DIR", "").strip()
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+# Visit analytics (core.visitors): signed visitor cookie instead of a session per anonymous visitor.
+VISITOR_COOKIE_NAME = os.getenv("VISITOR_COOKIE_NAME", "vid")
+VISITOR_COOKIE_AGE = int(os.getenv("VISITOR_COOKIE_AGE", str(365 * 24 * 60 * 60)))
+
 # Branding / Invoice company info
 SITE_NAME = os.getenv('SITE_NAME', 'استیرا')
 ABOUT_TEMPLATE = os.getenv('ABOUT_TEMPLATE', 'about.html')
@@ -275,6 +444,7 @@ if _auth_security_login_paths:
     ]
 else:
     AUTH_SECURITY_LOGIN_PATHS = ["/login/", _default_admin_login]
+# Exact paths, "/prefix/*" or "^regex" entries; compiled once by auth_security.policy.
 AUTH_SECURITY_PROTECTED_PATHS = os.getenv("AUTH_SECURITY_PROTECTED_PATHS", "")
 AUTH_SECURITY_TRUST_X_FORWARDED_FOR = _env_bool("AUTH_SECURITY_TRUST_X_FORWARDED_FOR", False)
 AUTH_SECURITY_LOGIN_IP_MAX_ATTEMPTS = int(os.getenv("AUTH_SECURITY_LOGIN_IP_MAX_ATTEMPTS", "10"))
@@ -285,6 +455,8 @@ AUTH_SECURITY_LOGIN_IP_BLOCK_AFTER_ATTEMPTS = int(
 AUTH_SECURITY_IP_BLOCK_SECONDS = int(os.getenv("AUTH_SECURITY_IP_BLOCK_SECONDS", "1800"))
 AUTH_SECURITY_LOGIN_IDENTIFIER_MAX_ATTEMPTS = int(os.getenv("AUTH_SECURITY_LOGIN_IDENTIFIER_MAX_ATTEMPTS", "5"))
 AUTH_SECURITY_LOGIN_IDENTIFIER_WINDOW_SECONDS = int(os.getenv("AUTH_SECURITY_LOGIN_IDENTIFIER_WINDOW_SECONDS", "600"))
+# Per-path overrides of the limits above, e.g. {"/admin/login/": {"IDENTIFIER_MAX_ATTEMPTS": 3}}.
+AUTH_SECURITY_PATH_LIMITS = {}
 
 # Security headers
 CSP_DEFAULT = os.getenv(
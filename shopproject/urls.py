@@ -17,13 +17,23 @@ urlpatterns = [
     # API endpoints (must come before React app routing)
     path('api/user/status/', core_views.user_status_api, name='user_status_api'),
     path('api/contact/', core_views.contact_api, name='contact_api'),
+    path('api/packages/', core_views.api_packages, name='api_packages'),
+    path('api/packages/<str:package_key>/', core_views.api_package_detail, name='api_package_detail'),
     path('api/categories/', store_views.api_categories, name='api_categories'),
     path('api/products/', store_views.api_products, name='api_products'),
+    path('api/products/batch/', store_views.api_products_batch, name='api_products_batch'),
     path('api/products/<str:category_slug>/<str:product_slug>/', store_views.api_product_detail, name='api_product_detail'),
     
+    # Operational endpoints
+    path('health/', core_views.health_check, name='health_check'),
+    path('health/queries/', core_views.instrumentation_stats, name='instrumentation_stats'),
+    path('health/profiles/', core_views.profile_report, name='profile_report'),
+    path('metrics/', core_views.metrics_view, name='metrics'),
+
     # Legacy redirects
     path('shop/invoice/manual/', store_views.manual_invoice, name='manual_invoice_legacy'),
     path('shop/invoice/manual/pdf/', store_views.manual_invoice_pdf, name='manual_invoice_pdf_legacy'),
+    path('shop/invoice/manual/products/', store_views.manual_invoice_products, name='manual_invoice_products_legacy'),
     path("login/", RedirectView.as_view(url="/contact/", permanent=True)),
     path("signup/", RedirectView.as_view(url="/contact/", permanent=True)),
     path("cart/", RedirectView.as_view(url="/catalog/", permanent=True)),
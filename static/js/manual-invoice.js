@@ -3,9 +3,11 @@
         const itemsBody = document.getElementById("itemsBody");
         const calcTotalsBtn = document.getElementById("calcTotalsBtn");
         const productSelect = document.getElementById("productSelect");
+        const productSearch = document.getElementById("productSearch");
         const addProductBtn = document.getElementById("addProductBtn");
 
         const pdfEndpoint = root?.dataset.pdfEndpoint || "";
+        const productSearchEndpoint = root?.dataset.productSearchEndpoint || "";
         const defaultTitle = root?.dataset.invoiceTitle || "پیش‌فاکتور";
         const defaultInvoiceNumber = root?.dataset.invoiceNumber || "#000000";
 
@@ -264,6 +266,54 @@
           productSelect.value = "";
         };
 
+        // The picker is filled on demand from the product search endpoint instead of inlining the catalog.
+        let searchTimer = null;
+        let searchController = null;
+        const fillProductOptions = (products) => {
+          if (!productSelect) return;
+          productSelect.length = 1;
+          products.forEach((p) => {
+            const opt = document.createElement("option");
+            opt.value = String(p.id);
+            opt.dataset.name = p.name;
+            opt.dataset.price = String(p.price);
+            opt.textContent = `${p.name} - ${Number(p.price || 0).toLocaleString("fa-IR")} تومان`;
+            productSelect.appendChild(opt);
+          });
+          if (products.length) productSelect.selectedIndex = 1;
+        };
+        const searchProducts = async () => {
+          const q = (productSearch?.value || "").trim();
+          if (q.length < 2 || !productSearchEndpoint) {
+            fillProductOptions([]);
+            return;
+          }
+          if (searchController) searchController.abort();
+          searchController = new AbortController();
+          try {
+            const url = new URL(productSearchEndpoint, window.location.href);
+            url.searchParams.set("q", q);
+            const resp = await fetch(url, { credentials: "same-origin", signal: searchController.signal });
+            if (!resp.ok) return;
+            const data = await resp.json();
+            fillProductOptions(Array.isArray(data.products) ? data.products : []);
+          } catch (err) {
+            if (err?.name !== "AbortError") fillProductOptions([]);
+          }
+        };
+        if (productSearch) {
+          productSearch.addEventListener("input", () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(searchProducts, 250);
+          });
+          productSearch.addEventListener("keydown", (e) => {
+            if (e.key === "Enter") {
+              e.preventDefault();
+              addProductFromSelection();
+            }
+          });
+        }
+
         if (addProductBtn) addProductBtn.addEventListener("click", addProductFromSelection);
         if (productSelect) {
           productSelect.addEventListener("keydown", (e) => {
@@ -2,3 +2,6 @@ from django.apps import AppConfig
 class StoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'store'
+
+    def ready(self) -> None:  # pragma: no cover
+        from . import signals  # noqa: F401
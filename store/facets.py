@@ -0,0 +1,461 @@
+"""In-memory facet index for catalog filtering.
+
+Every product gets a bit position (in ``created_at`` order, so new products are
+appended and "newest first" is "highest bit first"). Each facet value keeps a
+Python ``int`` used as a bitset of the products that have it, which makes
+multi-facet filters a handful of ANDs and counts a ``bit_count()`` each.
+
+Facets: ``category`` (slug), ``brand``, ``available`` ("1"/"0") and one facet
+per ``ProductFeature`` name. Prices are kept in ~64 quantile buckets so a price
+range is an OR of whole buckets plus an exact check of the two edge buckets.
+
+The index lives in each process and is versioned by the catalog generation, a
+counter in the ``CatalogGeneration`` row that every write bumps
+(``record_change``). Processes read it through the cache, at most
+``CATALOG_GENERATION_CHECK_SECONDS`` stale, so every worker sees a change even
+when the cache is per-process. Each change is also logged in the cache under
+its generation number; a process replays the product ids it has not seen yet,
+or rebuilds from scratch when the log is incomplete (always, for workers that
+do not share the writer's cache) or a change affects the whole catalog
+(categories, bulk imports).
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from core.db_router import use_primary
+from core.metrics import record_cache_lookup
+
+GENERATION_KEY = "store:facets:generation"
+_CHANGE_KEY = "store:facets:change:{}"
+_CHANGE_TIMEOUT = 60 * 60
+_MAX_REPLAY = 500
+_PRICE_BUCKETS = 64
+_COUNT_CACHE_SIZE = 128
+# Change-log entry meaning "rebuild everything".
+FULL_REBUILD = 0
+
+FEATURE_PREFIX = "feature:"
+
+
+@dataclass(frozen=True)
+class FacetFilters:
+    """OR within a facet, AND across facets. ``available=None`` means both."""
+
+    categories: tuple[str, ...] = ()
+    brands: tuple[str, ...] = ()
+    features: tuple[tuple[str, str], ...] = ()
+    price_min: int | None = None
+    price_max: int | None = None
+    available: bool | None = True
+
+    def groups(self) -> dict[str, tuple[str, ...]]:
+        groups: dict[str, tuple[str, ...]] = {}
+        if self.categories:
+            groups["category"] = self.categories
+        if self.brands:
+            groups["brand"] = self.brands
+        if self.available is not None:
+            groups["available"] = ("1" if self.available else "0",)
+        for name, value in self.features:
+            key = FEATURE_PREFIX + name
+            groups[key] = groups.get(key, ()) + (value,)
+        return groups
+
+
+@dataclass
+class FacetResult:
+    total: int
+    product_ids: list[int]
+    counts: dict[str, dict[str, int]] = field(default_factory=dict)
+    price_min: int | None = None
+    price_max: int | None = None
+
+
+def bits_from_positions(positions) -> int:
+    positions = list(positions)
+    if not positions:
+        return 0
+    bitmap = bytearray((max(positions) >> 3) + 1)
+    for pos in positions:
+        bitmap[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bitmap, "little")
+
+
+class FacetIndex:
+    def __init__(self):
+        self.product_ids: list[int | None] = []
+        self.positions: dict[int, int] = {}
+        self.prices: list[int] = []
+        self.alive = 0
+        self.postings: dict[tuple[str, str], int] = {}
+        self._keys: dict[int, tuple[tuple[str, str], ...]] = {}
+        self.price_bounds: list[int] = []
+        self.price_buckets: list[int] = []
+        self._bucket_positions: list[set[int]] = []
+        # Counts per FacetFilters (no search restriction); cleared on every refresh.
+        self._count_cache: OrderedDict[FacetFilters, tuple] = OrderedDict()
+
+    # -- building -------------------------------------------------------
+
+    @classmethod
+    def build(cls) -> FacetIndex:
+        from .models import Product
+
+        index = cls()
+        rows = list(
+            Product.objects.order_by("created_at", "id").values_list(
+                "id", "category__slug", "brand", "price", "is_available"
+            )
+        )
+        index._reset_price_buckets(sorted(row[3] for row in rows))
+        features = _features_by_product(None)
+        positions: dict[tuple[str, str], list[int]] = {}
+        for row in rows:
+            pos = index._position_for(row[0])
+            index.prices[pos] = row[3]
+            keys = index._keys_for(row, features.get(row[0], ()))
+            index._keys[pos] = keys
+            for key in keys:
+                positions.setdefault(key, []).append(pos)
+            index._bucket_positions[index._bucket(row[3])].add(pos)
+        index.postings = {key: bits_from_positions(found) for key, found in positions.items()}
+        index.alive = bits_from_positions(index.positions.values())
+        index.price_buckets = [bits_from_positions(found) for found in index._bucket_positions]
+        return index
+
+    def _reset_price_buckets(self, sorted_prices: list[int]) -> None:
+        bounds: list[int] = []
+        if sorted_prices:
+            step = max(1, len(sorted_prices) // _PRICE_BUCKETS)
+            for i in range(step, len(sorted_prices), step):
+                if not bounds or sorted_prices[i] > bounds[-1]:
+                    bounds.append(sorted_prices[i])
+        self.price_bounds = bounds
+        self.price_buckets = [0] * (len(bounds) + 1)
+        self._bucket_positions = [set() for _ in range(len(bounds) + 1)]
+
+    def _bucket(self, price: int) -> int:
+        return bisect_right(self.price_bounds, price)
+
+    def _position_for(self, product_id: int) -> int:
+        pos = self.positions.get(product_id)
+        if pos is None:
+            pos = len(self.product_ids)
+            self.positions[product_id] = pos
+            self.product_ids.append(product_id)
+            self.prices.append(0)
+        return pos
+
+    @staticmethod
+    def _keys_for(row, features) -> tuple[tuple[str, str], ...]:
+        _, category_slug, brand, _, is_available = row
+        keys = [("available", "1" if is_available else "0")]
+        if category_slug:
+            keys.append(("category", category_slug))
+        if brand:
+            keys.append(("brand", brand.strip()))
+        keys.extend((FEATURE_PREFIX + name, value) for name, value in features)
+        return tuple(dict.fromkeys(keys))
+
+    # -- incremental updates --------------------------------------------
+
+    def _remove(self, pos: int) -> None:
+        mask = ~(1 << pos)
+        for key in self._keys.pop(pos, ()):
+            remaining = self.postings.get(key, 0) & mask
+            if remaining:
+                self.postings[key] = remaining
+            else:
+                self.postings.pop(key, None)
+        bucket = self._bucket(self.prices[pos])
+        self._bucket_positions[bucket].discard(pos)
+        self.price_buckets[bucket] &= mask
+        self.alive &= mask
+
+    def refresh_products(self, product_ids) -> None:
+        """Re-read the given products; ids that no longer exist are dropped."""
+        from .models import Product
+
+        self._count_cache.clear()
+        product_ids = set(product_ids)
+        for product_id in product_ids:
+            pos = self.positions.get(product_id)
+            if pos is not None:
+                self._remove(pos)
+
+        rows = list(
+            Product.objects.filter(id__in=product_ids).order_by("created_at", "id").values_list(
+                "id", "category__slug", "brand", "price", "is_available"
+            )
+        )
+        features = _features_by_product(product_ids)
+        for row in rows:
+            pos = self._position_for(row[0])
+            bit = 1 << pos
+            self.prices[pos] = row[3]
+            keys = self._keys_for(row, features.get(row[0], ()))
+            self._keys[pos] = keys
+            for key in keys:
+                self.postings[key] = self.postings.get(key, 0) | bit
+            bucket = self._bucket(row[3])
+            self._bucket_positions[bucket].add(pos)
+            self.price_buckets[bucket] |= bit
+            self.alive |= bit
+
+        for product_id in product_ids - {row[0] for row in rows}:
+            pos = self.positions.pop(product_id, None)
+            if pos is not None:
+                self.product_ids[pos] = None
+
+    # -- queries --------------------------------------------------------
+
+    def price_mask(self, price_min: int | None, price_max: int | None) -> int:
+        if price_min is None and price_max is None:
+            return self.alive
+        low = price_min if price_min is not None else float("-inf")
+        high = price_max if price_max is not None else float("inf")
+        first = self._bucket(low) if price_min is not None else 0
+        last = self._bucket(high) if price_max is not None else len(self.price_buckets) - 1
+        bits = 0
+        for bucket in range(first, last + 1):
+            whole_low = price_min is None or bucket > first
+            whole_high = price_max is None or bucket < last
+            if whole_low and whole_high:
+                bits |= self.price_buckets[bucket]
+            else:
+                edge = [pos for pos in self._bucket_positions[bucket] if low <= self.prices[pos] <= high]
+                bits |= bits_from_positions(edge)
+        return bits
+
+    def _group_mask(self, group: str, values) -> int:
+        bits = 0
+        for value in values:
+            bits |= self.postings.get((group, value), 0)
+        return bits
+
+    def search(self, filters: FacetFilters, *, restrict: int | None = None, offset: int = 0,
+               limit: int = 20, with_counts: bool = False) -> FacetResult:
+        """Match ``filters`` (optionally ANDed with ``restrict``) and return one page, newest first."""
+        groups = filters.groups()
+        base = self.price_mask(filters.price_min, filters.price_max)
+        if restrict is not None:
+            base &= restrict
+        masks = {group: self._group_mask(group, values) for group, values in groups.items()}
+
+        matched = base
+        for mask in masks.values():
+            matched &= mask
+
+        result = FacetResult(total=matched.bit_count(), product_ids=self._page(matched, offset, limit))
+        if with_counts:
+            cached = self._count_cache.get(filters) if restrict is None else None
+            if cached is not None:
+                self._count_cache.move_to_end(filters)
+            else:
+                cached = (self._counts(base, masks), *self._price_bounds_of(matched))
+                if restrict is None:
+                    self._count_cache[filters] = cached
+                    while len(self._count_cache) > _COUNT_CACHE_SIZE:
+                        self._count_cache.popitem(last=False)
+            result.counts, result.price_min, result.price_max = cached
+        return result
+
+    def _counts(self, base: int, masks: dict[str, int]) -> dict[str, dict[str, int]]:
+        # Disjunctive counts: a facet's own selection does not narrow its counts.
+        scopes: dict[str, int] = {}
+        counts: dict[str, dict[str, int]] = {}
+        for (group, value), bits in self.postings.items():
+            scope = scopes.get(group)
+            if scope is None:
+                scope = base
+                for name, mask in masks.items():
+                    if name != group:
+                        scope &= mask
+                scopes[group] = scope
+            count = (bits & scope).bit_count()
+            if count:
+                counts.setdefault(group, {})[value] = count
+        return {
+            group: dict(sorted(values.items(), key=lambda item: (-item[1], item[0])))
+            for group, values in sorted(counts.items())
+        }
+
+    def _price_bounds_of(self, bits: int) -> tuple[int | None, int | None]:
+        hits = [bucket_bits & bits for bucket_bits in self.price_buckets]
+        filled = [b for b in hits if b]
+        if not filled:
+            return None, None
+        low = min(self.prices[pos] for pos in _positions_of(filled[0]))
+        high = max(self.prices[pos] for pos in _positions_of(filled[-1]))
+        return low, high
+
+    def _page(self, bits: int, offset: int, limit: int) -> list[int]:
+        """Product ids of set bits ``offset``..``offset+limit``, highest bit (newest) first."""
+        if not bits or limit <= 0:
+            return []
+        binary = bin(bits)[2:]
+        top = len(binary) - 1
+        cursor = 0
+        # Skip whole chunks with str.count; only the last partial chunk is walked.
+        chunk = 4096
+        while offset:
+            ones = binary.count("1", cursor, cursor + chunk)
+            if ones > offset or cursor + chunk >= len(binary):
+                break
+            offset -= ones
+            cursor += chunk
+        ids: list[int] = []
+        while len(ids) < limit:
+            cursor = binary.find("1", cursor)
+            if cursor == -1:
+                break
+            if offset:
+                offset -= 1
+            else:
+                ids.append(self.product_ids[top - cursor])
+            cursor += 1
+        return ids
+
+
+def _positions_of(bits: int):
+    binary = bin(bits)[2:]
+    top = len(binary) - 1
+    cursor = binary.find("1")
+    while cursor != -1:
+        yield top - cursor
+        cursor = binary.find("1", cursor + 1)
+
+
+def _features_by_product(product_ids) -> dict[int, list[tuple[str, str]]]:
+    from .models import ProductFeature
+
+    queryset = ProductFeature.objects.all()
+    if product_ids is not None:
+        queryset = queryset.filter(product_id__in=product_ids)
+    features: dict[int, list[tuple[str, str]]] = {}
+    for product_id, name, value in queryset.values_list("product_id", "name", "value").order_by():
+        name, value = name.strip(), value.strip()
+        if name and value:
+            features.setdefault(product_id, []).append((name, value))
+    return features
+
+
+# -- process-wide index ---------------------------------------------------
+
+_lock = threading.RLock()
+_index: FacetIndex | None = None
+_generation: int | None = None
+
+
+def _generation_ttl() -> int:
+    return int(getattr(settings, "CATALOG_GENERATION_CHECK_SECONDS", 5))
+
+
+def _stored_generation() -> int:
+    from .models import CatalogGeneration
+
+    value = CatalogGeneration.objects.filter(pk=1).values_list("value", flat=True).first()
+    return value or 0
+
+
+def current_generation() -> int:
+    """Catalog change counter; also versions cached API responses (store.views)."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = _stored_generation()
+        cache.set(GENERATION_KEY, generation, timeout=_generation_ttl())
+    return int(generation)
+
+
+async def acurrent_generation() -> int:
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        return await sync_to_async(current_generation)()
+    return int(generation)
+
+
+def _changes_since(generation: int, current: int) -> set[int] | None:
+    """Product ids changed after ``generation``; None means "rebuild"."""
+    if current - generation > _MAX_REPLAY:
+        return None
+    keys = [_CHANGE_KEY.format(n) for n in range(generation + 1, current + 1)]
+    found = cache.get_many(keys)
+    if len(found) != len(keys) or FULL_REBUILD in found.values():
+        return None
+    return set(found.values())
+
+
+def _sync_locked() -> FacetIndex:
+    global _index, _generation
+    current = current_generation()
+    if _index is not None and _generation == current:
+        record_cache_lookup("facet_index", True)
+        return _index
+    record_cache_lookup("facet_index", False)
+
+    changed = _changes_since(_generation, current) if _index is not None and _generation is not None else None
+    # Replays are incremental: a lagging replica would leave the index stale until the next change.
+    with use_primary():
+        if changed is None or current < (_generation or 0):
+            _index = FacetIndex.build()
+        else:
+            _index.refresh_products(changed)
+    _generation = current
+    return _index
+
+
+def facet_search(filters: FacetFilters, **kwargs) -> FacetResult:
+    """``FacetIndex.search`` on the up-to-date process index."""
+    with _lock:
+        return _sync_locked().search(filters, **kwargs)
+
+
+def position_mask(product_ids) -> int:
+    """Bitset of the given product ids in the current index (for combining with DB filters)."""
+    with _lock:
+        index = _sync_locked()
+        return bits_from_positions(index.positions[pid] for pid in product_ids if pid in index.positions)
+
+
+def _bump_generation() -> int:
+    from .models import CatalogGeneration
+
+    with transaction.atomic():
+        # The UPDATE holds the row lock until commit, so the value read back is this bump's.
+        if not CatalogGeneration.objects.filter(pk=1).update(value=F("value") + 1):
+            CatalogGeneration.objects.get_or_create(pk=1)
+            CatalogGeneration.objects.filter(pk=1).update(value=F("value") + 1)
+        return CatalogGeneration.objects.values_list("value", flat=True).get(pk=1)
+
+
+def _append_change(product_id: int) -> None:
+    generation = _bump_generation()
+    cache.set(_CHANGE_KEY.format(generation), product_id, timeout=_CHANGE_TIMEOUT)
+    cache.set(GENERATION_KEY, generation, timeout=_generation_ttl())
+
+
+def record_change(product_id: int = FULL_REBUILD) -> None:
+    """Bump the catalog generation for ``product_id`` once the transaction commits.
+
+    Call without an id after bulk writes that bypass signals (imports, seeding).
+    """
+    transaction.on_commit(lambda: _append_change(product_id))
+
+
+def reset() -> None:
+    """Drop this process' index (tests)."""
+    global _index, _generation
+    with _lock:
+        _index = None
+        _generation = None
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import io
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from .utils import refresh_card_image
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DERIVATIVE_WIDTHS = (320, 640, 960, 1280)
+DERIVATIVE_FORMATS = ("webp", "jpeg")
+_PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+
+@dataclass(frozen=True)
+class RenderedDerivative:
+    format: str
+    width: int
+    height: int
+    data: bytes
+
+
+def derivative_widths() -> tuple[int, ...]:
+    raw = getattr(settings, "PRODUCT_IMAGE_DERIVATIVE_WIDTHS", DEFAULT_DERIVATIVE_WIDTHS)
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    widths: set[int] = set()
+    for value in raw or ():
+        try:
+            width = int(str(value).strip())
+        except (TypeError, ValueError):
+            continue
+        if width > 0:
+            widths.add(width)
+    return tuple(sorted(widths)) or DEFAULT_DERIVATIVE_WIDTHS
+
+
+def derivative_quality() -> int:
+    try:
+        quality = int(getattr(settings, "PRODUCT_IMAGE_DERIVATIVE_QUALITY", 80))
+    except (TypeError, ValueError):
+        quality = 80
+    return max(1, min(95, quality))
+
+
+def render_derivatives(source, *, widths, formats=DERIVATIVE_FORMATS, quality: int = 80) -> list[RenderedDerivative]:
+    """Resize ``source`` (path or binary file) to every width in every format.
+
+    Pure Pillow work with no ORM access, so it is safe to run in a process pool.
+    Widths larger than the original are clamped to the original width (never upscale).
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as opened:
+        img = ImageOps.exif_transpose(opened)
+        img.load()
+
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+
+    src_w, src_h = img.size
+    targets = sorted({min(int(w), src_w) for w in widths if int(w) > 0}, reverse=True)
+
+    rendered: list[RenderedDerivative] = []
+    current = img
+    for width in targets:
+        height = max(1, round(src_h * width / src_w))
+        if current.size != (width, height):
+            # Resize from the previous (next larger) step; much cheaper than from the original.
+            current = current.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            frame = current
+            if fmt == "jpeg" and frame.mode == "RGBA":
+                background = Image.new("RGB", frame.size, (255, 255, 255))
+                background.paste(frame, mask=frame.getchannel("A"))
+                frame = background
+            options = {"quality": quality, "optimize": True}
+            if fmt == "webp":
+                options["method"] = 4
+            buffer = io.BytesIO()
+            frame.save(buffer, _PIL_FORMATS[fmt], **options)
+            rendered.append(RenderedDerivative(format=fmt, width=width, height=height, data=buffer.getvalue()))
+    return rendered
+
+
+def render_derivatives_from_path(path: str, widths, formats=DERIVATIVE_FORMATS, quality: int = 80) -> list[RenderedDerivative]:
+    """Process-pool entry point (picklable arguments only)."""
+    return render_derivatives(path, widths=widths, formats=formats, quality=quality)
+
+
+def _source_width(image) -> int | None:
+    """Pixel width of the original (Pillow only reads the header)."""
+    try:
+        from PIL import Image
+
+        with image.image.open("rb") as source, Image.open(source) as opened:
+            return opened.size[0]
+    except Exception:
+        return None
+
+
+def derivatives_are_current(image, widths=None, formats=DERIVATIVE_FORMATS) -> bool:
+    """Whether the stored ``(format, width)`` set is what rendering ``image`` now would produce."""
+    rows = list(image.derivatives.all())
+    if not rows or any(d.source_name != image.image.name for d in rows):
+        return False
+    widths = derivative_widths() if widths is None else widths
+    # Widths are clamped to the original's; a largest stored width below the largest configured one
+    # means either a narrow original or a width added since, which only the original can tell apart.
+    cap = max(d.width for d in rows)
+    if cap < max(widths):
+        cap = _source_width(image)
+        if cap is None:
+            return False
+    expected = {(fmt, min(width, cap)) for fmt in formats for width in widths}
+    return {(d.format, d.width) for d in rows} == expected
+
+
+def store_rendered_derivatives(image, rendered: list[RenderedDerivative]) -> list:
+    """Replace the stored derivatives of ``image`` with ``rendered`` files/rows."""
+    from .models import ProductImageDerivative
+
+    stem = Path(image.image.name).stem
+    new_rows: list[ProductImageDerivative] = []
+    try:
+        with transaction.atomic():
+            # Old files are removed on commit (store.signals), so new ones get fresh names.
+            for old in ProductImageDerivative.objects.filter(image=image):
+                old.delete()
+            for item in rendered:
+                row = ProductImageDerivative(
+                    image=image,
+                    format=item.format,
+                    width=item.width,
+                    height=item.height,
+                    size_bytes=len(item.data),
+                    source_name=image.image.name,
+                )
+                row.file.save(f"{stem}-{item.width}w.{_EXTENSIONS[item.format]}", ContentFile(item.data), save=False)
+                new_rows.append(row)
+            ProductImageDerivative.objects.bulk_create(new_rows)
+    except Exception:
+        # The old rows are back; files saved for the new ones would be orphans.
+        for row in new_rows:
+            row.file.storage.delete(row.file.name)
+        raise
+    refresh_card_image(image.product_id)
+    return new_rows
+
+
+def generate_derivatives(image, *, force: bool = False) -> list:
+    """Render and store derivatives for a ProductImage (no-op when already current)."""
+    if not image.image:
+        return []
+    if not force and derivatives_are_current(image):
+        return list(image.derivatives.all())
+
+    try:
+        with image.image.open("rb") as source:
+            rendered = render_derivatives(
+                source,
+                widths=derivative_widths(),
+                quality=derivative_quality(),
+            )
+    except ImportError:
+        logger.warning("Pillow is not installed; skipping product image derivatives")
+        return []
+    except Exception:
+        logger.exception("Failed to render derivatives for product image %s", image.pk)
+        return []
+
+    return store_rendered_derivatives(image, rendered)
+
+
+def generate_derivatives_for_image_id(image_id: int, *, force: bool = False) -> None:
+    """Background-worker entry point."""
+    from .models import ProductImage
+
+    image = ProductImage.objects.filter(pk=image_id).prefetch_related("derivatives").first()
+    if image is None:
+        return
+    generate_derivatives(image, force=force)
+
+
+def schedule_derivatives(image) -> None:
+    from core.background import submit_on_commit
+
+    submit_on_commit(generate_derivatives_for_image_id, image.pk)
@@ -13,6 +13,7 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 
+from core.tracing import traced
 from core.utils.formatting import format_money
 from core.utils.jalali import PERSIAN_DIGITS_TRANS, format_jalali
 
@@ -122,6 +123,7 @@ def _company_invoice_lines() -> list[str]:
     return [company_name, *lines]
 
 
+@traced("invoice_pdf.order")
 def render_order_invoice_pdf(*, order, title: str = "فاکتور", include_validity: bool = True) -> bytes:
     """Generate a PDF invoice/proforma for an order and return bytes.
 
@@ -427,6 +429,7 @@ def render_order_invoice_pdf(*, order, title: str = "فاکتور", include_vali
     return buffer.getvalue()
 
 
+@traced("invoice_pdf.manual")
 def render_manual_invoice_pdf(
     *,
     invoice_number: str,
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from store.images import (
+    DERIVATIVE_FORMATS,
+    derivative_quality,
+    derivative_widths,
+    derivatives_are_current,
+    render_derivatives_from_path,
+    store_rendered_derivatives,
+)
+from store.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = "Backfill responsive WebP/JPEG derivatives for existing product images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes used for resizing (1 = in-process).",
+        )
+        parser.add_argument("--product", type=int, action="append", default=[], help="Limit to product id(s).")
+        parser.add_argument("--force", action="store_true", help="Re-render even when derivatives are current.")
+
+    def handle(self, *args, **options):
+        workers = max(1, int(options["workers"]))
+        force = bool(options["force"])
+
+        qs = ProductImage.objects.prefetch_related("derivatives").order_by("id")
+        if options["product"]:
+            qs = qs.filter(product_id__in=options["product"])
+
+        widths = derivative_widths()
+        pending: dict[int, ProductImage] = {}
+        skipped = 0
+        for image in qs:
+            if not image.image:
+                continue
+            if not force and derivatives_are_current(image, widths):
+                skipped += 1
+                continue
+            try:
+                image.image.path
+            except NotImplementedError:
+                self.stderr.write(self.style.ERROR("Storage backend has no local paths; use the upload worker instead."))
+                return
+            pending[image.pk] = image
+
+        self.stdout.write(f"Images to process: {len(pending)} (up to date: {skipped})")
+        if not pending:
+            return
+
+        quality = derivative_quality()
+        done = failed = 0
+        total_bytes = 0
+
+        if workers == 1:
+            results = (
+                (image_id, self._render(pending[image_id].image.path, widths, quality))
+                for image_id in pending
+            )
+            for image_id, rendered in results:
+                done, failed, total_bytes = self._store(pending[image_id], rendered, done, failed, total_bytes)
+        else:
+            # Forked workers must not inherit open DB sockets.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(render_derivatives_from_path, image.image.path, widths, DERIVATIVE_FORMATS, quality): image_id
+                    for image_id, image in pending.items()
+                }
+                for future in as_completed(futures):
+                    image = pending[futures[future]]
+                    try:
+                        rendered = future.result()
+                    except Exception as exc:
+                        self.stderr.write(f"image {image.pk}: {exc}")
+                        rendered = None
+                    done, failed, total_bytes = self._store(image, rendered, done, failed, total_bytes)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rendered {done} image(s), {failed} failed, {total_bytes / 1024:.0f} KiB written.")
+        )
+
+    def _render(self, path: str, widths, quality: int):
+        try:
+            return render_derivatives_from_path(path, widths, DERIVATIVE_FORMATS, quality)
+        except Exception as exc:
+            self.stderr.write(f"{path}: {exc}")
+            return None
+
+    def _store(self, image, rendered, done: int, failed: int, total_bytes: int):
+        if not rendered:
+            return done, failed + 1, total_bytes
+        store_rendered_derivatives(image, rendered)
+        return done + 1, failed, total_bytes + sum(len(item.data) for item in rendered)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.related import DEFAULT_MAX_CANDIDATES_PER_TERM, DEFAULT_TOP_K, build_related_products
+
+
+class Command(BaseCommand):
+    help = "Compute top-K related products from shared features, category, brand and tags."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help=(
+                "Rebuild every product. By default only stale products, products listing them and "
+                "products sharing a candidate term with them are rebuilt."
+            ),)
+        parser.add_argument("--top", type=int, default=DEFAULT_TOP_K, help="Related products kept per product.")
+        parser.add_argument(
+            "--max-candidates-per-term",
+            type=int,
+            default=DEFAULT_MAX_CANDIDATES_PER_TERM,
+            help="Terms shared by more products than this only affect scores, not candidate lists.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = build_related_products(
+            full=options["full"],
+            top_k=max(1, options["top"]),
+            max_candidates_per_term=max(1, options["max_candidates_per_term"]),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Related products rebuilt for {result.products} product(s), {result.links} link(s) "
+                f"in {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Avg, Q
+
+from store.models import Category, Product, ProductImage, ProductReview
+
+
+def hot_queries(*, category_id: int, category_slug: str, product_id: int, product_slug: str, search: str):
+    """(label, queryset) pairs mirroring the catalog views' query shapes."""
+    available = Product.objects.filter(is_available=True)
+    return [
+        ("api_products: listing page", available.order_by("-created_at")[:20]),
+        ("api_products: deep page", available.order_by("-created_at")[10_000:10_020]),
+        (
+            "api_products?category=: listing page",
+            available.filter(category__slug=category_slug).order_by("-created_at")[:20],
+        ),
+        ("category_detail: products of a category", Product.objects.filter(category_id=category_id).order_by("-created_at")),
+        ("catalog_home: newest products", Product.objects.order_by("-created_at")[:9]),
+        (
+            "product_detail: lookup by (category__slug, slug)",
+            Product.objects.filter(category__slug=category_slug, slug=product_slug),
+        ),
+        ("prefetch: product gallery in display order", ProductImage.objects.filter(product_id__in=[product_id])),
+        (
+            "product_detail: approved reviews",
+            ProductReview.objects.filter(product_id=product_id, is_approved=True),
+        ),
+        (
+            "product_detail: average rating",
+            ProductReview.objects.filter(product_id=product_id, is_approved=True).values("product_id").annotate(avg=Avg("rating")),
+        ),
+        (
+            "search (icontains)",
+            available.filter(Q(name__icontains=search) | Q(sku__icontains=search)).order_by("-created_at")[:20],
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Print EXPLAIN plans for the catalog's hot queries (SQLite: EXPLAIN QUERY PLAN, MySQL: EXPLAIN)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sql", action="store_true", help="Also print the SQL of each query.")
+        parser.add_argument("--format", dest="explain_format", help="EXPLAIN format where supported (MySQL: TRADITIONAL, JSON, TREE).")
+        parser.add_argument("--analyze", action="store_true", help="Run EXPLAIN ANALYZE where supported (MySQL 8.0.18+).")
+        parser.add_argument("--search", default="فر", help="Search term for the icontains query.")
+
+    def handle(self, *args, **options):
+        product = Product.objects.select_related("category").order_by("id").first()
+        category = product.category if product else Category.objects.order_by("id").first()
+        params = {
+            "category_id": category.pk if category else 0,
+            "category_slug": category.slug if category else "-",
+            "product_id": product.pk if product else 0,
+            "product_slug": product.slug if product else "-",
+            "search": options["search"],
+        }
+
+        explain_options = {}
+        if options["explain_format"]:
+            explain_options["format"] = options["explain_format"]
+        if options["analyze"]:
+            explain_options["analyze"] = True
+
+        self.stdout.write(f"database: {connection.vendor}")
+        for label, queryset in hot_queries(**params):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {label}"))
+            if options["sql"]:
+                self.stdout.write(str(queryset.query))
+            try:
+                plan = queryset.explain(**explain_options)
+            except (ValueError, NotImplementedError) as exc:
+                raise CommandError(f"{label}: {exc}")
+            self.stdout.write(plan)
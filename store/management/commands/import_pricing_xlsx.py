@@ -9,6 +9,8 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from core.utils.jalali import PERSIAN_DIGITS_TRANS
+from core.utils.slugs import allocate_slugs
+from store import facets
 from store.models import Category, Product, ProductFeature
 
 
@@ -223,15 +225,28 @@ class Command(BaseCommand):
             categories_by_name: dict[str, Category] = {c.name: c for c in Category.objects.all()}
             created_products: list[Product] = []
 
-            for name, price in imported_rows:
+            row_categories: list[Category] = []
+            for name, _price in imported_rows:
                 category_name = _infer_category_name(name)
                 category = categories_by_name.get(category_name)
                 if not category:
                     category = Category.objects.create(name=category_name)
                     categories_by_name[category_name] = category
-
+                row_categories.append(category)
+
+            # One slug lookup per category instead of one query per candidate per product.
+            slugs = allocate_slugs(
+                Product,
+                [name for name, _price in imported_rows],
+                fallback="product",
+                scope=[{"category_id": category.pk} for category in row_categories],
+            )
+
+            for (name, price), category, slug in zip(imported_rows, row_categories, slugs):
+                category_name = category.name
                 product = Product.objects.create(
                     name=name,
+                    slug=slug,
                     description=_build_description(name=name, category_name=category_name),
                     price=int(price),
                     domain=category_name,
@@ -248,6 +263,9 @@ class Command(BaseCommand):
                     ignore_conflicts=False,
                 )
 
+            # Features were bulk-inserted without signals; let the facet index rebuild.
+            facets.record_change()
+
         _safe_write(self, self.style.SUCCESS(f"ایمپورت انجام شد: {len(imported_rows)} محصول"))
 
 
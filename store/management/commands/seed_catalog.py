@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.seeding import clear_seeded_catalog, seed_catalog
+
+
+class Command(BaseCommand):
+    help = "Create a large synthetic catalog (categories, products, features, images, reviews) for benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--products", type=int, default=50_000)
+        parser.add_argument("--features", type=int, default=4, help="Features per product.")
+        parser.add_argument("--images", type=int, default=2, help="Images per product.")
+        parser.add_argument("--reviews", type=int, default=3, help="Reviews per product.")
+        parser.add_argument("--seed", type=int, default=1, help="Random seed (same seed, same data).")
+        parser.add_argument("--clear", action="store_true", help="Delete previously seeded data first.")
+        parser.add_argument("--clear-only", action="store_true", help="Delete previously seeded data and exit.")
+
+    def handle(self, *args, **options):
+        if options["clear"] or options["clear_only"]:
+            deleted = clear_seeded_catalog()
+            self.stdout.write(f"Deleted {deleted} seeded row(s).")
+            if options["clear_only"]:
+                return
+
+        started = time.perf_counter()
+        result = seed_catalog(
+            categories=max(1, options["categories"]),
+            products=max(0, options["products"]),
+            features_per_product=max(0, options["features"]),
+            images_per_product=max(0, options["images"]),
+            reviews_per_product=max(0, options["reviews"]),
+            seed=options["seed"],
+            stdout=self.stdout,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {result.categories} categories, {result.products} products, {result.features} features, "
+                f"{result.images} images, {result.reviews} reviews in {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:43
+
+import django.db.models.deletion
+import store.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0016_populate_product_slugs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductImageDerivative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('jpeg', 'JPEG')], max_length=8, verbose_name='فرمت')),
+                ('width', models.PositiveIntegerField(verbose_name='عرض')),
+                ('height', models.PositiveIntegerField(verbose_name='ارتفاع')),
+                ('file', models.FileField(max_length=255, upload_to=store.models.product_image_derivative_upload_to, verbose_name='فایل')),
+                ('size_bytes', models.PositiveIntegerField(default=0, verbose_name='حجم (بایت)')),
+                ('source_name', models.CharField(blank=True, max_length=255, verbose_name='فایل مبدا')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='derivatives', to='store.productimage', verbose_name='تصویر')),
+            ],
+            options={
+                'verbose_name': 'نسخه تصویر محصول',
+                'verbose_name_plural': 'نسخه\u200cهای تصویر محصول',
+                'ordering': ['format', 'width'],
+                'constraints': [models.UniqueConstraint(fields=('image', 'format', 'width'), name='uniq_product_image_derivative')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+import re
+
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def _next_free(base, taken):
+    if base not in taken:
+        return base
+    suffix = 1
+    while f"{base}-{suffix}" in taken:
+        suffix += 1
+    return f"{base}-{suffix}"
+
+
+def dedupe_product_slugs(apps, schema_editor):
+    """Make (category, slug) unique before the constraint in 0019 is added.
+
+    The oldest product keeps its slug (and therefore its URL); later duplicates
+    and blank slugs get the next free ``base-N`` within their category.
+    """
+    Product = apps.get_model("store", "Product")
+    taken = {}
+    renames = []
+    # Reserve every existing slug first so a rename never steals a slug a later row already owns.
+    for pk, category_id, slug, name in Product.objects.order_by("category_id", "id").values_list(
+        "id", "category_id", "slug", "name"
+    ):
+        used = taken.setdefault(category_id, set())
+        if slug and slug not in used:
+            used.add(slug)
+        else:
+            renames.append((pk, category_id, slug, name))
+
+    for pk, category_id, slug, name in renames:
+        used = taken[category_id]
+        base = re.sub(r"-\d+$", "", slug) if slug else (slugify(name, allow_unicode=True) or f"product-{pk}")
+        new_slug = _next_free(base, used)
+        used.add(new_slug)
+        Product.objects.filter(pk=pk).update(slug=new_slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0017_productimagederivative"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=dedupe_product_slugs,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
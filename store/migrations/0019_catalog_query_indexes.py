@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0018_dedupe_product_slugs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='is_available',
+            field=models.BooleanField(default=True, verbose_name='موجود'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-created_at', 'is_available'], name='store_prod_created_avail'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', '-created_at', 'is_available'], name='store_prod_cat_created_avail'),
+        ),
+        migrations.AddIndex(
+            model_name='productimage',
+            index=models.Index(fields=['product', '-is_primary', 'sort_order', 'id'], name='store_pimg_product_order'),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['product', '-created_at', 'is_approved'], name='store_review_prod_created'),
+        ),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('category', 'slug'), name='uniq_product_category_slug'),
+        ),
+    ]
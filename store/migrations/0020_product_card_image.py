@@ -0,0 +1,75 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:03
+
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations, models
+
+_CHUNK = 500
+_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+
+# A frozen copy of store.utils.card_image_fields as of this migration, so later
+# changes to the app code cannot change what the backfill writes.
+def _media_fallback_url(product_id):
+    if not getattr(settings, "MEDIA_ROOT", None):
+        return ""
+    media_root = Path(settings.MEDIA_ROOT)
+    base_dir = media_root / "products"
+    if not base_dir.exists():
+        return ""
+    folder = base_dir / str(product_id)
+    candidates = sorted(folder.iterdir(), key=lambda p: p.name) if folder.is_dir() else []
+    for pattern in (f"{product_id}.*", f"{product_id}-*.*", f"{product_id}_*.*"):
+        candidates += sorted(base_dir.glob(pattern), key=lambda p: p.name)
+    for path in candidates:
+        if path.is_file() and path.suffix.lower() in _IMAGE_EXTENSIONS:
+            rel = str(path.relative_to(media_root)).replace("\\", "/")
+            return f"{settings.MEDIA_URL.rstrip('/')}/{rel}"
+    return ""
+
+
+def _card_image_fields(product):
+    images = list(product.images.all())
+    image = next((img for img in images if img.is_primary), images[0] if images else None)
+    srcset = {}
+    for fmt in ("webp", "jpeg"):
+        derivatives = sorted((d for d in image.derivatives.all() if d.format == fmt), key=lambda d: d.width) if image else []
+        srcset[fmt] = ", ".join(f"{d.file.url} {d.width}w" for d in derivatives)
+    url = image.image.url if image is not None else _media_fallback_url(product.pk)
+    return {"card_image_url": url[:255], "card_image_srcset": srcset}
+
+
+def backfill_card_images(apps, schema_editor):
+    Product = apps.get_model("store", "Product")
+    ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(ids), _CHUNK):
+        chunk = Product.objects.filter(id__in=ids[start : start + _CHUNK]).only("id")
+        for product in chunk.prefetch_related("images__derivatives"):
+            fields = _card_image_fields(product)
+            if fields["card_image_url"]:
+                Product.objects.filter(pk=product.pk).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0019_catalog_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='card_image_srcset',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='srcset تصویر کارت'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='card_image_url',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='تصویر کارت'),
+        ),
+        migrations.RunPython(
+            code=backfill_card_images,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0020_product_card_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='related_stale',
+            field=models.BooleanField(default=True, editable=False, verbose_name='نیازمند بازسازی محصولات مرتبط'),
+        ),
+        migrations.CreateModel(
+            name='RelatedProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='رتبه')),
+                ('score', models.FloatField(verbose_name='امتیاز شباهت')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='store.product', verbose_name='محصول')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.product', verbose_name='محصول مرتبط')),
+            ],
+            options={
+                'verbose_name': 'محصول مرتبط',
+                'verbose_name_plural': 'محصولات مرتبط',
+                'ordering': ['product', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'rank'), name='uniq_related_product_rank')],
+            },
+        ),
+    ]
@@ -3,7 +3,8 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.urls import reverse
-from django.utils.text import slugify
+
+from core.utils.slugs import slugged_save
 
 from .validators import product_image_validators
 
@@ -15,6 +16,13 @@ def product_image_upload_to(instance, filename: str) -> str:
     return f"products/{product_id}/{base_name}"
 
 
+def product_image_derivative_upload_to(instance, filename: str) -> str:
+    """Store resized variants next to the original under media/products/<product_id>/derivatives/."""
+    base_name = Path(filename).name
+    product_id = instance.image.product_id if instance.image_id else "unassigned"
+    return f"products/{product_id}/derivatives/{base_name}"
+
+
 def order_receipt_upload_to(instance, filename: str) -> str:
     """Legacy upload path kept to satisfy historical migrations."""
     base_name = Path(filename).name
@@ -33,15 +41,7 @@ class Category(models.Model):
         return self.name
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base = slugify(self.name, allow_unicode=True) or "category"
-            candidate = base
-            suffix = 1
-            while Category.objects.filter(slug=candidate).exclude(pk=self.pk).exists():
-                candidate = f"{base}-{suffix}"
-                suffix += 1
-            self.slug = candidate
-        super().save(*args, **kwargs)
+        return slugged_save(self, super().save, *args, source=self.name, fallback="category", **kwargs)
 
 
 class Product(models.Model):
@@ -50,7 +50,7 @@ class Product(models.Model):
     summary = models.CharField("خلاصه", max_length=300, blank=True)
     description = models.TextField("توضیحات")
     price = models.IntegerField("قیمت", default=0)
-    is_available = models.BooleanField("موجود", default=True, db_index=True)
+    is_available = models.BooleanField("موجود", default=True)
     domain = models.CharField("دامنه کاربرد", max_length=100)
     category = models.ForeignKey(
         Category,
@@ -69,26 +69,38 @@ class Product(models.Model):
         help_text="برچسب‌ها را با فاصله یا ویرگول جدا کنید.",
     )
     datasheet = models.FileField("کاتالوگ/دیتاشیت", upload_to="products/datasheets/", blank=True)
+    # Denormalized from the primary ProductImage so listings need no image prefetch;
+    # kept current by store.signals and store.images.store_rendered_derivatives.
+    card_image_url = models.CharField("تصویر کارت", max_length=255, blank=True, editable=False)
+    card_image_srcset = models.JSONField("srcset تصویر کارت", default=dict, blank=True, editable=False)
+    # Set when features/category/brand/tags change; build_related_products clears it.
+    related_stale = models.BooleanField("نیازمند بازسازی محصولات مرتبط", default=True, editable=False)
     created_at = models.DateTimeField("تاریخ ایجاد", auto_now_add=True)
     updated_at = models.DateTimeField("آخرین بروزرسانی", auto_now=True)
 
     class Meta:
         verbose_name = "محصول"
         verbose_name_plural = "محصولات"
+        # Django renders filter(is_available=True) as a bare boolean column, which no
+        # planner treats as an equality on a leading index column. So listings are
+        # served by walking created_at in order, with is_available trailing in the
+        # index so unavailable rows are skipped without reading the table.
+        indexes = [
+            # api_products / catalog_home: newest (available) products.
+            models.Index(fields=["-created_at", "is_available"], name="store_prod_created_avail"),
+            # category_detail and api_products?category=...: one category, newest first.
+            models.Index(fields=["category", "-created_at", "is_available"], name="store_prod_cat_created_avail"),
+        ]
+        constraints = [
+            # Detail pages resolve by (category__slug, slug); the index also serves that lookup.
+            models.UniqueConstraint(fields=["category", "slug"], name="uniq_product_category_slug"),
+        ]
 
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base = slugify(self.name, allow_unicode=True) or "product"
-            candidate = base
-            suffix = 1
-            while Product.objects.filter(slug=candidate, category=self.category).exclude(pk=self.pk).exists():
-                candidate = f"{base}-{suffix}"
-                suffix += 1
-            self.slug = candidate
-        super().save(*args, **kwargs)
+        return slugged_save(self, super().save, *args, source=self.name, fallback="product", scope_fields=("category",), **kwargs)
 
     @property
     def primary_image(self):
@@ -120,11 +132,51 @@ class ProductImage(models.Model):
         ordering = ["-is_primary", "sort_order", "id"]
         verbose_name = "تصویر محصول"
         verbose_name_plural = "تصاویر محصول"
+        indexes = [
+            # Prefetching a product's gallery in display order.
+            models.Index(fields=["product", "-is_primary", "sort_order", "id"], name="store_pimg_product_order"),
+        ]
 
     def __str__(self):
         return f"{self.product.name} - {Path(self.image.name).name}"
 
 
+class ProductImageDerivative(models.Model):
+    FORMAT_WEBP = "webp"
+    FORMAT_JPEG = "jpeg"
+    FORMAT_CHOICES = (
+        (FORMAT_WEBP, "WebP"),
+        (FORMAT_JPEG, "JPEG"),
+    )
+
+    image = models.ForeignKey(
+        ProductImage,
+        on_delete=models.CASCADE,
+        related_name="derivatives",
+        verbose_name="تصویر",
+    )
+    format = models.CharField("فرمت", max_length=8, choices=FORMAT_CHOICES)
+    width = models.PositiveIntegerField("عرض")
+    height = models.PositiveIntegerField("ارتفاع")
+    file = models.FileField("فایل", upload_to=product_image_derivative_upload_to, max_length=255)
+    size_bytes = models.PositiveIntegerField("حجم (بایت)", default=0)
+    source_name = models.CharField("فایل مبدا", max_length=255, blank=True)
+    created_at = models.DateTimeField("تاریخ ایجاد", auto_now_add=True)
+
+    class Meta:
+        ordering = ["format", "width"]
+        verbose_name = "نسخه تصویر محصول"
+        verbose_name_plural = "نسخه‌های تصویر محصول"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["image", "format", "width"], name="uniq_product_image_derivative"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.image_id} - {self.format} {self.width}w"
+
+
 class ProductFeature(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="features", verbose_name="محصول")
     name = models.CharField("عنوان ویژگی", max_length=100)
@@ -155,11 +207,36 @@ class ProductReview(models.Model):
         ordering = ["-created_at"]
         verbose_name = "نظر مشتری"
         verbose_name_plural = "نظرات مشتریان"
+        indexes = [
+            # Approved reviews per product page, newest first (is_approved trails; see Product.Meta).
+            models.Index(fields=["product", "-created_at", "is_approved"], name="store_review_prod_created"),
+        ]
 
     def __str__(self):
         return f"{self.product.name} - {self.rating}"
 
 
+class RelatedProduct(models.Model):
+    """Precomputed top-K similar products (see store.related / build_related_products)."""
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="related_links", verbose_name="محصول")
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+", verbose_name="محصول مرتبط")
+    rank = models.PositiveSmallIntegerField("رتبه")
+    score = models.FloatField("امتیاز شباهت")
+
+    class Meta:
+        ordering = ["product", "rank"]
+        verbose_name = "محصول مرتبط"
+        verbose_name_plural = "محصولات مرتبط"
+        constraints = [
+            # product_detail reads WHERE product_id = ? ORDER BY rank from this index.
+            models.UniqueConstraint(fields=["product", "rank"], name="uniq_related_product_rank"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.rank})"
+
+
 class ManualInvoiceSequence(models.Model):
     last_number = models.PositiveIntegerField("آخرین شماره", default=0)
     updated_at = models.DateTimeField("آخرین بروزرسانی", auto_now=True)
@@ -170,3 +247,17 @@ class ManualInvoiceSequence(models.Model):
 
     def __str__(self):
         return str(self.last_number)
+
+
+class CatalogGeneration(models.Model):
+    """Single row counting catalog changes; versions the facet index and cached API bodies (store.facets)."""
+
+    value = models.PositiveBigIntegerField("نسخه", default=0)
+    updated_at = models.DateTimeField("آخرین بروزرسانی", auto_now=True)
+
+    class Meta:
+        verbose_name = "نسخه کاتالوگ"
+        verbose_name_plural = "نسخه کاتالوگ"
+
+    def __str__(self):
+        return str(self.value)
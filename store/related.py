@@ -0,0 +1,205 @@
+"""Offline related-products index.
+
+Each product becomes a sparse vector of terms: its ``ProductFeature``
+name/value pairs, its category, its brand and its tag tokens, weighted by
+inverse document frequency (and a per-kind weight). Similar products are the
+top-K by cosine similarity. Candidates come only from terms shared by at most
+``max_candidates_per_term`` products, so very common terms (a big category, a
+popular brand) refine the score without making the build quadratic.
+
+Results are stored in ``RelatedProduct``; ``build_related_products`` runs this
+for stale products and the products whose lists they can change (see
+``affected_products``) unless asked for a full rebuild.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from .models import Product, ProductFeature, RelatedProduct
+
+DEFAULT_TOP_K = 8
+DEFAULT_MAX_CANDIDATES_PER_TERM = 500
+# Shared features say more about similarity than a shared brand or tag.
+_KIND_WEIGHTS = {"f": 1.0, "c": 0.8, "b": 0.6, "t": 0.4}
+_TAG_SPLIT = re.compile(r"[\s,،]+")
+
+
+@dataclass(frozen=True)
+class RelatedBuildResult:
+    products: int
+    links: int
+
+
+def _tag_tokens(tags: str) -> set[str]:
+    return {token for token in _TAG_SPLIT.split((tags or "").lower()) if len(token) > 1}
+
+
+def product_terms() -> dict[int, set[str]]:
+    """Raw terms per product (two queries)."""
+    terms: dict[int, set[str]] = {}
+    for pk, category_id, brand, tags in Product.objects.values_list("id", "category_id", "brand", "tags"):
+        found = {f"c:{category_id}"}
+        if brand.strip():
+            found.add(f"b:{brand.strip().lower()}")
+        found.update(f"t:{token}" for token in _tag_tokens(tags))
+        terms[pk] = found
+    for product_id, name, value in ProductFeature.objects.values_list("product_id", "name", "value").order_by():
+        if product_id in terms and name.strip() and value.strip():
+            terms[product_id].add(f"f:{name.strip()}={value.strip()}")
+    return terms
+
+
+class SimilarityIndex:
+    def __init__(self, terms: dict[int, set[str]], *, max_candidates_per_term: int = DEFAULT_MAX_CANDIDATES_PER_TERM):
+        self.postings: dict[str, list[int]] = defaultdict(list)
+        for pk, product_terms_ in terms.items():
+            for term in product_terms_:
+                self.postings[term].append(pk)
+
+        total = max(1, len(terms))
+        idf = {term: math.log(1 + total / len(pks)) * _KIND_WEIGHTS[term[0]] for term, pks in self.postings.items()}
+        self.vectors: dict[int, dict[str, float]] = {}
+        self.norms: dict[int, float] = {}
+        for pk, product_terms_ in terms.items():
+            vector = {term: idf[term] for term in product_terms_}
+            self.vectors[pk] = vector
+            self.norms[pk] = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        self.max_candidates_per_term = max_candidates_per_term
+
+    def similar(self, pk: int, top_k: int = DEFAULT_TOP_K) -> list[tuple[int, float]]:
+        vector = self.vectors.get(pk)
+        if not vector:
+            return []
+        # Term weights are per term, so the dot product over a shared term is weight**2.
+        dots: dict[int, float] = defaultdict(float)
+        common: list[str] = []
+        for term, weight in vector.items():
+            posting = self.postings[term]
+            if len(posting) > self.max_candidates_per_term:
+                common.append(term)
+                continue
+            for other in posting:
+                dots[other] += weight * weight
+        dots.pop(pk, None)
+
+        norm = self.norms[pk]
+        scored = []
+        for other, dot in dots.items():
+            other_vector = self.vectors[other]
+            for term in common:
+                if term in other_vector:
+                    dot += vector[term] * vector[term]
+            scored.append((dot / (norm * self.norms[other]), other))
+        best = heapq.nsmallest(top_k, scored, key=lambda item: (-item[0], item[1]))
+        return [(other, round(score, 6)) for score, other in best]
+
+
+def affected_products(stale_ids, index: SimilarityIndex) -> set[int]:
+    """Stale products, products that currently list one of them as related, and
+    products sharing a candidate (non-common) term with one, which may now rank it.
+
+    Weights of unchanged products still drift with document frequencies; only a
+    full rebuild picks that up.
+    """
+    stale_ids = set(stale_ids)
+    affected = stale_ids | set(
+        RelatedProduct.objects.filter(related_id__in=stale_ids).values_list("product_id", flat=True)
+    )
+    for pk in stale_ids:
+        for term in index.vectors.get(pk, ()):
+            posting = index.postings[term]
+            if len(posting) <= index.max_candidates_per_term:
+                affected.update(posting)
+    return affected
+
+
+def build_related_products(
+    *,
+    full: bool = False,
+    top_k: int = DEFAULT_TOP_K,
+    max_candidates_per_term: int = DEFAULT_MAX_CANDIDATES_PER_TERM,
+    batch_size: int = 1000,
+) -> RelatedBuildResult:
+    """Recompute related products for stale products (or every product with ``full=True``)."""
+    if not full:
+        stale = list(Product.objects.filter(related_stale=True).values_list("id", flat=True))
+        if not stale:
+            return RelatedBuildResult(products=0, links=0)
+
+    index = SimilarityIndex(product_terms(), max_candidates_per_term=max_candidates_per_term)
+    targets = set(index.vectors) if full else affected_products(stale, index)
+    ordered = sorted(targets)
+    links = 0
+    for start in range(0, len(ordered), batch_size):
+        chunk = ordered[start : start + batch_size]
+        rows = [
+            RelatedProduct(product_id=pk, related_id=other, rank=rank, score=score)
+            for pk in chunk
+            for rank, (other, score) in enumerate(index.similar(pk, top_k), start=1)
+        ]
+        with transaction.atomic():
+            RelatedProduct.objects.filter(product_id__in=chunk).delete()
+            RelatedProduct.objects.bulk_create(rows)
+            Product.objects.filter(id__in=chunk, related_stale=True).update(related_stale=False)
+        links += len(rows)
+    return RelatedBuildResult(products=len(ordered), links=links)
+
+
+_RELATED_COLUMNS = (
+    "related_id",
+    "related__name",
+    "related__slug",
+    "related__price",
+    "related__category__slug",
+    "related__card_image_url",
+)
+
+
+def _related_rows(product_id: int, limit: int):
+    return (
+        RelatedProduct.objects.filter(product_id=product_id, related__is_available=True)
+        .order_by("rank")
+        .values(*_RELATED_COLUMNS)[:limit]
+    )
+
+
+def _related_item(row: dict) -> dict:
+    return {
+        "id": row["related_id"],
+        "name": row["related__name"],
+        "slug": row["related__slug"],
+        "price": row["related__price"],
+        "category_slug": row["related__category__slug"],
+        "image_url": row["related__card_image_url"],
+    }
+
+
+def related_products_for(product_id: int, *, limit: int = DEFAULT_TOP_K) -> list[dict]:
+    """Available related products for a detail page (one query on the (product, rank) index)."""
+    return [_related_item(row) for row in _related_rows(product_id, limit)]
+
+
+def related_products_by_product(product_ids, *, limit: int = DEFAULT_TOP_K) -> dict[int, list[dict]]:
+    """``related_products_for`` for many products in one query (products without links are absent)."""
+    rows = (
+        RelatedProduct.objects.filter(product_id__in=product_ids, related__is_available=True)
+        .order_by("product_id", "rank")
+        .values("product_id", *_RELATED_COLUMNS)
+    )
+    related: dict[int, list[dict]] = defaultdict(list)
+    for row in rows:
+        items = related[row["product_id"]]
+        if len(items) < limit:
+            items.append(_related_item(row))
+    return dict(related)
+
+
+async def arelated_products_for(product_id: int, *, limit: int = DEFAULT_TOP_K) -> list[dict]:
+    return [_related_item(row) async for row in _related_rows(product_id, limit)]
@@ -0,0 +1,161 @@
+"""Synthetic catalog data for benchmarks and load tests.
+
+Everything created here is tagged with the ``bench-`` slug prefix (categories)
+and lives under those categories, so ``clear_seeded_catalog`` can remove it
+without touching real data. Rows are inserted with ``bulk_create`` and never
+go through ``save()``/signals, so no image derivatives are rendered; the
+denormalized ``card_image_url`` is filled in directly.
+"""
+
+from __future__ import annotations
+
+import io
+import random
+from dataclasses import dataclass
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from . import facets
+from .models import Category, Product, ProductFeature, ProductImage, ProductReview
+
+SEED_SLUG_PREFIX = "bench-"
+PLACEHOLDER_IMAGE_NAME = "products/bench/placeholder.jpg"
+_BATCH_SIZE = 2000
+
+_NOUNS = ("گریل", "سرخ‌کن", "فر", "اجاق", "یخچال", "سینک", "هود", "میز کار", "ماکروویو", "همزن")
+_ADJECTIVES = ("صنعتی", "استیل", "گازی", "برقی", "دو درب", "رومیزی", "ایستاده", "حرفه‌ای")
+_BRANDS = ("Styra", "Inox", "Rational", "Electrolux", "Berto's", "Fimar")
+_FEATURES = ("جنس بدنه", "توان", "ابعاد", "وزن", "ولتاژ", "ظرفیت", "گارانتی")
+_REVIEWERS = ("علی", "مریم", "رضا", "سارا", "حسین", "نرگس")
+
+
+@dataclass(frozen=True)
+class SeedResult:
+    categories: int
+    products: int
+    features: int
+    images: int
+    reviews: int
+
+
+def _placeholder_image() -> str:
+    if not default_storage.exists(PLACEHOLDER_IMAGE_NAME):
+        try:
+            from PIL import Image
+        except ImportError:  # pragma: no cover - Pillow is in requirements.txt
+            data = b""
+        else:
+            buffer = io.BytesIO()
+            Image.new("RGB", (1280, 960), (200, 200, 200)).save(buffer, "JPEG", quality=70)
+            data = buffer.getvalue()
+        default_storage.save(PLACEHOLDER_IMAGE_NAME, ContentFile(data))
+    return PLACEHOLDER_IMAGE_NAME
+
+
+def seed_catalog(
+    *,
+    categories: int = 50,
+    products: int = 50_000,
+    features_per_product: int = 4,
+    images_per_product: int = 2,
+    reviews_per_product: int = 3,
+    seed: int = 1,
+    stdout=None,
+) -> SeedResult:
+    """Create a synthetic catalog of the requested size (deterministic for a given ``seed``)."""
+    rng = random.Random(seed)
+    image_name = _placeholder_image() if images_per_product else ""
+    image_url = default_storage.url(image_name) if image_name else ""
+
+    def log(message: str) -> None:
+        if stdout is not None:
+            stdout.write(message)
+
+    start = Category.objects.filter(slug__startswith=SEED_SLUG_PREFIX).count()
+    slugs = [f"{SEED_SLUG_PREFIX}{start + i + 1}" for i in range(max(1, categories))]
+    Category.objects.bulk_create([Category(name=f"دسته آزمایشی {slug[len(SEED_SLUG_PREFIX):]}", slug=slug) for slug in slugs])
+    created_categories = list(Category.objects.filter(slug__in=slugs).order_by("id"))
+    log(f"categories: {len(created_categories)}")
+
+    totals = {"products": 0, "features": 0, "images": 0, "reviews": 0}
+    product_offset = Product.objects.filter(category__slug__startswith=SEED_SLUG_PREFIX).count()
+    for batch_start in range(0, products, _BATCH_SIZE):
+        batch_end = min(products, batch_start + _BATCH_SIZE)
+        with transaction.atomic():
+            batch = []
+            for i in range(batch_start, batch_end):
+                number = product_offset + i + 1
+                noun = rng.choice(_NOUNS)
+                adjective = rng.choice(_ADJECTIVES)
+                batch.append(
+                    Product(
+                        name=f"{noun} {adjective} مدل {number}",
+                        slug=f"product-{number}",
+                        summary=f"{noun} {adjective} مناسب آشپزخانه صنعتی",
+                        description=f"{noun} {adjective} با کیفیت ساخت بالا. " * rng.randint(3, 12),
+                        price=rng.randrange(5_000_000, 900_000_000, 10_000),
+                        is_available=rng.random() > 0.1,
+                        domain="آشپزخانه صنعتی",
+                        category=created_categories[i % len(created_categories)],
+                        view_count=rng.randint(0, 5000),
+                        brand=rng.choice(_BRANDS),
+                        sku=f"SKU-{number:06d}",
+                        tags=f"{noun} {adjective}",
+                        card_image_url=image_url,
+                    )
+                )
+            Product.objects.bulk_create(batch)
+            ids = [product.pk for product in batch]
+            if None in ids:
+                # Backends without RETURNING (MySQL) leave pks unset; the zero-padded SKUs sort in insert order.
+                ids = list(
+                    Product.objects.filter(
+                        category__slug__startswith=SEED_SLUG_PREFIX,
+                        sku__range=(batch[0].sku, batch[-1].sku),
+                    ).values_list("id", flat=True)
+                )
+
+            ProductFeature.objects.bulk_create(
+                [
+                    ProductFeature(product_id=pid, name=name, value=str(rng.randint(1, 500)))
+                    for pid in ids
+                    for name in rng.sample(_FEATURES, min(features_per_product, len(_FEATURES)))
+                ]
+            )
+            ProductImage.objects.bulk_create(
+                [
+                    ProductImage(product_id=pid, image=image_name, is_primary=(n == 0), sort_order=n)
+                    for pid in ids
+                    for n in range(images_per_product)
+                ]
+            )
+            ProductReview.objects.bulk_create(
+                [
+                    ProductReview(
+                        product_id=pid,
+                        name=rng.choice(_REVIEWERS),
+                        rating=rng.randint(1, 5),
+                        comment="کیفیت مناسب و ارسال سریع.",
+                        is_approved=rng.random() > 0.2,
+                    )
+                    for pid in ids
+                    for _ in range(reviews_per_product)
+                ]
+            )
+
+        totals["products"] += len(ids)
+        totals["features"] += len(ids) * min(features_per_product, len(_FEATURES))
+        totals["images"] += len(ids) * images_per_product
+        totals["reviews"] += len(ids) * reviews_per_product
+        log(f"products: {totals['products']}/{products}")
+
+    facets.record_change()
+    return SeedResult(categories=len(created_categories), **totals)
+
+
+def clear_seeded_catalog() -> int:
+    """Delete every seeded category (and, by cascade, its products). Returns rows deleted."""
+    deleted, _ = Category.objects.filter(slug__startswith=SEED_SLUG_PREFIX).delete()
+    return deleted
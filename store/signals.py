@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import facets
+from .images import schedule_derivatives
+from .models import Category, Product, ProductFeature, ProductImage, ProductImageDerivative
+from .utils import refresh_card_image
+
+# Product columns the facet index reads; saves touching only other fields (view_count) are ignored.
+_FACET_FIELDS = {"category", "category_id", "brand", "price", "is_available"}
+# Product columns that feed the related-products vectors (store.related).
+_RELATED_FIELDS = {"category", "category_id", "brand", "tags"}
+
+
+def _cascaded(origin, sender) -> bool:
+    """True when a delete of ``sender`` is a cascade from deleting some other model."""
+    if origin is None:
+        return False
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is not sender
+
+
+@receiver(post_save, sender=ProductImage)
+def queue_product_image_derivatives(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Render responsive variants in the background whenever the image file may have changed."""
+    if raw:
+        return
+    refresh_card_image(instance.product_id)
+    if not instance.image:
+        return
+    if update_fields is not None and "image" not in update_fields:
+        return
+    schedule_derivatives(instance)
+
+
+@receiver(post_delete, sender=ProductImageDerivative)
+def delete_derivative_file(sender, instance, **kwargs):
+    # After commit: a rolled-back delete must still find its file.
+    if instance.file:
+        transaction.on_commit(partial(instance.file.storage.delete, instance.file.name))
+
+
+@receiver(post_delete, sender=ProductImage)
+def refresh_card_image_after_delete(sender, instance, origin=None, **kwargs):
+    # Deleting a product or category cascades here once per image; the product row is going too.
+    if _cascaded(origin, sender):
+        return
+    refresh_card_image(instance.product_id)
+
+
+@receiver(post_save, sender=Product)
+def record_product_facet_change(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and not _FACET_FIELDS.intersection(update_fields)):
+        return
+    facets.record_change(instance.pk)
+
+
+@receiver(post_delete, sender=Product)
+def record_product_facet_delete(sender, instance, origin=None, **kwargs):
+    if not _cascaded(origin, sender):
+        facets.record_change(instance.pk)
+
+
+@receiver(post_save, sender=ProductFeature)
+def record_feature_facet_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        facets.record_change(instance.product_id)
+        _mark_related_stale(instance.product_id)
+
+
+@receiver(post_delete, sender=ProductFeature)
+def record_feature_facet_delete(sender, instance, origin=None, **kwargs):
+    if not _cascaded(origin, sender):
+        facets.record_change(instance.product_id)
+        _mark_related_stale(instance.product_id)
+
+
+def _mark_related_stale(product_id) -> None:
+    Product.objects.filter(pk=product_id, related_stale=False).update(related_stale=True)
+
+
+@receiver(pre_save, sender=Product)
+def flag_product_related_stale(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Full saves (admin edits, imports) may change category/brand/tags; saves with update_fields are checked after."""
+    if not raw and update_fields is None:
+        instance.related_stale = True
+
+
+@receiver(post_save, sender=Product)
+def flag_product_related_stale_fields(sender, instance, update_fields=None, raw=False, **kwargs):
+    if not raw and update_fields is not None and _RELATED_FIELDS.intersection(update_fields):
+        _mark_related_stale(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def record_category_facet_change(sender, **kwargs):
+    """Category slugs are facet values; rebuild rather than touch every product."""
+    facets.record_change()
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from django import template
+
+from store.utils import build_srcset, get_primary_image
+
+register = template.Library()
+
+
+@register.filter(name="srcset")
+def srcset(image, fmt: str = "webp") -> str:
+    """Usage: <img srcset="{{ image|srcset:'jpeg' }}" ...> for a ProductImage."""
+    return build_srcset(image, fmt)
+
+
+@register.filter(name="primary_srcset")
+def primary_srcset(product, fmt: str = "webp") -> str:
+    """Usage: <source type="image/webp" srcset="{{ product|primary_srcset }}"> for a Product card."""
+    return build_srcset(get_primary_image(product), fmt)
@@ -0,0 +1,175 @@
+import gzip
+import json
+from decimal import Decimal
+
+import brotli
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.text import format_lazy
+
+from core.compression import dumps
+from store.models import Category, Product, ProductImage, RelatedProduct
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ApiProductsProjectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="فر", slug="oven")
+        for number in range(3):
+            Product.objects.create(
+                name=f"فر {number}",
+                summary="فر صنعتی",
+                description="توضیحات طولانی " * 50,
+                domain="رستوران",
+                sku=f"SKU-{number}",
+                category=self.category,
+                card_image_url=f"/media/products/{number}.jpg",
+            )
+
+    def _get(self, query: str):
+        response = self.client.get(f"/api/products/{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_card_view_skips_description_and_prefetch(self):
+        with CaptureQueriesContext(connection) as queries:
+            payload = self._get("?view=card")
+        self.assertEqual(payload["total"], 3)
+        item = payload["products"][0]
+        self.assertNotIn("description", item)
+        self.assertNotIn("sku", item)
+        self.assertEqual(item["category"], {"id": self.category.id, "name": "فر", "slug": "oven"})
+        self.assertTrue(item["image_url"].startswith("/media/products/"))
+
+        product_queries = [q["sql"] for q in queries.captured_queries if '"store_product"' in q["sql"]]
+        self.assertEqual(len(product_queries), 2)  # count + page
+        self.assertFalse(any('"description"' in sql for sql in product_queries if "COUNT" not in sql))
+        self.assertFalse(any('"store_productimage"' in q["sql"] for q in queries.captured_queries))
+
+    def test_full_view_is_the_default(self):
+        item = self._get("")["products"][0]
+        self.assertIn("description", item)
+        self.assertEqual(item["image_srcset"], {"webp": "", "jpeg": ""})
+
+    def test_fields_selects_individual_fields(self):
+        item = self._get("?fields=name,price")["products"][0]
+        self.assertEqual(set(item), {"id", "name", "price"})
+
+        response = self.client.get("/api/products/?fields=name,password")
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_size_is_capped_and_bad_numbers_fall_back(self):
+        self.assertEqual(self._get("?page_size=5000")["page_size"], 100)
+        payload = self._get("?page=abc&page_size=-3")
+        self.assertEqual((payload["page"], payload["page_size"]), (1, 20))
+
+    def test_card_image_follows_primary_image(self):
+        product = Product.objects.create(name="هود", description="-", domain="-", category=self.category)
+        image = ProductImage.objects.create(product=product, image="products/hood.jpg", is_primary=True)
+        product.refresh_from_db()
+        self.assertTrue(product.card_image_url.endswith("products/hood.jpg"))
+
+        image.delete()
+        product.refresh_from_db()
+        self.assertEqual(product.card_image_url, "")
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ApiProductsBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="فر", slug="oven")
+        self.products = [
+            Product.objects.create(name=f"فر {n}", description="-", domain="-", category=category) for n in range(3)
+        ]
+        self.products[0].features.create(name="دهانه", value="۴")
+        self.products[1].reviews.create(name="علی", rating=4, comment="خوب", is_approved=True)
+        self.products[1].reviews.create(name="سارا", rating=5, comment="عالی", is_approved=True)
+
+    def test_returns_detail_shape_in_request_order(self):
+        first, second, third = (p.id for p in self.products)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/products/batch/?ids={third},999999,{first},{third}")
+        # products (+category), images, features, review aggregate, related: independent of len(ids).
+        self.assertEqual(sum('FROM "store_' in q["sql"] for q in queries.captured_queries), 5)
+        self.assertEqual(response.status_code, 200)
+        items = response.json()["products"]
+        self.assertEqual([item["id"] for item in items], [third, 999999, first])
+        self.assertEqual(items[1], {"id": 999999, "error": "not_found"})
+        self.assertEqual(items[2]["features"], [{"id": items[2]["features"][0]["id"], "name": "دهانه", "value": "۴"}])
+        self.assertEqual(items[0]["related"], [])
+
+        items = self.client.post(
+            "/api/products/batch/", data={"ids": [second]}, content_type="application/json"
+        ).json()["products"]
+        self.assertEqual(items[0]["reviews"], {"count": 2, "average_rating": 4.5})
+
+    def test_items_match_the_detail_api(self):
+        first, second, _ = self.products
+        RelatedProduct.objects.create(product=first, related=second, rank=1, score=0.5)
+        detail = self.client.get(f"/api/products/oven/{first.slug}/").json()
+        response = self.client.get(f"/api/products/batch/?ids={first.pk}", HTTP_ACCEPT_ENCODING="br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        [item] = json.loads(brotli.decompress(response.content))["products"]
+        # The detail request counted a view; the batch does not.
+        self.assertEqual({**item, "view_count": detail["view_count"]}, detail)
+
+    def test_rejects_bad_or_too_many_ids(self):
+        self.assertEqual(self.client.get("/api/products/batch/?ids=1,x").status_code, 400)
+        ids = ",".join(str(n) for n in range(1, 60))
+        self.assertEqual(self.client.get(f"/api/products/batch/?ids={ids}").status_code, 400)
+
+    def test_manual_invoice_picker_searches_lazily(self):
+        self.assertEqual(self.client.get("/shop/invoice/manual/products/?q=فر").status_code, 404)
+        User.objects.create_user("staff", password="pw", is_staff=True)
+        self.client.login(username="staff", password="pw")
+        products = self.client.get("/shop/invoice/manual/products/?q=فر").json()["products"]
+        self.assertEqual({p["name"] for p in products}, {"فر 0", "فر 1", "فر 2"})
+        self.assertEqual(set(products[0]), {"id", "name", "price"})
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ApiCompressionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="فر", slug="oven")
+        self.products = [
+            Product.objects.create(name=f"فر صنعتی {n}", description="توضیحات " * 40, domain="-", category=self.category)
+            for n in range(5)
+        ]
+
+    def test_products_are_brotli_encoded_and_cached_compressed(self):
+        response = self.client.get("/api/products/", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        payload = brotli.decompress(response.content)
+        self.assertEqual(payload, self.client.get("/api/products/").content)
+
+        with self.assertNumQueries(0):
+            hit = self.client.get("/api/products/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(gzip.decompress(hit.content), payload)
+        revalidated = self.client.get("/api/products/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=hit["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_catalog_changes_bypass_cached_bodies(self):
+        self.assertEqual(self.client.get("/api/categories/").json()["categories"][0]["name"], "فر")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = "فر پیتزا"
+            self.category.save()
+            self.products[0].delete()
+        self.assertEqual(self.client.get("/api/categories/").json()["categories"][0]["name"], "فر پیتزا")
+        self.assertEqual(self.client.get("/api/products/").json()["total"], 4)
+
+    def test_detail_is_compressed_per_request(self):
+        product = self.products[0]
+        response = self.client.get(f"/api/products/oven/{product.slug}/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.content))["view_count"], 1)
+
+    def test_dumps_handles_lazy_strings_and_decimals(self):
+        lazy = format_lazy("{}-{}", "فر", 2)
+        self.assertEqual(dumps({"a": lazy, "b": Decimal("1.50")}), '{"a":"فر-2","b":"1.50"}'.encode("utf-8"))
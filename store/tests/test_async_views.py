@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.models import DailyVisitStat
+from core.tests.test_visitors import BROWSER
+from store.models import Category, Product, ProductFeature
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, ROOT_URLCONF="core.bench.asgi_urls")
+class AsyncApiViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="فر", slug="oven")
+        self.products = [
+            Product.objects.create(name=f"فر {n}", description="-", domain="-", category=category, brand="Inox", price=n)
+            for n in range(3)
+        ]
+        ProductFeature.objects.create(product=self.products[0], name="دهانه", value="۵۰")
+
+    async def test_products_match_the_sync_view(self):
+        for query in ("?view=card&page=9", "?search=%D9%81%D8%B1&fields=name,price", "?brand=Inox&facets=1"):
+            with override_settings(ROOT_URLCONF="core.bench.urls"):
+                expected = (await self.async_client.get(f"/api/products/{query}")).json()
+            await cache.aclear()
+            response = await self.async_client.get(f"/api/products/{query}")
+            self.assertEqual(response.resolver_match.func.__name__, "api_products_async")
+            self.assertEqual(response.json(), expected)
+
+    async def test_detail_counts_views_and_includes_features(self):
+        # AsyncClient passes non-ASCII paths through latin-1 like WSGI; ASGI servers send them decoded.
+        product = await Product.objects.acreate(
+            name="Oven 50", description="-", domain="-", category_id=self.products[0].category_id
+        )
+        await ProductFeature.objects.acreate(product=product, name="دهانه", value="۵۰")
+        payload = (await self.async_client.get(f"/api/products/oven/{product.slug}/")).json()
+        self.assertEqual(payload["view_count"], 1)
+        self.assertEqual([f["name"] for f in payload["features"]], ["دهانه"])
+        self.assertEqual(payload["related"], [])
+        missing = await self.async_client.get("/api/products/oven/nope/")
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_categories_suggest_and_user_status(self):
+        categories = (await self.async_client.get("/api/categories/")).json()["categories"]
+        self.assertEqual([c["slug"] for c in categories], ["oven"])
+        suggestions = (await self.async_client.get("/catalog/suggest/?q=فر")).json()["suggestions"]
+        self.assertEqual(suggestions, ["فر 0", "فر 1", "فر 2"])
+        self.assertEqual((await self.async_client.get("/api/user/status/")).json(), {"is_staff": False})
+
+        staff = await User.objects.acreate_user("staff", password="pw", is_staff=True)
+        await self.async_client.aforce_login(staff)
+        self.assertEqual((await self.async_client.get("/api/user/status/")).json(), {"is_staff": True})
+
+    async def test_site_visits_are_recorded_under_asgi(self):
+        await self.async_client.get("/api/categories/", headers={"User-Agent": BROWSER})
+        stat = await DailyVisitStat.objects.aget()
+        self.assertEqual(stat.total_hits, 1)
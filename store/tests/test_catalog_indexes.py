@@ -0,0 +1,29 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from store.models import Category, Product
+
+
+class CatalogIndexTests(TestCase):
+    def test_slug_is_unique_per_category(self):
+        category = Category.objects.create(name="فر")
+        Product.objects.create(name="فر پیتزا", slug="pizza", description="-", domain="-", category=category)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Product.objects.create(name="فر دیگر", slug="pizza", description="-", domain="-", category=category)
+
+        other = Category.objects.create(name="هود")
+        Product.objects.create(name="هود", slug="pizza", description="-", domain="-", category=other)
+
+    def test_explain_hot_queries_prints_a_plan_per_query(self):
+        category = Category.objects.create(name="فر")
+        Product.objects.create(name="فر پیتزا", description="-", domain="-", category=category)
+
+        out = StringIO()
+        call_command("explain_hot_queries", stdout=out)
+        output = out.getvalue()
+        self.assertIn("== api_products: listing page", output)
+        self.assertIn("store_prod_created_avail", output)
+        self.assertIn("== product_detail: lookup by (category__slug, slug)", output)
@@ -0,0 +1,109 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from store import facets
+from store.facets import FacetFilters, FacetIndex
+from store.models import CatalogGeneration, Category, Product, ProductFeature
+
+
+class FacetIndexTests(TestCase):
+    def setUp(self):
+        facets.reset()
+        cache.clear()
+        self.pizza = Category.objects.create(name="فر پیتزا", slug="pizza")
+        self.fryer = Category.objects.create(name="سرخ‌کن", slug="fryer")
+        self.products = []
+        for number, (category, brand, price, mouth) in enumerate(
+            [
+                (self.pizza, "Inox", 100, "۴۰ سانتی‌متر"),
+                (self.pizza, "Inox", 200, "۵۰ سانتی‌متر"),
+                (self.pizza, "Fimar", 300, "۵۰ سانتی‌متر"),
+                (self.fryer, "Fimar", 400, None),
+            ]
+        ):
+            product = Product.objects.create(
+                name=f"محصول {number}", description="-", domain="-", category=category, brand=brand, price=price
+            )
+            if mouth:
+                ProductFeature.objects.create(product=product, name="دهانه", value=mouth)
+            self.products.append(product)
+
+    def test_multi_facet_filter_and_disjunctive_counts(self):
+        index = FacetIndex.build()
+        result = index.search(
+            FacetFilters(brands=("Inox",), features=(("دهانه", "۵۰ سانتی‌متر"),)), with_counts=True
+        )
+        self.assertEqual(result.product_ids, [self.products[1].id])
+        # Brand counts ignore the brand selection but respect the feature filter.
+        self.assertEqual(result.counts["brand"], {"Fimar": 1, "Inox": 1})
+        self.assertEqual(result.counts["feature:دهانه"], {"۴۰ سانتی‌متر": 1, "۵۰ سانتی‌متر": 1})
+        self.assertEqual((result.price_min, result.price_max), (200, 200))
+
+    def test_price_range_and_newest_first_paging(self):
+        index = FacetIndex.build()
+        result = index.search(FacetFilters(price_min=150, price_max=400), offset=1, limit=2)
+        self.assertEqual(result.total, 3)
+        self.assertEqual(result.product_ids, [self.products[2].id, self.products[1].id])
+
+    def test_changes_are_replayed_incrementally(self):
+        self.assertEqual(facets.facet_search(FacetFilters(brands=("Rational",))).total, 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[0].brand = "Rational"
+            self.products[0].save()
+            ProductFeature.objects.filter(product=self.products[2]).delete()
+            self.products[3].delete()
+
+        with mock.patch.object(FacetIndex, "build", side_effect=AssertionError("full rebuild")):
+            self.assertEqual(facets.facet_search(FacetFilters(brands=("Rational",))).product_ids, [self.products[0].id])
+            self.assertEqual(facets.facet_search(FacetFilters(features=(("دهانه", "۵۰ سانتی‌متر"),))).total, 1)
+            self.assertEqual(facets.facet_search(FacetFilters(categories=("fryer",))).total, 0)
+
+        # View-count bumps do not touch the index.
+        generation = CatalogGeneration.objects.get().value
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[1].save(update_fields=["view_count"])
+        self.assertEqual(CatalogGeneration.objects.get().value, generation)
+
+    def test_changes_made_by_another_worker_reach_this_index(self):
+        self.assertEqual(facets.facet_search(FacetFilters(brands=("Rational",))).total, 0)
+        # Another worker: writes without this process' cache seeing the change log or the new generation.
+        Product.objects.filter(pk=self.products[0].pk).update(brand="Rational")
+        facets._bump_generation()
+
+        self.assertEqual(facets.facet_search(FacetFilters(brands=("Rational",))).total, 0)
+        cache.delete(facets.GENERATION_KEY)  # CATALOG_GENERATION_CHECK_SECONDS elapsed
+        self.assertEqual(facets.facet_search(FacetFilters(brands=("Rational",))).product_ids, [self.products[0].id])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ApiProductsFacetTests(TestCase):
+    def setUp(self):
+        facets.reset()
+        cache.clear()
+        category = Category.objects.create(name="فر", slug="oven")
+        for number, brand in enumerate(["Inox", "Inox", "Fimar"]):
+            Product.objects.create(
+                name=f"فر {number}", description="-", domain="-", category=category, brand=brand, price=number * 100
+            )
+
+    def _get(self, query: str):
+        response = self.client.get(f"/api/products/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_brand_filter_with_counts(self):
+        payload = self._get("brand=Inox&facets=1&view=card")
+        self.assertEqual(payload["total"], 2)
+        self.assertEqual([p["name"] for p in payload["products"]], ["فر 1", "فر 0"])
+        self.assertEqual(payload["facets"]["brand"], {"Inox": 2, "Fimar": 1})
+        self.assertEqual(payload["facets"]["price"], {"min": 0, "max": 100})
+
+    def test_search_combines_with_facets(self):
+        payload = self._get("brand=Inox&search=%D9%81%D8%B1%201&price_min=50")
+        self.assertEqual([p["name"] for p in payload["products"]], ["فر 1"])
+
+    def test_invalid_filter_values_are_rejected(self):
+        self.assertEqual(self.client.get("/api/products/?price_min=cheap").status_code, 400)
+        self.assertEqual(self.client.get("/api/products/?available=maybe").status_code, 400)
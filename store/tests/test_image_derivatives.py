@@ -0,0 +1,104 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from store.images import derivatives_are_current, render_derivatives, store_rendered_derivatives
+from store.models import Category, Product, ProductImage, ProductImageDerivative
+from store.utils import get_primary_image_srcset
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="styra-test-media-")
+
+
+def _png_upload(width: int = 1000, height: int = 500) -> SimpleUploadedFile:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(buffer, "PNG")
+    return SimpleUploadedFile("oven.png", buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    BACKGROUND_TASKS_EAGER=True,
+    PRODUCT_IMAGE_DERIVATIVE_WIDTHS=[320, 640, 1280],
+    SECURE_SSL_REDIRECT=False,
+)
+class ProductImageDerivativeTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="فر پیتزا")
+        self.product = Product.objects.create(name="فر پیتزا دهانه ۵۰", description="-", domain="-", category=category)
+
+    def _upload(self) -> ProductImage:
+        with self.captureOnCommitCallbacks(execute=True):
+            return ProductImage.objects.create(product=self.product, image=_png_upload(), is_primary=True)
+
+    def test_upload_renders_widths_in_both_formats(self):
+        image = self._upload()
+
+        rows = ProductImageDerivative.objects.filter(image=image)
+        self.assertEqual(
+            sorted(rows.values_list("format", "width")),
+            [("jpeg", 320), ("jpeg", 640), ("jpeg", 1000), ("webp", 320), ("webp", 640), ("webp", 1000)],
+        )
+        for row in rows:
+            self.assertTrue(row.file.name.startswith(f"products/{self.product.pk}/derivatives/"))
+            self.assertGreater(row.size_bytes, 0)
+
+        srcset = get_primary_image_srcset(Product.objects.prefetch_related("images__derivatives").get(pk=self.product.pk))
+        self.assertRegex(srcset["webp"], r"-320w\.webp 320w, .*-640w\.webp 640w, .*-1000w\.webp 1000w$")
+
+    def test_derivatives_are_current_compares_formats_and_widths(self):
+        image = ProductImage.objects.prefetch_related("derivatives").get(pk=self._upload().pk)
+        self.assertTrue(derivatives_are_current(image))
+        # 1600 clamps to the 1000px original, like 1280 did.
+        self.assertTrue(derivatives_are_current(image, widths=(320, 640, 1280, 1600)))
+        self.assertFalse(derivatives_are_current(image, widths=(320, 640, 960, 1280)))
+        self.assertFalse(derivatives_are_current(image, widths=(320, 640)))
+        self.assertFalse(derivatives_are_current(image, formats=("webp", "jpeg", "avif")))
+
+    def test_failed_rerender_keeps_old_files_and_removes_new_ones(self):
+        image = self._upload()
+        old = {row.file.name for row in image.derivatives.all()}
+        rendered = render_derivatives(image.image.path, widths=(320,))
+        storage = image.image.storage
+        saved = []
+        save = storage.save
+
+        def tracking_save(name, content, *args, **kwargs):
+            saved.append(save(name, content, *args, **kwargs))
+            return saved[-1]
+
+        with mock.patch.object(storage, "save", side_effect=tracking_save), mock.patch.object(
+            ProductImageDerivative.objects, "bulk_create", side_effect=RuntimeError("db down")
+        ):
+            with self.captureOnCommitCallbacks(execute=True), self.assertRaises(RuntimeError):
+                store_rendered_derivatives(image, rendered)
+
+        self.assertEqual({row.file.name for row in image.derivatives.all()}, old)
+        self.assertTrue(all(storage.exists(name) for name in old))
+        self.assertEqual(len(saved), 2)
+        self.assertFalse(any(storage.exists(name) for name in saved))
+
+    def test_rerender_deletes_old_files_on_commit(self):
+        image = self._upload()
+        old = {row.file.name for row in image.derivatives.all()}
+        with self.captureOnCommitCallbacks(execute=True):
+            new_rows = store_rendered_derivatives(image, render_derivatives(image.image.path, widths=(320,)))
+        storage = image.image.storage
+        self.assertFalse(any(storage.exists(name) for name in old))
+        self.assertTrue(all(storage.exists(row.file.name) for row in new_rows))
+
+    def test_api_products_exposes_srcset(self):
+        self._upload()
+        payload = self.client.get("/api/products/").json()
+        self.assertIn("640w", payload["products"][0]["image_srcset"]["jpeg"])
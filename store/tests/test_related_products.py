@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from store.models import Category, Product, ProductFeature, RelatedProduct
+from store.related import build_related_products, related_products_for
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RelatedProductsTests(TestCase):
+    def setUp(self):
+        pizza = Category.objects.create(name="فر پیتزا", slug="pizza")
+        fryer = Category.objects.create(name="سرخ‌کن", slug="fryer")
+        self.oven_a = self._product("فر ۴۰", pizza, "Inox", {"دهانه": "۴۰", "نوع": "ریلی"})
+        self.oven_b = self._product("فر ۵۰", pizza, "Inox", {"دهانه": "۴۰", "نوع": "ریلی"})
+        self.oven_c = self._product("فر ۶۰", pizza, "Fimar", {"دهانه": "۶۰"})
+        self.fryer = self._product("سرخ‌کن", fryer, "Fimar", {"کنترل": "دیجیتال"})
+
+    def _product(self, name, category, brand, features):
+        product = Product.objects.create(name=name, description="-", domain="-", category=category, brand=brand)
+        for key, value in features.items():
+            ProductFeature.objects.create(product=product, name=key, value=value)
+        return product
+
+    def test_build_ranks_by_shared_terms(self):
+        out = StringIO()
+        call_command("build_related_products", stdout=out)
+        self.assertIn("for 4 product(s)", out.getvalue())
+
+        related = related_products_for(self.oven_a.pk)
+        self.assertEqual(related[0]["id"], self.oven_b.pk)
+        self.assertEqual(related[0]["category_slug"], "pizza")
+        self.assertNotIn(self.fryer.pk, [item["id"] for item in related])
+        self.assertFalse(Product.objects.filter(related_stale=True).exists())
+
+        with self.assertNumQueries(1):
+            related_products_for(self.oven_a.pk)
+
+    def test_only_stale_products_and_their_referrers_are_rebuilt(self):
+        build_related_products()
+        self.assertEqual(build_related_products().products, 0)
+
+        ProductFeature.objects.create(product=self.fryer, name="دهانه", value="۶۰")
+        result = build_related_products()
+        # The fryer itself plus oven_c, which already listed it via the shared brand.
+        self.assertEqual(result.products, 2)
+        self.assertIn(self.fryer.pk, RelatedProduct.objects.filter(product=self.oven_c).values_list("related_id", flat=True))
+
+    def test_products_sharing_a_new_term_are_rebuilt(self):
+        grill = Category.objects.create(name="گریل", slug="grill")
+        unrelated = self._product("گریل", grill, "Roller", {})
+        build_related_products(top_k=1)
+        self.assertNotIn(self.fryer.pk, RelatedProduct.objects.filter(product=self.oven_a).values_list("related_id", flat=True))
+
+        ProductFeature.objects.create(product=self.fryer, name="نوع", value="ریلی")
+        # oven_a and oven_b never listed the fryer, but now share a feature with it.
+        self.assertEqual(build_related_products(top_k=1).products, 4)
+        self.assertFalse(RelatedProduct.objects.filter(product=unrelated, related=self.fryer).exists())
+
+    def test_api_product_detail_includes_related(self):
+        build_related_products()
+        payload = self.client.get("/api/products/pizza/" + self.oven_a.slug + "/").json()
+        self.assertEqual([item["id"] for item in payload["related"]][:1], [self.oven_b.pk])
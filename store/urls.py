@@ -9,6 +9,7 @@ urlpatterns = [
     path("product/<int:pk>/", views.legacy_product_redirect, name="legacy_product_redirect"),
     path("invoice/manual/", views.manual_invoice, name="manual_invoice"),
     path("invoice/manual/pdf/", views.manual_invoice_pdf, name="manual_invoice_pdf"),
+    path("invoice/manual/products/", views.manual_invoice_products, name="manual_invoice_products"),
     path("<str:category_slug>/", views.category_detail, name="catalog_category"),
     path(
         "<str:category_slug>/<str:product_slug>/",
@@ -51,23 +51,54 @@ def list_product_media_images(product_id: int | str) -> list[str]:
     return urls
 
 
-def get_primary_image_url(product) -> str:
+def get_primary_image(product):
     images = list(getattr(product, "images", []).all())
-    if images:
-        for image in images:
-            if image.is_primary:
-                return image.image.url
-        return images[0].image.url
+    if not images:
+        return None
+    for image in images:
+        if image.is_primary:
+            return image
+    return images[0]
+
+
+def get_primary_image_url(product) -> str:
+    image = get_primary_image(product)
+    if image is not None:
+        return image.image.url
 
     fallback = list_product_media_images(getattr(product, "id", ""))
     return fallback[0] if fallback else ""
 
 
-def build_gallery_images(product) -> list[dict[str, str]]:
+def build_srcset(image, fmt: str) -> str:
+    """Return a ``srcset`` value ("<url> <w>w, ...") for one derivative format of a ProductImage."""
+    if image is None:
+        return ""
+    derivatives = sorted(
+        (d for d in image.derivatives.all() if d.format == fmt),
+        key=lambda d: d.width,
+    )
+    return ", ".join(f"{d.file.url} {d.width}w" for d in derivatives)
+
+
+def build_srcsets(image) -> dict[str, str]:
+    """Return {"webp": srcset, "jpeg": srcset}; empty values until derivatives are rendered."""
+    return {fmt: build_srcset(image, fmt) for fmt in ("webp", "jpeg")}
+
+
+def get_primary_image_srcset(product) -> dict[str, str]:
+    return build_srcsets(get_primary_image(product))
+
+
+def build_gallery_images(product) -> list[dict]:
     images = list(getattr(product, "images", []).all())
     if images:
         return [
-            {"url": img.image.url, "alt": (img.alt_text or getattr(product, "name", "") or "").strip()}
+            {
+                "url": img.image.url,
+                "alt": (img.alt_text or getattr(product, "name", "") or "").strip(),
+                "srcset": build_srcsets(img),
+            }
             for img in images
         ]
 
@@ -76,4 +107,25 @@ def build_gallery_images(product) -> list[dict[str, str]]:
         return []
 
     alt = (getattr(product, "name", "") or "").strip()
-    return [{"url": url, "alt": alt} for url in fallback_urls]
+    return [{"url": url, "alt": alt, "srcset": {}} for url in fallback_urls]
+
+
+def card_image_fields(product) -> dict:
+    """Values for the denormalized ``Product.card_image_*`` columns (needs ``images__derivatives`` prefetched)."""
+    return {
+        "card_image_url": get_primary_image_url(product)[:255],
+        "card_image_srcset": get_primary_image_srcset(product),
+    }
+
+
+def refresh_card_image(product_id) -> None:
+    """Recompute the denormalized card image of one product (one read, one UPDATE)."""
+    from . import facets
+    from .models import Product
+
+    product = Product.objects.only("id").prefetch_related("images__derivatives").filter(pk=product_id).first()
+    if product is None:
+        return
+    Product.objects.filter(pk=product_id).update(**card_image_fields(product))
+    # Cached product-list responses are versioned by the catalog generation.
+    facets.record_change(product_id)
@@ -1,26 +1,40 @@
 ﻿from __future__ import annotations
 
+import hashlib
 import json
 import re
 from datetime import timedelta
+from functools import partial
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import Avg, F, Q
+from django.db.models import Avg, Count, F, Q
 from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils.http import urlencode
 from django.utils import timezone
-from django.utils.text import slugify
-from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
 from django.views.decorators.csrf import csrf_exempt
 
+from asgiref.sync import sync_to_async
+
 from auth_security.ratelimit import check_rate_limit
+from core.compression import CompressedJsonResponse, acached_json_response, cached_json_response
+from core.utils.slugs import save_with_slug
 
 from .forms import ProductReviewForm
-from .invoice import render_manual_invoice_pdf
+from .facets import (
+    FEATURE_PREFIX,
+    FacetFilters,
+    acurrent_generation,
+    current_generation,
+    facet_search,
+    position_mask,
+)
 from .models import Category, ManualInvoiceSequence, Product, ProductReview
-from .utils import build_gallery_images, get_primary_image_url
+from .related import arelated_products_for, related_products_by_product, related_products_for
+from .utils import build_gallery_images, get_primary_image_srcset, get_primary_image_url
 from django.core.paginator import Paginator
 
 def _sanitize_query(value: str, max_length: int = 80) -> str:
@@ -33,7 +47,7 @@ def _sanitize_query(value: str, max_length: int = 80) -> str:
 
 def catalog_home(request):
     query = _sanitize_query(request.GET.get("q") or "", max_length=80)
-    products = Product.objects.prefetch_related("images", "category").all()
+    products = Product.objects.prefetch_related("images__derivatives", "category").all()
     categories = Category.objects.all()
 
     if query:
@@ -50,6 +64,7 @@ def catalog_home(request):
     featured_products = list(products.order_by("-created_at")[:9])
     for product in featured_products:
         product.card_image_url = get_primary_image_url(product)
+        product.card_image_srcset = get_primary_image_srcset(product)
 
     return render(
         request,
@@ -67,9 +82,17 @@ def category_detail(request, category_slug: str):
     query = _sanitize_query(request.GET.get("q") or "", max_length=80)
     products = (
         Product.objects.filter(category=category)
-        .prefetch_related("images")
+        .prefetch_related("images__derivatives")
         .order_by("-created_at")
     )
+    facet_counts = None
+    parsed = _facet_filters(request, categories=(category.slug,), available=None)
+    if parsed is not None:
+        filters, facets_active = parsed
+        result = facet_search(filters, limit=10_000 if facets_active else 0, with_counts=True)
+        facet_counts = _facet_payload(result)
+        if facets_active:
+            products = products.filter(id__in=result.product_ids)
     if query:
         products = products.filter(
             Q(name__icontains=query)
@@ -83,6 +106,7 @@ def category_detail(request, category_slug: str):
     products = list(products)
     for product in products:
         product.card_image_url = get_primary_image_url(product)
+        product.card_image_srcset = get_primary_image_srcset(product)
 
     return render(
         request,
@@ -91,13 +115,14 @@ def category_detail(request, category_slug: str):
             "category": category,
             "products": products,
             "search_term": query,
+            "facets": facet_counts,
         },
     )
 
 
 def product_detail(request, category_slug: str, product_slug: str):
     product = get_object_or_404(
-        Product.objects.prefetch_related("features", "images", "reviews"),
+        Product.objects.prefetch_related("features", "images__derivatives", "reviews"),
         slug=product_slug,
         category__slug=category_slug,
     )
@@ -133,57 +158,76 @@ def product_detail(request, category_slug: str, product_slug: str):
             "review_count": reviews_qs.count(),
             "review_form": review_form,
             "review_submitted": review_submitted,
+            "related_products": related_products_for(product.pk),
         },
     )
 
 
-@require_GET
-def catalog_suggest(request):
-    query = _sanitize_query(request.GET.get("q") or "", max_length=64)
-    if len(query) < 2:
-        return JsonResponse({"suggestions": []})
+def _suggestion_names(query: str):
+    qs = Product.objects.filter(
+        Q(name__icontains=query)
+        | Q(brand__icontains=query)
+        | Q(tags__icontains=query)
+        | Q(domain__icontains=query)
+        | Q(sku__icontains=query)
+    )
+    return qs.values_list("name", flat=True).distinct().order_by("name")[:8]
+
 
-    rate_decision = check_rate_limit(
+def _suggest_rate_limit(request):
+    return check_rate_limit(
         request,
         scope="catalog_suggest",
         limit=30,
         window_seconds=60,
     )
+
+
+def _suggest_throttled(rate_decision) -> JsonResponse:
+    return JsonResponse(
+        {
+            "detail": "Too many search requests. Please try again later.",
+            "retry_after_seconds": rate_decision.retry_after_seconds,
+        },
+        status=429,
+    )
+
+
+@require_GET
+def catalog_suggest(request):
+    query = _sanitize_query(request.GET.get("q") or "", max_length=64)
+    if len(query) < 2:
+        return JsonResponse({"suggestions": []})
+
+    rate_decision = _suggest_rate_limit(request)
     if not rate_decision.allowed:
-        return JsonResponse(
-            {
-                "detail": "Too many search requests. Please try again later.",
-                "retry_after_seconds": rate_decision.retry_after_seconds,
-            },
-            status=429,
-        )
+        return _suggest_throttled(rate_decision)
 
-    qs = Product.objects.filter(
-        Q(name__icontains=query)
-        | Q(brand__icontains=query)
-        | Q(tags__icontains=query)
-        | Q(domain__icontains=query)
-        | Q(sku__icontains=query)
+    def build():
+        return {"suggestions": list(dict.fromkeys(_suggestion_names(query)))}
+
+    return cached_json_response(
+        request,
+        _api_cache_key("suggest", query),
+        build,
+        timeout=API_SUGGEST_CACHE_TIMEOUT,
+        cache_name="catalog_suggest",
     )
-    names = qs.values_list("name", flat=True).distinct().order_by("name")[:8]
-    suggestions = list(dict.fromkeys(names))
-    return JsonResponse({"suggestions": suggestions})
 
 
 def legacy_product_redirect(request, pk: int):
-    product = get_object_or_404(Product, pk=pk)
+    product = get_object_or_404(Product.objects.select_related("category"), pk=pk)
     if product.category and not product.category.slug:
-        product.category.slug = slugify(product.category.name, allow_unicode=True) or "category"
-        product.category.save(update_fields=["slug"])
+        category = product.category
+        save_with_slug(category, partial(category.save, update_fields=["slug"]), source=category.name, fallback="category")
     if not product.slug:
-        base = slugify(product.name, allow_unicode=True) or f"product-{product.pk}"
-        candidate = base
-        suffix = 1
-        while Product.objects.filter(slug=candidate, category=product.category).exclude(pk=product.pk).exists():
-            candidate = f"{base}-{suffix}"
-            suffix += 1
-        product.slug = candidate
-        product.save(update_fields=["slug"])
+        save_with_slug(
+            product,
+            partial(product.save, update_fields=["slug"]),
+            source=product.name,
+            fallback=f"product-{product.pk}",
+            scope_fields=("category",),
+        )
     return redirect(
         reverse(
             "catalog_product",
@@ -220,8 +264,6 @@ def manual_invoice(request):
     shipping_fee_per_item = 0
     free_shipping_min_total = 0
 
-    products = list(Product.objects.order_by("name").values("id", "name", "price"))
-
     raw_invoice_number = (request.GET.get("invoice_number") or "").strip()
     invoice_number = "#000000"
     match = re.fullmatch(r"#?(\d{1,12})", raw_invoice_number)
@@ -257,7 +299,6 @@ def manual_invoice(request):
             "include_signatures": include_signatures,
             "shipping_fee_per_item": shipping_fee_per_item,
             "free_shipping_min_total": free_shipping_min_total,
-            "products": products,
         },
     )
     if request.GET.get("download") == "1":
@@ -265,6 +306,24 @@ def manual_invoice(request):
     return response
 
 
+@require_GET
+def manual_invoice_products(request):
+    """Product picker for the manual invoice: name/price matches for ``q`` (staff only)."""
+    if not request.user.is_staff:
+        raise Http404
+
+    query = _sanitize_query(request.GET.get("q") or "", max_length=64)
+    if len(query) < 2:
+        return JsonResponse({"products": []})
+
+    products = (
+        Product.objects.filter(Q(name__icontains=query) | Q(sku__icontains=query) | Q(brand__icontains=query))
+        .order_by("name")
+        .values("id", "name", "price")[:20]
+    )
+    return JsonResponse({"products": list(products)})
+
+
 @require_POST
 def manual_invoice_pdf(request):
     if not request.user.is_staff:
@@ -328,6 +387,9 @@ def manual_invoice_pdf(request):
         max(0, items_subtotal - max(0, discount)) + max(0, shipping),
     )
 
+    # reportlab and the RTL shaping stack cost ~50 ms to import; only staff ever render PDFs.
+    from .invoice import render_manual_invoice_pdf
+
     pdf_bytes = render_manual_invoice_pdf(
         invoice_number=invoice_number,
         title=title,
@@ -355,117 +417,311 @@ def manual_invoice_pdf(request):
 
 # API Endpoints for React Frontend
 
+# Cached API bodies are keyed by the catalog generation (store.facets), so a
+# product/category save makes them unreachable in every worker within
+# CATALOG_GENERATION_CHECK_SECONDS. Writes that skip the signals (queryset
+# update(), raw SQL) and view counts do not bump it, so the timeouts stay a
+# few seconds: enough to absorb a burst of identical requests, no more.
+API_CATEGORIES_CACHE_TIMEOUT = 10
+API_PRODUCTS_CACHE_TIMEOUT = 5
+API_SUGGEST_CACHE_TIMEOUT = 10
+
+
+def _api_cache_key(name: str, variant: str = "", *, generation: int | None = None) -> str:
+    if generation is None:
+        generation = current_generation()
+    digest = hashlib.sha1(variant.encode("utf-8")).hexdigest() if variant else "-"
+    return f"store:api:{name}:{generation}:{digest}"
+
+
+def _category_rows():
+    return Category.objects.order_by("name").values("id", "name", "slug")
+
+
 @csrf_exempt
 @require_GET
 def api_categories(request):
     """API endpoint to get all categories."""
-    categories = Category.objects.all().order_by("name")
-    categories_data = [
-        {
-            "id": cat.id,
-            "name": cat.name,
-            "slug": cat.slug,
-        }
-        for cat in categories
-    ]
-    return JsonResponse({"categories": categories_data})
 
+    def build():
+        return {"categories": list(_category_rows())}
 
-@csrf_exempt
-@require_GET
-def api_products(request):
-    """API endpoint to get products with pagination and filtering."""
-    page = int(request.GET.get("page", 1))
-    page_size = int(request.GET.get("page_size", 20))
-    category_slug = request.GET.get("category", "").strip()
-    search_query = request.GET.get("search", "").strip()
+    return cached_json_response(
+        request, _api_cache_key("categories"), build, timeout=API_CATEGORIES_CACHE_TIMEOUT, cache_name="api_categories"
+    )
 
-    products_query = Product.objects.filter(is_available=True).prefetch_related("images", "category")
 
-    if category_slug:
-        products_query = products_query.filter(category__slug=category_slug)
+# api_products field name -> columns read for it (values() projection).
+_PRODUCT_LIST_COLUMNS = {
+    "id": ("id",),
+    "name": ("name",),
+    "slug": ("slug",),
+    "summary": ("summary",),
+    "description": ("description",),
+    "price": ("price",),
+    "category": ("category_id", "category__name", "category__slug"),
+    "brand": ("brand",),
+    "sku": ("sku",),
+    "domain": ("domain",),
+    "image_url": ("card_image_url",),
+    "image_srcset": ("card_image_srcset",),
+    "view_count": ("view_count",),
+}
+# What the React catalog cards render; no description.
+PRODUCT_CARD_FIELDS = (
+    "id", "name", "slug", "summary", "price", "category", "brand", "domain", "image_url", "image_srcset", "view_count",
+)
+PRODUCT_FULL_FIELDS = (
+    "id", "name", "slug", "summary", "description", "price", "category", "brand", "sku", "domain",
+    "image_url", "image_srcset", "view_count",
+)
+API_PRODUCTS_MAX_PAGE_SIZE = 100
+
+
+def _positive_int(value, default: int) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return default
+    return number if number > 0 else default
+
+
+def _product_list_fields(request) -> tuple[str, ...] | None:
+    """Fields for this api_products request, or None when ``fields=`` names an unknown field."""
+    view = request.GET.get("view", "full").strip()
+    base = PRODUCT_CARD_FIELDS if view == "card" else PRODUCT_FULL_FIELDS
+    requested = [name.strip() for name in request.GET.get("fields", "").split(",") if name.strip()]
+    if not requested:
+        return base
+    if any(name not in _PRODUCT_LIST_COLUMNS for name in requested):
+        return None
+    return tuple(name for name in _PRODUCT_LIST_COLUMNS if name == "id" or name in requested)
+
+
+def _fill_missing_card_images(rows) -> None:
+    """Rows whose denormalized image is empty (not backfilled yet) fall back to the gallery."""
+    missing = [row["id"] for row in rows if not row.get("card_image_url")]
+    if not missing:
+        return
+    products = Product.objects.only("id").prefetch_related("images__derivatives").in_bulk(missing)
+    for row in rows:
+        product = products.get(row["id"])
+        if product is not None and not row.get("card_image_url"):
+            row["card_image_url"] = get_primary_image_url(product)
+            row["card_image_srcset"] = get_primary_image_srcset(product)
+
+
+def _serialize_product_row(row: dict, fields) -> dict:
+    item = {}
+    for name in fields:
+        if name == "category":
+            item["category"] = {
+                "id": row["category_id"],
+                "name": row["category__name"],
+                "slug": row["category__slug"],
+            }
+        elif name == "image_url":
+            item["image_url"] = row["card_image_url"]
+        elif name == "image_srcset":
+            item["image_srcset"] = row["card_image_srcset"] or {"webp": "", "jpeg": ""}
+        else:
+            item[name] = row[name]
+    return item
+
+
+def _facet_filters(request, *, categories=None, available=True) -> tuple[FacetFilters, bool] | None:
+    """Facet filters from the query string and whether any goes beyond the defaults.
+
+    ``brand`` and ``feature`` (``name:value``) may repeat; ``available`` is
+    ``1``/``0``/``any``. Returns None for a malformed price or availability.
+    """
+    params = request.GET
+    brands = tuple(dict.fromkeys(v.strip() for v in params.getlist("brand") if v.strip()))
+    features = []
+    for raw in params.getlist("feature"):
+        name, sep, value = raw.partition(":")
+        if sep and name.strip() and value.strip():
+            features.append((name.strip(), value.strip()))
+
+    prices = []
+    for key in ("price_min", "price_max"):
+        raw = params.get(key, "").strip()
+        if not raw:
+            prices.append(None)
+            continue
+        try:
+            prices.append(int(raw))
+        except ValueError:
+            return None
+
+    raw_available = params.get("available", "").strip().lower()
+    if raw_available:
+        if raw_available not in {"1", "0", "any"}:
+            return None
+        available = None if raw_available == "any" else raw_available == "1"
+
+    if categories is None:
+        categories = tuple(dict.fromkeys(v.strip() for v in params.getlist("category") if v.strip()))
+    filters = FacetFilters(
+        categories=categories,
+        brands=brands,
+        features=tuple(dict.fromkeys(features)),
+        price_min=prices[0],
+        price_max=prices[1],
+        available=available,
+    )
+    active = bool(brands or features or prices != [None, None] or raw_available or len(categories) > 1)
+    return filters, active
 
-    if search_query:
-        products_query = products_query.filter(
-            Q(name__icontains=search_query)
-            | Q(summary__icontains=search_query)
-            | Q(description__icontains=search_query)
-            | Q(brand__icontains=search_query)
-            | Q(tags__icontains=search_query)
-            | Q(sku__icontains=search_query)
-        )
 
-    paginator = Paginator(products_query.order_by("-created_at"), page_size)
-    page_obj = paginator.get_page(page)
-
-    products_data = []
-    for product in page_obj:
-        primary_image = get_primary_image_url(product)
-        products_data.append({
-            "id": product.id,
-            "name": product.name,
-            "slug": product.slug,
-            "summary": product.summary,
-            "description": product.description,
-            "price": product.price,
-            "category": {
-                "id": product.category.id,
-                "name": product.category.name,
-                "slug": product.category.slug,
-            },
-            "brand": product.brand,
-            "sku": product.sku,
-            "image_url": primary_image,
-            "view_count": product.view_count,
-        })
+def _product_search_q(query: str) -> Q:
+    return (
+        Q(name__icontains=query)
+        | Q(summary__icontains=query)
+        | Q(description__icontains=query)
+        | Q(brand__icontains=query)
+        | Q(tags__icontains=query)
+        | Q(sku__icontains=query)
+    )
+
+
+def _facet_payload(result) -> dict:
+    counts = dict(result.counts)
+    features = {
+        group[len(FEATURE_PREFIX):]: counts.pop(group) for group in list(counts) if group.startswith(FEATURE_PREFIX)
+    }
+    return {
+        "category": counts.get("category", {}),
+        "brand": counts.get("brand", {}),
+        "available": counts.get("available", {}),
+        "features": features,
+        "price": {"min": result.price_min, "max": result.price_max},
+    }
+
 
-    return JsonResponse({
-        "products": products_data,
-        "total": paginator.count,
-        "page": page,
-        "page_size": page_size,
-        "total_pages": paginator.num_pages,
-    })
+def _product_list_columns(fields) -> list[str]:
+    columns = [column for name in fields for column in _PRODUCT_LIST_COLUMNS[name]]
+    if "image_url" in fields or "image_srcset" in fields:
+        columns += ["card_image_url", "card_image_srcset"]
+    return list(dict.fromkeys(columns))
+
+
+def _product_list_queryset(filters: FacetFilters, search_query: str):
+    """The DB path of api_products (no facet filters active), newest first."""
+    products_query = Product.objects.filter(is_available=True)
+    if filters.categories:
+        products_query = products_query.filter(category__slug=filters.categories[0])
+    if search_query:
+        products_query = products_query.filter(_product_search_q(search_query))
+    return products_query.order_by("-created_at")
+
+
+def _api_products_payload(
+    *, page: int, page_size: int, search_query: str, fields, filters: FacetFilters, facets_active: bool, with_counts: bool
+) -> dict:
+    columns = _product_list_columns(fields)
+    if facets_active or with_counts:
+        restrict = None
+        if search_query:
+            restrict = position_mask(Product.objects.filter(_product_search_q(search_query)).values_list("id", flat=True))
+        search = partial(facet_search, filters, restrict=restrict, limit=page_size, with_counts=with_counts)
+        result = search(offset=(page - 1) * page_size)
+        total_pages = max(1, -(-result.total // page_size))
+        if page > total_pages:
+            # Same as Paginator.get_page(): out-of-range pages show the last page.
+            page = total_pages
+            result = search(offset=(page - 1) * page_size)
+        by_id = {row["id"]: row for row in Product.objects.filter(id__in=result.product_ids).values(*columns)}
+        rows = [by_id[pk] for pk in result.product_ids if pk in by_id]
+        head = {"total": result.total, "page": page, "page_size": page_size, "total_pages": total_pages}
+        if with_counts:
+            head["facets"] = _facet_payload(result)
+    else:
+        products_query = _product_list_queryset(filters, search_query)
+        paginator = Paginator(products_query.values(*columns), page_size)
+        page_obj = paginator.get_page(page)
+        rows = list(page_obj.object_list)
+        head = {
+            "total": paginator.count,
+            "page": page_obj.number,
+            "page_size": page_size,
+            "total_pages": paginator.num_pages,
+        }
+
+    if "image_url" in fields or "image_srcset" in fields:
+        _fill_missing_card_images(rows)
+
+    head["products"] = [_serialize_product_row(row, fields) for row in rows]
+    return head
+
+
+def _query_variant(request) -> str:
+    return urlencode(sorted(request.GET.lists()), doseq=True)
+
+
+def _api_products_params(request) -> dict | JsonResponse:
+    """Parsed api_products arguments, or the 400 response for invalid ones."""
+    fields = _product_list_fields(request)
+    if fields is None:
+        return JsonResponse({"error": "Unknown field requested"}, status=400)
+    parsed = _facet_filters(request)
+    if parsed is None:
+        return JsonResponse({"error": "Invalid filter value"}, status=400)
+    filters, facets_active = parsed
+    return {
+        "page": _positive_int(request.GET.get("page"), 1),
+        "page_size": min(_positive_int(request.GET.get("page_size"), 20), API_PRODUCTS_MAX_PAGE_SIZE),
+        "search_query": request.GET.get("search", "").strip(),
+        "fields": fields,
+        "filters": filters,
+        "facets_active": facets_active,
+        "with_counts": request.GET.get("facets") == "1",
+    }
 
 
 @csrf_exempt
 @require_GET
-def api_product_detail(request, category_slug: str, product_slug: str):
-    """API endpoint to get a single product detail."""
-    try:
-        product = Product.objects.prefetch_related("images", "features", "reviews").get(
-            slug=product_slug,
-            category__slug=category_slug,
-            is_available=True
-        )
-    except Product.DoesNotExist:
-        return JsonResponse({"error": "Product not found"}, status=404)
+def api_products(request):
+    """API endpoint to get products with pagination and filtering.
+
+    ``view=card`` returns only what catalog cards render; ``fields=a,b`` picks
+    individual fields (``id`` is always included). Rows are read with a
+    ``values()`` projection, so description text is never loaded unless asked for.
+
+    ``brand``, ``feature=name:value``, ``price_min``/``price_max``, ``available``
+    and repeated ``category`` are answered from the in-memory facet index
+    (store.facets); ``facets=1`` adds per-facet counts to the response.
+    """
+    params = _api_products_params(request)
+    if isinstance(params, JsonResponse):
+        return params
+    return cached_json_response(
+        request,
+        _api_cache_key("products", _query_variant(request)),
+        partial(_api_products_payload, **params),
+        timeout=API_PRODUCTS_CACHE_TIMEOUT,
+        cache_name="api_products",
+    )
 
-    # Increment view count
-    product.view_count = F("view_count") + 1
-    product.save(update_fields=["view_count"])
-    product.refresh_from_db()
 
-    # Get all images
-    images = build_gallery_images(product)
-    primary_image = get_primary_image_url(product)
+def _review_summary_rows(product_ids):
+    return (
+        ProductReview.objects.filter(product_id__in=product_ids, is_approved=True)
+        .values("product_id")
+        .annotate(count=Count("id"), average=Avg("rating"))
+        .order_by()
+    )
+
 
-    # Get features
-    features_data = [
-        {
-            "id": feat.id,
-            "title": feat.title,
-            "description": feat.description,
-        }
-        for feat in product.features.all()
-    ]
+def _review_summaries(product_ids) -> dict[int, dict]:
+    """Approved-review count and average rating per product (one query)."""
+    return {row["product_id"]: row for row in _review_summary_rows(product_ids)}
 
-    # Get reviews summary
-    reviews = product.reviews.filter(is_approved=True)
-    reviews_count = reviews.count()
-    avg_rating = reviews.aggregate(avg=Avg("rating"))["avg"] or 0.0
 
-    product_data = {
+def _product_detail_payload(product, review_summary: dict | None = None) -> dict:
+    """Detail API shape; needs category, ``images__derivatives`` and ``features`` loaded."""
+    review_summary = review_summary or {}
+    return {
         "id": product.id,
         "name": product.name,
         "slug": product.slug,
@@ -481,15 +737,227 @@ def api_product_detail(request, category_slug: str, product_slug: str):
         "sku": product.sku,
         "tags": [tag.strip() for tag in product.tags.split(",") if tag.strip()] if product.tags else [],
         "domain": product.domain,
-        "primary_image": primary_image,
-        "images": images,
-        "features": features_data,
+        "primary_image": get_primary_image_url(product),
+        "primary_image_srcset": get_primary_image_srcset(product),
+        "images": build_gallery_images(product),
+        "features": [
+            {
+                "id": feat.id,
+                "name": feat.name,
+                "value": feat.value,
+            }
+            for feat in product.features.all()
+        ],
         "datasheet_url": product.datasheet.url if product.datasheet else None,
         "view_count": product.view_count,
         "reviews": {
-            "count": reviews_count,
-            "average_rating": round(avg_rating, 1),
+            "count": review_summary.get("count", 0),
+            "average_rating": round(review_summary.get("average") or 0.0, 1),
         },
     }
 
-    return JsonResponse(product_data)
+
+def _product_detail_queryset():
+    return Product.objects.select_related("category").prefetch_related("images__derivatives", "features")
+
+
+@csrf_exempt
+@require_GET
+def api_product_detail(request, category_slug: str, product_slug: str):
+    """API endpoint to get a single product detail."""
+    try:
+        product = _product_detail_queryset().get(
+            slug=product_slug,
+            category__slug=category_slug,
+            is_available=True
+        )
+    except Product.DoesNotExist:
+        return JsonResponse({"error": "Product not found"}, status=404)
+
+    # Increment view count
+    product.view_count = F("view_count") + 1
+    product.save(update_fields=["view_count"])
+    product.refresh_from_db(fields=["view_count"])
+
+    product_data = _product_detail_payload(product, _review_summaries([product.pk]).get(product.pk))
+    product_data["related"] = related_products_for(product.pk)
+    return CompressedJsonResponse(request, product_data)
+
+
+API_PRODUCTS_BATCH_MAX = 50
+
+
+def _batch_product_ids(request) -> list[int] | None:
+    """Requested ids in request order (duplicates dropped), or None if the input is malformed."""
+    if request.method == "POST":
+        try:
+            raw_ids = json.loads((request.body or b"").decode("utf-8")).get("ids")
+        except (ValueError, AttributeError):
+            return None
+        if not isinstance(raw_ids, list):
+            return None
+    else:
+        raw_ids = [part for value in request.GET.getlist("ids") for part in value.split(",") if part.strip()]
+
+    ids: list[int] = []
+    for raw in raw_ids:
+        try:
+            product_id = int(str(raw).strip())
+        except ValueError:
+            return None
+        if product_id <= 0:
+            return None
+        ids.append(product_id)
+    return list(dict.fromkeys(ids))
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def api_products_batch(request):
+    """Many products in the detail API shape: ``?ids=3,1,2`` or POST ``{"ids": [3, 1, 2]}``.
+
+    Results follow the request order; ids that do not exist (or are not
+    available) come back as ``{"id": <id>, "error": "not_found"}``. View counts
+    are not incremented.
+    """
+    ids = _batch_product_ids(request)
+    if ids is None:
+        return JsonResponse({"error": "ids must be a list of product ids"}, status=400)
+    if len(ids) > API_PRODUCTS_BATCH_MAX:
+        return JsonResponse({"error": f"At most {API_PRODUCTS_BATCH_MAX} ids per request"}, status=400)
+
+    products = (
+        Product.objects.filter(is_available=True)
+        .select_related("category")
+        .prefetch_related("images__derivatives", "features")
+        .in_bulk(ids)
+    )
+    summaries = _review_summaries(list(products))
+    related = related_products_by_product(list(products))
+    items = []
+    for pk in ids:
+        if pk not in products:
+            items.append({"id": pk, "error": "not_found"})
+            continue
+        item = _product_detail_payload(products[pk], summaries.get(pk))
+        item["related"] = related.get(pk, [])
+        items.append(item)
+    return CompressedJsonResponse(request, {"products": items})
+
+
+# Async variants of the read-only API, routed by shopproject.asgi_urls under
+# ASGI. They use the async ORM; facet-index work and gallery fallbacks (which
+# list MEDIA_ROOT) run in threads.
+
+
+async def _api_products_payload_async(
+    *, page: int, page_size: int, search_query: str, fields, filters: FacetFilters, facets_active: bool, with_counts: bool
+) -> dict:
+    columns = _product_list_columns(fields)
+    if facets_active or with_counts:
+        restrict = None
+        if search_query:
+            matching = Product.objects.filter(_product_search_q(search_query)).values_list("id", flat=True)
+            restrict = await sync_to_async(position_mask)([pk async for pk in matching])
+        search = sync_to_async(partial(facet_search, filters, restrict=restrict, limit=page_size, with_counts=with_counts))
+        result = await search(offset=(page - 1) * page_size)
+        total_pages = max(1, -(-result.total // page_size))
+        if page > total_pages:
+            page = total_pages
+            result = await search(offset=(page - 1) * page_size)
+        by_id = {row["id"]: row async for row in Product.objects.filter(id__in=result.product_ids).values(*columns)}
+        rows = [by_id[pk] for pk in result.product_ids if pk in by_id]
+        head = {"total": result.total, "page": page, "page_size": page_size, "total_pages": total_pages}
+        if with_counts:
+            head["facets"] = _facet_payload(result)
+    else:
+        products_query = _product_list_queryset(filters, search_query)
+        total = await products_query.acount()
+        total_pages = max(1, -(-total // page_size))
+        page = min(page, total_pages)
+        offset = (page - 1) * page_size
+        rows = [row async for row in products_query.values(*columns)[offset : offset + page_size]]
+        head = {"total": total, "page": page, "page_size": page_size, "total_pages": total_pages}
+
+    if "image_url" in fields or "image_srcset" in fields:
+        await sync_to_async(_fill_missing_card_images)(rows)
+
+    head["products"] = [_serialize_product_row(row, fields) for row in rows]
+    return head
+
+
+@csrf_exempt
+@require_GET
+async def api_categories_async(request):
+    async def build():
+        return {"categories": [row async for row in _category_rows()]}
+
+    return await acached_json_response(
+        request,
+        _api_cache_key("categories", generation=await acurrent_generation()),
+        build,
+        timeout=API_CATEGORIES_CACHE_TIMEOUT,
+        cache_name="api_categories",
+    )
+
+
+@csrf_exempt
+@require_GET
+async def api_products_async(request):
+    params = _api_products_params(request)
+    if isinstance(params, JsonResponse):
+        return params
+    return await acached_json_response(
+        request,
+        _api_cache_key("products", _query_variant(request), generation=await acurrent_generation()),
+        partial(_api_products_payload_async, **params),
+        timeout=API_PRODUCTS_CACHE_TIMEOUT,
+        cache_name="api_products",
+    )
+
+
+@csrf_exempt
+@require_GET
+async def api_product_detail_async(request, category_slug: str, product_slug: str):
+    try:
+        product = await _product_detail_queryset().aget(
+            slug=product_slug,
+            category__slug=category_slug,
+            is_available=True,
+        )
+    except Product.DoesNotExist:
+        return JsonResponse({"error": "Product not found"}, status=404)
+
+    product.view_count = F("view_count") + 1
+    await product.asave(update_fields=["view_count"])
+    await product.arefresh_from_db(fields=["view_count"])
+
+    summaries = {row["product_id"]: row async for row in _review_summary_rows([product.pk])}
+    # Everything is prefetched; only the MEDIA_ROOT gallery fallback touches the disk.
+    product_data = await sync_to_async(_product_detail_payload, thread_sensitive=False)(
+        product, summaries.get(product.pk)
+    )
+    product_data["related"] = await arelated_products_for(product.pk)
+    return CompressedJsonResponse(request, product_data)
+
+
+@require_GET
+async def catalog_suggest_async(request):
+    query = _sanitize_query(request.GET.get("q") or "", max_length=64)
+    if len(query) < 2:
+        return JsonResponse({"suggestions": []})
+
+    rate_decision = await sync_to_async(_suggest_rate_limit)(request)
+    if not rate_decision.allowed:
+        return _suggest_throttled(rate_decision)
+
+    async def build():
+        return {"suggestions": list(dict.fromkeys([name async for name in _suggestion_names(query)]))}
+
+    return await acached_json_response(
+        request,
+        _api_cache_key("suggest", query, generation=await acurrent_generation()),
+        build,
+        timeout=API_SUGGEST_CACHE_TIMEOUT,
+        cache_name="catalog_suggest",
+    )